@@ -1,13 +1,27 @@
+import logging
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from config import Config
 from models import db
+from utils.json_provider import FastJSONProvider
+
+logger = logging.getLogger(__name__)
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
     
+    # Seviye kontrollü loglama (LOG_LEVEL ortam değişkeni)
+    logging.basicConfig(
+        level=app.config['LOG_LEVEL'],
+        format='%(asctime)s %(levelname)s [%(name)s] %(message)s'
+    )
+    
+    # Hızlı JSON sağlayıcısı (orjson yoksa varsayılan davranış korunur)
+    if app.config['JSON_PROVIDER'] == 'fast':
+        app.json = FastJSONProvider(app)
+    
     # Extensions
     db.init_app(app)
     jwt = JWTManager(app)
@@ -15,7 +29,8 @@ def create_app():
          resources={r"/api/*": {
              "origins": "*",
              "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-             "allow_headers": ["Content-Type", "Authorization"]
+             "allow_headers": ["Content-Type", "Authorization", "If-None-Match"],
+             "expose_headers": ["ETag"]
          }},
          supports_credentials=True)
     
@@ -26,21 +41,12 @@ def create_app():
     
     @jwt.invalid_token_loader
     def invalid_token_callback(error):
-        import traceback
-        print(f"=== INVALID TOKEN ERROR ===")
-        print(f"Error: {error}")
-        print(f"Request headers: {request.headers}")
-        print(f"Authorization header: {request.headers.get('Authorization', 'NOT FOUND')}")
-        traceback.print_exc()
+        logger.warning('Geçersiz token: endpoint=%s error=%s', request.path, error)
         return jsonify({'error': f'Geçersiz token: {str(error)}'}), 422
     
     @jwt.unauthorized_loader
     def missing_token_callback(error):
-        from flask import request
-        print(f"=== MISSING TOKEN ERROR ===")
-        print(f"Error: {error}")
-        print(f"Request headers: {request.headers}")
-        print(f"Authorization header: {request.headers.get('Authorization', 'NOT FOUND')}")
+        logger.warning('Token bulunamadı: endpoint=%s error=%s', request.path, error)
         return jsonify({'error': f'Token bulunamadı: {str(error)}'}), 422
     
     @jwt.needs_fresh_token_loader
@@ -60,6 +66,34 @@ def create_app():
     app.register_blueprint(student_bp, url_prefix='/api/student')
     app.register_blueprint(department_head_bp, url_prefix='/api/department-head')
     
+    # Raporlama endpoint'leri için okuma replikası yönlendirmesi
+    from services.read_replica import replica_router
+    replica_router.init_app(app)
+    
+    # bcrypt hashleme havuzu (ilk kullanımda başlatılır)
+    from services.password_hasher import password_hasher
+    password_hasher.init_app(app)
+    
+    # Otomatik kayıt tamponu
+    from services.answer_buffer import answer_buffer
+    answer_buffer.init_app(app)
+    
+    # Öğrenci olay akışı (SSE) yayın/abonelik
+    from services.events import event_broker
+    event_broker.init_app(app)
+    
+    # Otomatik gönderim zamanlayıcısı: ilk istekte başlatılır (gunicorn fork'undan sonra)
+    from services.scheduler import scheduler
+    scheduler.init_app(app)
+    if app.config['AUTO_SUBMIT_SCHEDULER']:
+        @app.before_request
+        def start_scheduler():
+            scheduler.start()
+    
+    # CLI komutları
+    from commands import register_commands
+    register_commands(app)
+    
     # Create tables
     with app.app_context():
         db.create_all()
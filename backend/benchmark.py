@@ -0,0 +1,609 @@
+"""
+Performans Benchmark Scripti
+Sıcak yolların sorgu sayısını ve süresini ölçer.
+
+Kullanım:
+    python benchmark.py statistics --sizes 100 1000 5000
+    python benchmark.py submissions --concurrency 500 --workers 32
+    python benchmark.py auth --requests 1000
+    python benchmark.py listing --sizes 100 1000
+    python benchmark.py serialization --requests 5000
+    python benchmark.py start-storm --concurrency 300 --workers 32
+    python benchmark.py explain --sizes 5000
+    python benchmark.py login-storm --concurrency 400 --workers 64
+    python benchmark.py delete --sizes 1000 10000 --questions 20 --chunk-size 5000
+
+Varsayılan olarak geçici bir SQLite veritabanı kullanılır. Gerçek bir
+PostgreSQL üzerinde ölçmek için BENCHMARK_DATABASE_URL verilebilir.
+DİKKAT: Benchmark veritabanındaki tüm tablolar silinip yeniden oluşturulur.
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+
+_db_file = os.path.join(tempfile.gettempdir(), 'exam_system_benchmark.db')
+os.environ['DATABASE_URL'] = os.environ.get('BENCHMARK_DATABASE_URL') or f'sqlite:///{_db_file}'
+
+from app import create_app
+from models import db, User, Department, Course, StudentCourse, Exam, Question, AnswerOption, ExamAttempt
+from datetime import timedelta
+from services.grade_service import refresh_course_grades
+from services.question_service import recalculate_exam_totals
+from utils.query_counter import count_queries
+from utils.timezone import get_istanbul_now
+
+
+def reset_database():
+    """Benchmark veritabanını sıfırla"""
+    db.drop_all()
+    db.create_all()
+
+
+def seed_data(student_count, course_count=4, questions_per_exam=5, options_per_question=4, courses_per_student=2):
+    """Toplu insert ile benchmark verisi oluştur
+
+    Her ders için bir vize ve bir final oluşturulur; her öğrenci
+    courses_per_student derse kayıtlı olur ve tüm sınavlarını göndermiş sayılır.
+    """
+    reset_database()
+    rng = random.Random(42)
+    now = get_istanbul_now()
+    template_user = User()
+    template_user.set_password('benchmark123')
+    password_hash = template_user.password_hash
+
+    department = Department(name='Benchmark Bölümü', code='BNC')
+    db.session.add(department)
+    instructor = User(email='instructor@bench.edu', role='instructor', name='Benchmark Hoca', password_hash=password_hash)
+    db.session.add(instructor)
+    db.session.flush()
+
+    courses = []
+    for i in range(course_count):
+        course = Course(code=f'BNC{i:03d}', name=f'Benchmark Dersi {i}', department_id=department.id, instructor_id=instructor.id)
+        db.session.add(course)
+        courses.append(course)
+    db.session.flush()
+
+    exams = []
+    for course in courses:
+        for exam_type, weight in (('vize', 40.0), ('final', 60.0)):
+            exam = Exam(
+                course_id=course.id,
+                instructor_id=instructor.id,
+                exam_type=exam_type,
+                start_time=now - timedelta(days=2),
+                end_time=now - timedelta(days=1),
+                duration_minutes=30,
+                weight_percentage=weight
+            )
+            db.session.add(exam)
+            exams.append(exam)
+    db.session.flush()
+
+    for exam in exams:
+        for q in range(questions_per_exam):
+            question = Question(exam_id=exam.id, question_text=f'Soru {q + 1}', points=rng.choice([1.0, 2.0, 5.0]))
+            db.session.add(question)
+            db.session.flush()
+            db.session.execute(db.insert(AnswerOption), [
+                {'question_id': question.id, 'option_text': f'Seçenek {o + 1}', 'is_correct': o == 0}
+                for o in range(options_per_question)
+            ])
+
+    db.session.execute(db.insert(User), [
+        {'email': f'student{i}@bench.edu', 'role': 'student', 'name': f'Öğrenci {i}', 'password_hash': password_hash}
+        for i in range(student_count)
+    ])
+    student_ids = [row[0] for row in db.session.query(User.id).filter_by(role='student').order_by(User.id).all()]
+
+    enrollments = []
+    attempts = []
+    exams_by_course = {}
+    for exam in exams:
+        exams_by_course.setdefault(exam.course_id, []).append(exam)
+
+    for student_id in student_ids:
+        for course in rng.sample(courses, min(courses_per_student, len(courses))):
+            enrollments.append({'student_id': student_id, 'course_id': course.id})
+            for exam in exams_by_course[course.id]:
+                attempts.append({
+                    'exam_id': exam.id,
+                    'student_id': student_id,
+                    'start_time': exam.start_time,
+                    'end_time': exam.start_time + timedelta(minutes=20),
+                    'submitted_at': exam.start_time + timedelta(minutes=20),
+                    'total_score': float(rng.randint(0, questions_per_exam))
+                })
+
+    db.session.execute(db.insert(StudentCourse), enrollments)
+    db.session.execute(db.insert(ExamAttempt), attempts)
+    recalculate_exam_totals()
+    refresh_course_grades()
+    db.session.commit()
+    return {'students': student_ids, 'courses': courses, 'exams': exams, 'instructor': instructor}
+
+
+def measure(label, func):
+    """Bir fonksiyonun sorgu sayısını ve süresini ölç"""
+    db.session.expunge_all()
+    with count_queries(db.engine) as counter:
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+    print(f'{label:<40} sorgu: {counter.count:>6}   süre: {elapsed * 1000:>9.1f} ms')
+    return counter.count, elapsed
+
+
+def bench_statistics(args):
+    """Bölüm başkanı istatistikleri: sorgu sayısı öğrenci sayısından bağımsız olmalı"""
+    from services.grade_service import get_department_statistics
+
+    query_counts = []
+    for size in args.sizes:
+        seed_data(size)
+        count, _ = measure(f'get_department_statistics ({size} öğrenci)', get_department_statistics)
+        query_counts.append(count)
+
+    if len(set(query_counts)) == 1:
+        print(f'✓ Sorgu sayısı sabit: {query_counts[0]}')
+    else:
+        print(f'✗ Sorgu sayısı öğrenci sayısıyla değişiyor: {query_counts}')
+
+
+def percentile(values, ratio):
+    """Sıralı olmayan bir listeden yüzdelik değer"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def bench_submissions(args):
+    """Sınav bitiminde eşzamanlı gönderim yükü: gönderim başına sorgu sayısı ve gecikme"""
+    from concurrent.futures import ThreadPoolExecutor
+    from flask import current_app
+    from services.exam_service import load_answer_key, grade_submission
+
+    seed_data(args.concurrency, course_count=1, courses_per_student=1, questions_per_exam=args.questions)
+    exam = Exam.query.filter_by(exam_type='vize').first()
+    ExamAttempt.query.filter_by(exam_id=exam.id).update({'submitted_at': None, 'end_time': None, 'total_score': 0.0})
+    db.session.commit()
+
+    # Her öğrenci için rastgele cevaplar
+    rng = random.Random(7)
+    answer_key = load_answer_key(exam.id)
+    options_by_question = {}
+    for option_id, (question_id, _, _) in answer_key['options'].items():
+        options_by_question.setdefault(question_id, []).append(option_id)
+    attempt_ids = [row[0] for row in db.session.query(ExamAttempt.id).filter_by(exam_id=exam.id).all()]
+    payloads = {
+        attempt_id: [
+            {'question_id': question_id, 'selected_option_id': rng.choice(option_ids)}
+            for question_id, option_ids in options_by_question.items()
+        ]
+        for attempt_id in attempt_ids
+    }
+
+    app = current_app._get_current_object()
+    # SQLite tek yazıcıyı destekler; gerçek eşzamanlılık için PostgreSQL kullanın
+    write_lock = threading.Lock() if db.engine.dialect.name == 'sqlite' else nullcontext()
+
+    def submit(attempt_id):
+        with app.app_context(), write_lock:
+            started = time.perf_counter()
+            attempt = db.session.get(ExamAttempt, attempt_id)
+            grade_submission(attempt, payloads[attempt_id])
+            now = get_istanbul_now()
+            attempt.submitted_at = now
+            attempt.end_time = now
+            refresh_course_grades(student_ids=[attempt.student_id], course_ids=[exam.course_id])
+            db.session.commit()
+            return time.perf_counter() - started
+
+    # Tek bir gönderimin sorgu sayısı
+    measure(f'tek gönderim ({args.questions} soru)', lambda: submit(attempt_ids[0]))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        latencies = list(executor.map(submit, attempt_ids[1:]))
+    elapsed = time.perf_counter() - started
+
+    print(f'{len(latencies)} eşzamanlı gönderim ({args.workers} iş parçacığı): toplam {elapsed:.2f} s, '
+          f'{len(latencies) / elapsed:.1f} gönderim/s')
+    print(f'gecikme p50: {percentile(latencies, 0.50) * 1000:.1f} ms   p99: {percentile(latencies, 0.99) * 1000:.1f} ms')
+
+
+def bench_start_storm(args):
+    """Sınav açılışında eşzamanlı start_exam: çift tıklama yarışları ve gecikme"""
+    from concurrent.futures import ThreadPoolExecutor
+    from collections import Counter
+    from flask import current_app
+    from services.exam_service import exam_paper_cache
+
+    seed_data(args.concurrency, course_count=1, courses_per_student=1, questions_per_exam=args.questions)
+    exam = Exam.query.filter_by(exam_type='vize').first()
+    now = get_istanbul_now()
+    exam.start_time = now - timedelta(minutes=1)
+    exam.end_time = now + timedelta(hours=1)
+    ExamAttempt.query.filter_by(exam_id=exam.id).delete()
+    db.session.commit()
+    exam_id = exam.id
+
+    students = User.query.filter_by(role='student').order_by(User.id).all()
+    headers = [_auth_headers(student) for student in students]
+    app = current_app._get_current_object()
+
+    def start(student_headers):
+        client = app.test_client()
+        started = time.perf_counter()
+        response = client.post(f'/api/student/exams/{exam_id}/start', headers=student_headers)
+        return response.status_code, time.perf_counter() - started
+
+    # 1) Aynı öğrenci için eşzamanlı tekrar eden istekler: tek giriş, hata yok
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(start, [headers[0]] * args.workers))
+    codes = Counter(code for code, _ in results)
+    attempts = ExamAttempt.query.filter_by(exam_id=exam_id, student_id=students[0].id).count()
+    print(f'aynı öğrenci, {args.workers} eşzamanlı istek: durum kodları {dict(codes)}, oluşan giriş: {attempts}')
+    assert attempts == 1 and set(codes) <= {200, 201}, codes
+
+    # 2) Tüm öğrenciler aynı anda başlatır (soru kağıdı önbelleği soğuk)
+    exam_paper_cache.clear()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(start, headers[1:]))
+    elapsed = time.perf_counter() - started
+    codes = Counter(code for code, _ in results)
+    latencies = [latency for _, latency in results]
+    print(f'{len(results)} öğrenci eşzamanlı başlatma ({args.workers} iş parçacığı): toplam {elapsed:.2f} s, '
+          f'durum kodları {dict(codes)}')
+    print(f'gecikme p50: {percentile(latencies, 0.50) * 1000:.1f} ms   p99: {percentile(latencies, 0.99) * 1000:.1f} ms   '
+          f'kağıt önbelleği: {exam_paper_cache.stats()}')
+
+
+def bench_login_storm(args):
+    """Sınav öncesi toplu giriş: bcrypt doğrulama havuzu açık/kapalı giriş ve diğer istek gecikmesi"""
+    from concurrent.futures import ThreadPoolExecutor
+    from collections import Counter
+    from flask import current_app
+    from services.password_hasher import password_hasher
+
+    seed_data(args.concurrency, course_count=1, courses_per_student=1, questions_per_exam=1)
+    emails = [row[0] for row in db.session.query(User.email).filter_by(role='student').order_by(User.id).all()]
+    app = current_app._get_current_object()
+    original_workers = app.config['PASSWORD_HASH_WORKERS']
+
+    def login(email):
+        client = app.test_client()
+        started = time.perf_counter()
+        response = client.post('/api/auth/login', json={'email': email, 'password': 'benchmark123'})
+        return response.status_code, time.perf_counter() - started
+
+    for workers in (0, original_workers or os.cpu_count() or 1):
+        app.config['PASSWORD_HASH_WORKERS'] = workers
+        password_hasher.init_app(app)
+        login(emails[0])  # ısınma (havuz süreçleri başlatılır)
+
+        # Fırtına sırasında hafif bir endpoint'in gecikmesi (diğer istekler bekliyor mu?)
+        stop = threading.Event()
+        other_latencies = []
+
+        def probe():
+            client = app.test_client()
+            while not stop.is_set():
+                started = time.perf_counter()
+                client.get('/api/auth/time')
+                other_latencies.append(time.perf_counter() - started)
+                time.sleep(0.01)
+
+        prober = threading.Thread(target=probe, daemon=True)
+        prober.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            results = list(executor.map(login, emails))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        prober.join()
+
+        codes = Counter(code for code, _ in results)
+        latencies = [latency for _, latency in results]
+        mode = f'havuz ({workers} süreç)' if workers else 'istek içinde'
+        print(f'{len(results)} eşzamanlı giriş, {mode}, bcrypt maliyeti {password_hasher.log_rounds}: '
+              f'toplam {elapsed:.2f} s, {len(results) / elapsed:.1f} giriş/s, durum kodları {dict(codes)}')
+        print(f'    giriş gecikmesi p50: {percentile(latencies, 0.50) * 1000:.1f} ms   p99: {percentile(latencies, 0.99) * 1000:.1f} ms')
+        if other_latencies:
+            print(f'    /api/auth/time p50: {percentile(other_latencies, 0.50) * 1000:.1f} ms   '
+                  f'p99: {percentile(other_latencies, 0.99) * 1000:.1f} ms')
+
+    app.config['PASSWORD_HASH_WORKERS'] = original_workers
+    password_hasher.init_app(app)
+
+
+def bench_auth(args):
+    """role_required: rol kaynağına göre korumalı istek gecikmesi ve sorgu sayısı"""
+    from flask import current_app
+    from flask_jwt_extended import create_access_token
+
+    seed_data(10, course_count=2)
+    student = User.query.filter_by(role='student').first()
+    token = create_access_token(identity=str(student.id), additional_claims={'role': student.role, 'email': student.email})
+    headers = {'Authorization': f'Bearer {token}'}
+
+    app = current_app._get_current_object()
+    client = app.test_client()
+    original_source = app.config['AUTH_ROLE_SOURCE']
+
+    for source in ('db', 'cached', 'claims'):
+        app.config['AUTH_ROLE_SOURCE'] = source
+        client.get('/api/student/courses', headers=headers)  # ısınma
+
+        latencies = []
+        with count_queries(db.engine) as counter:
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                response = client.get('/api/student/courses', headers=headers)
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.get_json()
+
+        print(f'AUTH_ROLE_SOURCE={source:<7} istek başına sorgu: {counter.count / args.requests:.2f}   '
+              f'p50: {percentile(latencies, 0.50) * 1000:.2f} ms   p99: {percentile(latencies, 0.99) * 1000:.2f} ms')
+
+    app.config['AUTH_ROLE_SOURCE'] = original_source
+
+
+def _auth_headers(user):
+    """Kullanıcı için Authorization başlığı"""
+    from flask_jwt_extended import create_access_token
+
+    token = create_access_token(identity=str(user.id), additional_claims={'role': user.role, 'email': user.email})
+    return {'Authorization': f'Bearer {token}'}
+
+
+def bench_listing(args):
+    """Liste endpoint'leri: yükleme planları ile sorgu sayısı satır sayısından bağımsız olmalı"""
+    from flask import current_app
+    from utils.query_counter import assert_max_queries
+
+    client = current_app.test_client()
+
+    for size in args.sizes:
+        # Her 10 öğrenci için bir ders (ve iki sınav)
+        data = seed_data(size, course_count=max(4, size // 10))
+        admin = User(email='admin@bench.edu', role='admin', name='Admin', password_hash=data['instructor'].password_hash)
+        db.session.add(admin)
+        db.session.commit()
+
+        student = User.query.filter_by(role='student').first()
+        endpoints = [
+            ('/api/admin/courses', _auth_headers(admin)),
+            ('/api/instructor/exams', _auth_headers(data['instructor'])),
+            ('/api/instructor/courses', _auth_headers(data['instructor'])),
+            ('/api/student/courses', _auth_headers(student)),
+        ]
+
+        for path, headers in endpoints:
+            client.get(path, headers=headers)  # ısınma (rol önbelleği)
+            db.session.remove()
+            started = time.perf_counter()
+            # Rol kontrolü (önbellekte) + tek sorgu; fazlası N+1 demektir
+            with assert_max_queries(db.engine, args.max_queries) as counter:
+                response = client.get(path, headers=headers)
+            elapsed = time.perf_counter() - started
+            assert response.status_code == 200, response.get_json()
+            print(f'{path:<28} ({size} öğrenci, {len(data["exams"])} sınav) sorgu: {counter.count:>3}   '
+                  f'süre: {elapsed * 1000:>8.1f} ms')
+
+
+def _sample_objects(count):
+    """Veritabanına yazmadan, ilişkileri dolu örnek model nesneleri oluştur"""
+    from datetime import datetime
+    from models import StudentAnswer, CourseGrade
+
+    now = datetime.utcnow()
+    department = Department(id=1, name='Bilgisayar Mühendisliği', code='BM')
+    instructor = User(id=1, email='hoca@bench.edu', role='instructor', name='Öğretim Üyesi', created_at=now)
+    course = Course(id=1, code='BM101', name='Programlama', department_id=1, instructor_id=1,
+                    department=department, instructor=instructor)
+    exam = Exam(id=1, course_id=1, instructor_id=1, exam_type='vize', start_time=now, end_time=now,
+                duration_minutes=10, weight_percentage=40.0, max_points=20.0, question_count=5,
+                created_at=now, course=course)
+
+    objects = {}
+    objects['User'] = [User(id=i, email=f'ogrenci{i}@bench.edu', role='student', name=f'Öğrenci {i}', created_at=now)
+                       for i in range(count)]
+    objects['Course'] = [Course(id=i, code=f'C{i}', name=f'Ders {i}', department_id=1, instructor_id=1,
+                                department=department, instructor=instructor) for i in range(count)]
+    objects['StudentCourse'] = [StudentCourse(id=i, student_id=i, course_id=1, enrollment_date=now, course=course,
+                                              student=objects['User'][i]) for i in range(count)]
+    objects['Exam'] = [Exam(id=i, course_id=1, instructor_id=1, exam_type='final', start_time=now, end_time=now,
+                            duration_minutes=10, weight_percentage=60.0, max_points=20.0, question_count=5,
+                            created_at=now, course=course) for i in range(count)]
+    objects['Question'] = [Question(id=i, exam_id=1, question_text=f'Soru {i}', question_type='multiple_choice', points=4.0,
+                                    answer_options=[AnswerOption(id=i * 4 + j, question_id=i, option_text=f'Şık {j}',
+                                                                 is_correct=j == 0) for j in range(4)])
+                           for i in range(count)]
+    objects['ExamAttempt'] = [ExamAttempt(id=i, exam_id=1, student_id=i, start_time=now, end_time=now, submitted_at=now,
+                                          total_score=12.0, exam=exam, student=objects['User'][i]) for i in range(count)]
+    objects['StudentAnswer'] = [StudentAnswer(id=i, attempt_id=i, question_id=i, selected_option_id=i * 4,
+                                              is_correct=True, points_earned=4.0) for i in range(count)]
+    objects['CourseGrade'] = [CourseGrade(id=i, student_id=i, course_id=1, vize_score=60.0, final_score=80.0,
+                                          vize_weight=40.0, final_weight=60.0, final_grade=72.0, updated_at=now)
+                              for i in range(count)]
+    return objects
+
+
+def bench_serialization(args):
+    """Model serileştirme mikro-benchmark'ı: to_dict() ve JSON kodlama süreleri"""
+    from flask import current_app
+    from flask.json.provider import DefaultJSONProvider
+    from utils.json_provider import FastJSONProvider
+
+    app = current_app._get_current_object()
+    providers = {'default': DefaultJSONProvider(app), 'fast': FastJSONProvider(app)}
+    if not FastJSONProvider.available:
+        print('orjson kurulu değil: fast sağlayıcı varsayılan kodlayıcıyı kullanıyor')
+
+    for model, items in _sample_objects(args.requests).items():
+        started = time.perf_counter()
+        payload = [item.to_dict() for item in items]
+        to_dict_elapsed = time.perf_counter() - started
+
+        timings = []
+        for name, provider in providers.items():
+            started = time.perf_counter()
+            provider.response(payload)
+            timings.append(f'{name}: {(time.perf_counter() - started) * 1000:>7.1f} ms')
+
+        print(f'{model:<14} ({len(items)} nesne) to_dict: {to_dict_elapsed * 1000:>7.1f} ms   json ' + '   '.join(timings))
+
+
+def _explain(statement):
+    """Sorgunun planını satır listesi olarak döndür (PostgreSQL: EXPLAIN, SQLite: EXPLAIN QUERY PLAN)"""
+    connection = db.session.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    if compiled.positional:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+    prefix = 'EXPLAIN ' if connection.dialect.name == 'postgresql' else 'EXPLAIN QUERY PLAN '
+    return [row[-1] for row in connection.exec_driver_sql(prefix + str(compiled), params)]
+
+
+def bench_explain(args):
+    """Sıcak sorguların planlarının beklenen indeksleri kullandığını doğrula"""
+    from sqlalchemy import select, func
+    from models import StudentAnswer
+
+    data = seed_data(max(args.sizes))
+    now = get_istanbul_now()
+    courses, exams, student_ids = data['courses'], data['exams'], data['students']
+
+    # Planlayıcının tam tarama seçmemesi için gerçekçi miktarda geçmiş sınav ve cevap
+    db.session.execute(db.insert(Exam), [
+        {'course_id': course.id, 'instructor_id': data['instructor'].id, 'exam_type': 'vize',
+         'start_time': now - timedelta(days=400 + i), 'end_time': now - timedelta(days=400 + i) + timedelta(hours=1),
+         'duration_minutes': 30, 'weight_percentage': 40.0}
+        for course in courses for i in range(500)
+    ])
+    question_ids = [row[0] for row in db.session.query(Question.id).filter_by(exam_id=exams[0].id)]
+    attempt_ids = [row[0] for row in db.session.query(ExamAttempt.id).filter_by(exam_id=exams[0].id)]
+    db.session.execute(db.insert(StudentAnswer), [
+        {'attempt_id': attempt_id, 'question_id': question_id}
+        for attempt_id in attempt_ids for question_id in question_ids
+    ])
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+    attempt = db.session.query(ExamAttempt).first()
+    checks = [
+        ('Giriş (exam_id, student_id)',
+         select(ExamAttempt.id).where(ExamAttempt.exam_id == attempt.exam_id, ExamAttempt.student_id == attempt.student_id),
+         ('unique_exam_student', 'sqlite_autoindex_exam_attempts')),
+        ('Cevap (attempt_id, question_id)',
+         select(StudentAnswer.id).where(StudentAnswer.attempt_id == attempt_ids[0], StudentAnswer.question_id == question_ids[0]),
+         ('unique_attempt_question', 'sqlite_autoindex_student_answers')),
+        ('Sınav listesi (course_id, end_time >= şimdi)',
+         select(Exam.id).where(Exam.course_id == courses[0].id, Exam.end_time >= now),
+         ('idx_exams_course_end',)),
+        ('Gönderilmiş girişler (sonuç/istatistik)',
+         select(func.count(ExamAttempt.id), func.sum(ExamAttempt.total_score)).where(
+             ExamAttempt.exam_id == exams[0].id, ExamAttempt.submitted_at.isnot(None)),
+         ('idx_exam_attempts_submitted',)),
+        ('Açık girişler (zamanlayıcı)',
+         select(ExamAttempt.id).where(ExamAttempt.submitted_at.is_(None)),
+         ('idx_exam_attempts_open',)),
+        ('Sonraki kapanış (zamanlayıcı)',
+         select(func.min(Exam.end_time)).where(Exam.end_time > now),
+         ('idx_exams_end',)),
+        ('Öğrencinin girişleri',
+         select(ExamAttempt.id).where(ExamAttempt.student_id == student_ids[0]),
+         ('idx_exam_attempts_student',)),
+    ]
+
+    failures = 0
+    for label, statement, expected in checks:
+        plan = _explain(statement)
+        ok = any(name in line for line in plan for name in expected)
+        failures += not ok
+        print(f'{"✓" if ok else "✗"} {label}')
+        for line in plan:
+            print(f'      {line}')
+    print(f'{len(checks) - failures}/{len(checks)} sorgu beklenen indeksi kullanıyor')
+
+
+def bench_delete(args):
+    """Büyük bir dersin kademeli silinmesi: kuru çalıştırma, parça parça silme süresi ve bellek"""
+    import tracemalloc
+    from flask import current_app
+    from models import StudentAnswer
+    from services.deletion_service import course_deletion_plan, count_plan, delete_course_cascade
+
+    chunk_size = args.chunk_size or current_app.config['DELETE_CHUNK_SIZE']
+    for size in args.sizes:
+        data = seed_data(size, course_count=2, courses_per_student=2, questions_per_exam=args.questions)
+        course_id = data['courses'][0].id
+        # Dersin her girişine her soru için bir cevap (INSERT ... SELECT)
+        db.session.execute(db.insert(StudentAnswer).from_select(
+            ['attempt_id', 'question_id', 'is_correct', 'points_earned'],
+            db.select(ExamAttempt.id, Question.id, db.false(), db.literal(0.0))
+            .join(Question, Question.exam_id == ExamAttempt.exam_id)
+            .join(Exam, Exam.id == ExamAttempt.exam_id)
+            .where(Exam.course_id == course_id)
+        ))
+        db.session.commit()
+
+        plan = course_deletion_plan(course_id)
+        counts = {}
+        measure(f'kuru çalıştırma ({size} öğrenci)', lambda: counts.update(count_plan(plan)))
+        print(f'    {sum(counts.values())} satır: ' + ', '.join(f'{table}={count}' for table, count in counts.items()))
+
+        deleted = {}
+        tracemalloc.start()
+        measure(f'silme ({size} öğrenci, parça {chunk_size})', lambda: deleted.update(delete_course_cascade(course_id, chunk_size)))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'    en yüksek Python belleği: {peak / 1024 / 1024:.1f} MB')
+
+        remaining = count_plan(plan)
+        if deleted == counts and not any(remaining.values()):
+            print('✓ Kuru çalıştırma sayıları silinen satırlarla aynı, ders verisi kalmadı')
+        else:
+            print(f'✗ Silinen {deleted}, beklenen {counts}, kalan {remaining}')
+
+
+SCENARIOS = {
+    'statistics': bench_statistics,
+    'submissions': bench_submissions,
+    'auth': bench_auth,
+    'listing': bench_listing,
+    'serialization': bench_serialization,
+    'start-storm': bench_start_storm,
+    'explain': bench_explain,
+    'login-storm': bench_login_storm,
+    'delete': bench_delete,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Online Sınav Sistemi performans benchmark scripti')
+    parser.add_argument('scenario', choices=sorted(SCENARIOS))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000], help='Öğrenci sayıları')
+    parser.add_argument('--concurrency', type=int, default=500, help='Eşzamanlı istek sayısı')
+    parser.add_argument('--workers', type=int, default=32, help='İş parçacığı sayısı')
+    parser.add_argument('--questions', type=int, default=20, help='Sınav başına soru sayısı')
+    parser.add_argument('--requests', type=int, default=1000, help='Senaryo başına istek sayısı')
+    parser.add_argument('--max-queries', type=int, default=2, help='Liste endpoint\'leri için izin verilen en fazla sorgu')
+    parser.add_argument('--chunk-size', type=int, default=None, help='Kademeli silmede parça boyutu (varsayılan DELETE_CHUNK_SIZE)')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        SCENARIOS[args.scenario](args)
+
+
+if __name__ == '__main__':
+    main()
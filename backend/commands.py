@@ -0,0 +1,75 @@
+"""
+Bakım komutları (Flask CLI)
+
+Kullanım:
+    flask --app app rebuild-course-grades
+    flask --app app check-exam-totals [--fix]
+    flask --app app run-scheduler
+"""
+import click
+from flask.cli import with_appcontext
+from models import db
+
+
+@click.command('rebuild-course-grades')
+@with_appcontext
+def rebuild_course_grades_command():
+    """course_grades tablosunu ham sınav girişlerinden yeniden oluştur"""
+    from services.grade_service import refresh_course_grades
+
+    count = refresh_course_grades()
+    db.session.commit()
+    click.echo(f'✓ {count} ders notu yeniden hesaplandı')
+
+
+@click.command('check-exam-totals')
+@click.option('--fix', is_flag=True, help='Tutarsız değerleri sorular tablosundan yeniden hesapla')
+@with_appcontext
+def check_exam_totals_command(fix):
+    """Sınavların soru sayısı ve maksimum puan sütunlarını doğrula"""
+    from services.question_service import find_inconsistent_exam_totals, recalculate_exam_totals
+    from services.grade_service import refresh_course_grades
+    from models import Exam
+
+    mismatches = find_inconsistent_exam_totals()
+    if not mismatches:
+        click.echo('✓ Tüm sınavların soru sayısı ve maksimum puanı tutarlı')
+        return
+
+    for item in mismatches:
+        click.echo(
+            f"✗ Sınav {item['exam_id']}: soru sayısı {item['stored_question_count']} "
+            f"(gerçek {item['actual_question_count']}), maksimum puan {item['stored_max_points']} "
+            f"(gerçek {item['actual_max_points']})"
+        )
+
+    if not fix:
+        raise SystemExit(1)
+
+    exam_ids = [item['exam_id'] for item in mismatches]
+    recalculate_exam_totals(exam_ids)
+    course_ids = [row[0] for row in db.session.query(Exam.course_id).filter(Exam.id.in_(exam_ids)).distinct()]
+    refresh_course_grades(course_ids=course_ids)
+    db.session.commit()
+    click.echo(f'✓ {len(exam_ids)} sınav düzeltildi')
+
+
+@click.command('run-scheduler')
+@with_appcontext
+def run_scheduler_command():
+    """Otomatik gönderim zamanlayıcısını ayrı bir süreç olarak ön planda çalıştır"""
+    from services.scheduler import scheduler
+
+    click.echo('Otomatik gönderim zamanlayıcısı çalışıyor (durdurmak için Ctrl+C)')
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        scheduler.stop()
+    click.echo(f'✓ {scheduler.submitted_count} giriş otomatik gönderildi')
+
+
+def register_commands(app):
+    """CLI komutlarını uygulamaya kaydet"""
+    app.cli.add_command(rebuild_course_grades_command)
+    app.cli.add_command(check_exam_totals_command)
+    app.cli.add_command(run_scheduler_command)
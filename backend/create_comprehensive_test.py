@@ -3,9 +3,10 @@ Tam Teşekküllü Test Verileri Oluşturma Scripti
 Bu script proje gereksinimlerine göre Türkçe isimlerle test verileri oluşturur.
 """
 from app import create_app
-from models import db, User, Department, Course, StudentCourse, Exam, Question, AnswerOption, ExamAttempt, StudentAnswer
+from models import db, User, Department, Course, StudentCourse, Exam, Question, AnswerOption, ExamAttempt, StudentAnswer, CourseGrade
 from datetime import datetime, timedelta, timezone
 from utils.timezone import get_istanbul_now, parse_istanbul_datetime, get_istanbul_time
+from services.question_service import recalculate_exam_totals
 
 def cleanup_data():
     """Mevcut tüm verileri temizle (admin hariç)"""
@@ -16,6 +17,7 @@ def cleanup_data():
     admin_id = admin_user.id if admin_user else None
     
     # Tüm verileri sil
+    CourseGrade.query.delete()
     StudentAnswer.query.delete()
     ExamAttempt.query.delete()
     AnswerOption.query.delete()
@@ -292,6 +294,8 @@ def create_test_data():
                     
                     print(f"✓ {course.code} - {exam.exam_type.upper()}: 5 soru eklendi")
         
+        # Sınavların soru sayısı ve maksimum puan sütunlarını güncelle
+        recalculate_exam_totals()
         db.session.commit()
         
         # Gereksinimleri doğrula
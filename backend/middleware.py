@@ -1,42 +1,92 @@
+import logging
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
-from models import User
+from flask import jsonify, current_app
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from config import Config
+from models import db, User
+from services.read_replica import replica_router, REPLICA_BIND_KEY
+from utils.cache import LRUCache
 
+logger = logging.getLogger(__name__)
 
-def role_required(*roles):
-    """Rol bazlı erişim kontrolü decorator"""
+# user_id -> veritabanındaki rol (kullanıcı silinmişse None)
+role_cache = LRUCache(maxsize=Config.AUTH_ROLE_CACHE_SIZE, ttl=Config.AUTH_ROLE_CACHE_TTL)
+
+
+def _load_role(user_id):
+    """Kullanıcının güncel rolünü veritabanından oku"""
+    row = db.session.query(User.role).filter_by(id=user_id).first()
+    return row[0] if row else None
+
+
+def invalidate_user_role(user_id):
+    """Kullanıcı silindiğinde veya rolü değiştiğinde önbellekteki rolü sil"""
+    role_cache.invalidate(user_id)
+
+
+def get_current_role(user_id, claims):
+    """AUTH_ROLE_SOURCE ayarına göre isteği yapan kullanıcının rolünü belirle"""
+    source = current_app.config.get('AUTH_ROLE_SOURCE', 'cached')
+    claimed_role = claims.get('role')
+    
+    # Rol claim'i olmayan eski token'lar için her zaman veritabanına bak
+    if source == 'db' or claimed_role is None:
+        return _load_role(user_id)
+    
+    if source == 'claims':
+        return claimed_role
+    
+    # 'cached': token'daki rol, güncel rol ile eşleşmiyorsa (silinmiş/rolü değişmiş) reddedilir
+    current_role = role_cache.get_or_load(user_id, lambda: _load_role(user_id))
+    return claimed_role if claimed_role == current_role else None
+
+
+def role_required(*roles, locations=None):
+    """Rol bazlı erişim kontrolü decorator (locations: token konumları, varsayılan JWT_TOKEN_LOCATION)"""
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             from flask import request
             try:
-                # Debug: Token'ı kontrol et
-                auth_header = request.headers.get('Authorization', '')
-                print(f"=== ROLE REQUIRED DEBUG ===")
-                print(f"Endpoint: {request.path}")
-                print(f"Authorization header: {auth_header[:50] if auth_header else 'NOT FOUND'}")
-                
-                verify_jwt_in_request()
+                verify_jwt_in_request(locations=locations)
                 current_user_id_str = get_jwt_identity()
                 # Token'da string olarak saklanıyor, integer'a çevir
                 current_user_id = int(current_user_id_str) if current_user_id_str else None
-                user = User.query.get(current_user_id)
+                role = get_current_role(current_user_id, get_jwt())
                 
-                if not user or user.role not in roles:
+                if role not in roles:
+                    logger.info('Yetkisiz erişim: user_id=%s role=%s endpoint=%s', current_user_id, role, request.path)
                     return jsonify({'error': 'Bu işlem için yetkiniz yok'}), 403
                 
                 return f(*args, **kwargs)
             except Exception as e:
-                import traceback
                 error_msg = str(e)
-                print(f"=== MIDDLEWARE ERROR ===")
-                print(f"Error: {error_msg}")
-                print(f"Authorization header: {request.headers.get('Authorization', 'NOT FOUND')}")
-                traceback.print_exc()
+                logger.warning('Kimlik doğrulama hatası: endpoint=%s error=%s', request.path, error_msg)
+                logger.debug('Kimlik doğrulama hatası ayrıntısı', exc_info=True)
                 if 'token' in error_msg.lower() or 'authorization' in error_msg.lower():
                     return jsonify({'error': 'Token bulunamadı veya geçersiz. Lütfen giriş yapın.'}), 401
                 return jsonify({'error': f'Kimlik doğrulama hatası: {error_msg}'}), 401
         return decorated_function
     return decorator
 
+
+def replica_read(max_staleness=None):
+    """Salt okunur raporlama endpoint'inin SELECT'lerini okuma replikasına yönlendiren decorator
+
+    max_staleness: kabul edilen en fazla replika gecikmesi (saniye, varsayılan REPLICA_MAX_STALENESS).
+    Gecikme aşılırsa veya replika yoksa istek birincil veritabanından okunur.
+    role_required'dan sonra (altında) kullanılmalıdır; yetki kontrolü birincilde yapılır.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            budget = current_app.config['REPLICA_MAX_STALENESS'] if max_staleness is None else max_staleness
+            if not replica_router.use_replica(budget):
+                return f(*args, **kwargs)
+            db.session.info[REPLICA_BIND_KEY] = True
+            try:
+                return f(*args, **kwargs)
+            finally:
+                db.session.info.pop(REPLICA_BIND_KEY, None)
+        return decorated_function
+    return decorator
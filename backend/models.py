@@ -1,9 +1,24 @@
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from datetime import datetime, timezone
 from werkzeug.security import generate_password_hash, check_password_hash
-import bcrypt
+from services.password_hasher import password_hasher
+from services.read_replica import RoutingSession
 
-db = SQLAlchemy()
+# Oturum, replica_read ile işaretli isteklerde SELECT'leri okuma replikasına yönlendirir
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+def format_utc_datetime(dt):
+    """UTC zamanını timezone bilgisiyle ISO formatında döndür ('Z' sonekli)"""
+    if dt is None:
+        return None
+    # Naive datetime ise UTC olarak kabul et ve 'Z' ekle
+    if dt.tzinfo is None:
+        return dt.isoformat() + 'Z'
+    # Timezone'lu datetime ise UTC'ye çevir
+    if dt.tzinfo is not timezone.utc:
+        dt = dt.astimezone(timezone.utc)
+    return dt.isoformat().replace('+00:00', 'Z')
 
 
 class User(db.Model):
@@ -15,6 +30,7 @@ class User(db.Model):
     role = db.Column(db.String(50), nullable=False)  # admin, department_head, instructor, student
     name = db.Column(db.String(200), nullable=True)  # Türkçe isim
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Koşullu GET (ETag) sürümü
     
     # Relationships
     courses_taught = db.relationship('Course', backref='instructor', lazy=True, foreign_keys='Course.instructor_id')
@@ -23,12 +39,23 @@ class User(db.Model):
     exams_created = db.relationship('Exam', backref='instructor', lazy=True)
     
     def set_password(self, password):
-        """Şifreyi hash'le ve kaydet"""
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        """Şifreyi hash'le ve kaydet (BCRYPT_LOG_ROUNDS maliyetiyle, hashleme havuzunda)"""
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        """Şifreyi kontrol et"""
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        """Şifreyi kontrol et (hashleme havuzunda)"""
+        return password_hasher.verify(password, self.password_hash)
+    
+    def rehash_password_if_needed(self, password):
+        """Şifre farklı bir bcrypt maliyetiyle hashlenmişse yeni maliyetle yeniden hashle
+        
+        Doğru şifre ile başarılı girişten sonra çağrılır; değişiklik yapıldıysa True döner.
+        """
+        if not password_hasher.needs_rehash(self.password_hash):
+            return False
+        self.set_password(password)
+        password_hasher.rehash_count += 1
+        return True
     
     def to_dict(self):
         return {
@@ -46,6 +73,7 @@ class Department(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     code = db.Column(db.String(20), unique=True, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Koşullu GET (ETag) sürümü
     
     courses = db.relationship('Course', backref='department', lazy=True)
     
@@ -65,20 +93,24 @@ class Course(db.Model):
     name = db.Column(db.String(200), nullable=False)
     department_id = db.Column(db.Integer, db.ForeignKey('departments.id'), nullable=False)
     instructor_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Koşullu GET (ETag) sürümü
     
     student_courses = db.relationship('StudentCourse', backref='course', lazy=True, cascade='all, delete-orphan')
     exams = db.relationship('Exam', backref='course', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        return {
+    def to_dict(self, shallow=False):
+        data = {
             'id': self.id,
             'code': self.code,
             'name': self.name,
             'department_id': self.department_id,
-            'instructor_id': self.instructor_id,
-            'department': self.department.to_dict() if self.department else None,
-            'instructor': self.instructor.to_dict() if self.instructor else None
+            'instructor_id': self.instructor_id
         }
+        # shallow modda iç içe nesneler eklenmez (istemci id'ler ile eşleştirir)
+        if not shallow:
+            data['department'] = self.department.to_dict() if self.department else None
+            data['instructor'] = self.instructor.to_dict() if self.instructor else None
+        return data
 
 
 class StudentCourse(db.Model):
@@ -89,17 +121,23 @@ class StudentCourse(db.Model):
     course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False)
     enrollment_date = db.Column(db.DateTime, default=datetime.utcnow)
     
-    __table_args__ = (db.UniqueConstraint('student_id', 'course_id', name='unique_student_course'),)
+    # (student_id, course_id) benzersizliği öğrenci aramalarını da karşılar
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'course_id', name='unique_student_course'),
+        db.Index('idx_student_courses_course', 'course_id'),
+    )
     
-    def to_dict(self):
-        return {
+    def to_dict(self, shallow=False):
+        data = {
             'id': self.id,
             'student_id': self.student_id,
             'course_id': self.course_id,
-            'enrollment_date': self.enrollment_date.isoformat() if self.enrollment_date else None,
-            'course': self.course.to_dict() if self.course else None,
-            'student': self.student.to_dict() if self.student else None
+            'enrollment_date': self.enrollment_date.isoformat() if self.enrollment_date else None
         }
+        if not shallow:
+            data['course'] = self.course.to_dict() if self.course else None
+            data['student'] = self.student.to_dict() if self.student else None
+        return data
 
 
 class Exam(db.Model):
@@ -113,26 +151,25 @@ class Exam(db.Model):
     end_time = db.Column(db.DateTime, nullable=False)
     duration_minutes = db.Column(db.Integer, default=10, nullable=False)
     weight_percentage = db.Column(db.Float, nullable=False)  # 0-100 arası
+    max_points = db.Column(db.Float, default=0.0, nullable=False)  # Soruların toplam puanı (soru yazımlarında güncellenir)
+    question_count = db.Column(db.Integer, default=0, nullable=False)  # Soru sayısı (soru yazımlarında güncellenir)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Koşullu GET (ETag) sürümü
+    
+    # İndeksler database/migrations/009_hot_lookup_indexes.sql ile aynıdır
+    __table_args__ = (
+        db.Index('idx_exams_course_end', 'course_id', 'end_time'),  # öğrenci sınav listesi: ders + bitmemiş
+        db.Index('idx_exams_instructor', 'instructor_id'),
+        db.Index('idx_exams_time', 'start_time', 'end_time'),
+        db.Index('idx_exams_end', 'end_time'),  # zamanlayıcı: bir sonraki kapanış
+    )
     
     questions = db.relationship('Question', backref='exam', lazy=True, cascade='all, delete-orphan')
     attempts = db.relationship('ExamAttempt', backref='exam', lazy=True)
     
-    def to_dict(self):
+    def to_dict(self, shallow=False):
         # UTC zamanlarını ISO formatında UTC olarak gönder (timezone bilgisi ile)
-        def format_utc_datetime(dt):
-            if dt is None:
-                return None
-            # Naive datetime ise UTC olarak kabul et ve 'Z' ekle
-            if dt.tzinfo is None:
-                return dt.isoformat() + 'Z'
-            # Timezone'lu datetime ise UTC'ye çevir
-            from datetime import timezone
-            if dt.tzinfo != timezone.utc:
-                dt = dt.astimezone(timezone.utc)
-            return dt.isoformat().replace('+00:00', 'Z')
-        
-        return {
+        data = {
             'id': self.id,
             'course_id': self.course_id,
             'instructor_id': self.instructor_id,
@@ -141,9 +178,13 @@ class Exam(db.Model):
             'end_time': format_utc_datetime(self.end_time),
             'duration_minutes': self.duration_minutes,
             'weight_percentage': self.weight_percentage,
-            'created_at': format_utc_datetime(self.created_at),
-            'course': self.course.to_dict() if self.course else None
+            'max_points': self.max_points,
+            'question_count': self.question_count,
+            'created_at': format_utc_datetime(self.created_at)
         }
+        if not shallow:
+            data['course'] = self.course.to_dict() if self.course else None
+        return data
 
 
 class Question(db.Model):
@@ -155,6 +196,8 @@ class Question(db.Model):
     question_type = db.Column(db.String(50), default='multiple_choice', nullable=False)
     points = db.Column(db.Float, default=1.0, nullable=False)
     
+    __table_args__ = (db.Index('idx_questions_exam', 'exam_id'),)
+    
     answer_options = db.relationship('AnswerOption', backref='question', lazy=True, cascade='all, delete-orphan')
     student_answers = db.relationship('StudentAnswer', backref='question', lazy=True)
     
@@ -178,6 +221,8 @@ class AnswerOption(db.Model):
     option_text = db.Column(db.Text, nullable=False)
     is_correct = db.Column(db.Boolean, default=False, nullable=False)
     
+    __table_args__ = (db.Index('idx_answer_options_question', 'question_id'),)
+    
     student_answers = db.relationship('StudentAnswer', backref='selected_option', lazy=True)
     
     def to_dict(self, include_correct=False):
@@ -201,23 +246,42 @@ class ExamAttempt(db.Model):
     end_time = db.Column(db.DateTime, nullable=True)
     submitted_at = db.Column(db.DateTime, nullable=True)
     total_score = db.Column(db.Float, default=0.0, nullable=False)
+    question_seed = db.Column(db.Integer, nullable=True)  # Soru/şık sıralaması için tohum (start_exam'de üretilir)
     
-    __table_args__ = (db.UniqueConstraint('exam_id', 'student_id', name='unique_exam_student'),)
+    # (exam_id, student_id) benzersizliği sınav bazlı aramaları da karşılar
+    __table_args__ = (
+        db.UniqueConstraint('exam_id', 'student_id', name='unique_exam_student'),
+        db.Index('idx_exam_attempts_student', 'student_id'),
+        # Sonuç/istatistik aggregate'leri: yalnızca gönderilmiş girişler (total_score ile index-only)
+        db.Index(
+            'idx_exam_attempts_submitted', 'exam_id', 'total_score',
+            postgresql_where=db.text('submitted_at IS NOT NULL'),
+            sqlite_where=db.text('submitted_at IS NOT NULL')
+        ),
+        # Zamanlayıcı: açık girişler (küçük kalır)
+        db.Index(
+            'idx_exam_attempts_open', 'exam_id',
+            postgresql_where=db.text('submitted_at IS NULL'),
+            sqlite_where=db.text('submitted_at IS NULL')
+        ),
+    )
     
     student_answers = db.relationship('StudentAnswer', backref='attempt', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        return {
+    def to_dict(self, shallow=False):
+        data = {
             'id': self.id,
             'exam_id': self.exam_id,
             'student_id': self.student_id,
             'start_time': self.start_time.isoformat() if self.start_time else None,
             'end_time': self.end_time.isoformat() if self.end_time else None,
             'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None,
-            'total_score': self.total_score,
-            'exam': self.exam.to_dict() if self.exam else None,
-            'student': self.student.to_dict() if self.student else None
+            'total_score': self.total_score
         }
+        if not shallow:
+            data['exam'] = self.exam.to_dict() if self.exam else None
+            data['student'] = self.student.to_dict() if self.student else None
+        return data
 
 
 class StudentAnswer(db.Model):
@@ -230,6 +294,12 @@ class StudentAnswer(db.Model):
     is_correct = db.Column(db.Boolean, default=False, nullable=False)
     points_earned = db.Column(db.Float, default=0.0, nullable=False)
     
+    # Otomatik kayıt (autosave) soru başına tek satırı günceller
+    __table_args__ = (
+        db.UniqueConstraint('attempt_id', 'question_id', name='unique_attempt_question'),
+        db.Index('idx_student_answers_question', 'question_id'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -240,3 +310,28 @@ class StudentAnswer(db.Model):
             'points_earned': self.points_earned
         }
 
+
+class CourseGrade(db.Model):
+    """Ders notları için önceden hesaplanmış okuma modeli (sınav gönderiminde güncellenir)"""
+    __tablename__ = 'course_grades'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False, index=True)
+    vize_score = db.Column(db.Float, default=0.0, nullable=False)
+    final_score = db.Column(db.Float, default=0.0, nullable=False)
+    vize_weight = db.Column(db.Float, default=0.0, nullable=False)
+    final_weight = db.Column(db.Float, default=0.0, nullable=False)
+    final_grade = db.Column(db.Float, default=0.0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (db.UniqueConstraint('student_id', 'course_id', name='unique_course_grade'),)
+    
+    def to_dict(self):
+        return {
+            'vize_score': self.vize_score,
+            'final_score': self.final_score,
+            'vize_weight': self.vize_weight,
+            'final_weight': self.final_weight,
+            'final_grade': self.final_grade
+        }
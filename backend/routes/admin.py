@@ -1,12 +1,27 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, Course, Department, StudentCourse, Exam
+from models import db, User, Course, Department, StudentCourse, Exam, CourseGrade
 from middleware import role_required
+from services.exam_service import invalidate_student_feed
+from services.events import event_broker, student_channel, ENROLLMENT_CHANGED
+from services.user_import import detect_format, iter_rows, import_users, ImportFormatError
+from services.enrollment_service import expand_pairs, bulk_enroll, EnrollmentRequestError
+from services.deletion_service import (
+    user_deletion_plan, course_deletion_plan, count_plan, delete_user_cascade, delete_course_cascade
+)
+from serializers import paginated_courses, USER_SORT_OPTIONS
+from utils.pagination import paginate, requested_fields, project, PaginationError
+from sqlalchemy import or_, func
 from datetime import datetime
 
 admin_bp = Blueprint('admin', __name__)
 
 
+def _flag(name):
+    """Sorgu parametresini boolean olarak oku (?force=true, ?dry_run=1)"""
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
+
 @admin_bp.route('/users', methods=['POST'])
 @jwt_required()
 @role_required('admin')
@@ -59,24 +74,82 @@ def create_user():
         return jsonify({'error': str(e)}), 500
 
 
+@admin_bp.route('/users/import', methods=['POST'])
+@jwt_required()
+@role_required('admin')
+def import_users_file():
+    """CSV veya JSONL dosyasından toplu kullanıcı ekleme (satır bazlı hata raporu ile)
+    
+    Dosya multipart 'file' alanında veya doğrudan istek gövdesinde gönderilir;
+    satır satır okunur. Biçim ?format=csv|jsonl, dosya uzantısı veya
+    Content-Type ile belirlenir.
+    """
+    try:
+        upload = request.files.get('file')
+        if upload is not None:
+            stream, file_format = upload.stream, detect_format(upload.filename, upload.mimetype, request.args.get('format'))
+        else:
+            stream, file_format = request.stream, detect_format(None, request.mimetype, request.args.get('format'))
+        
+        result = import_users(
+            iter_rows(stream, file_format),
+            batch_size=current_app.config['USER_IMPORT_BATCH_SIZE'],
+            max_errors=current_app.config['USER_IMPORT_MAX_ERRORS']
+        )
+        
+        # Toplam sayılar tek sorguda
+        role_counts = dict(db.session.query(User.role, func.count(User.id)).group_by(User.role).all())
+        total_students = role_counts.get('student', 0)
+        total_instructors = role_counts.get('instructor', 0)
+        
+        warnings = []
+        if total_students < 10:
+            warnings.append(f'Minimum 10 öğrenci gereklidir (Şu an: {total_students})')
+        if total_instructors < 2:
+            warnings.append(f'Minimum 2 öğretim üyesi gereklidir (Şu an: {total_instructors})')
+        
+        return jsonify({
+            'message': f'{result["created"]} kullanıcı eklendi, {result["failed"]} satır eklenemedi',
+            **result,
+            'total_students': total_students,
+            'total_instructors': total_instructors,
+            'warnings': warnings if warnings else None
+        }), 200
+        
+    except ImportFormatError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
 @admin_bp.route('/users', methods=['GET'])
 @jwt_required()
 @role_required('admin')
 def get_users():
-    """Tüm kullanıcıları listeleme"""
+    """Kullanıcıları listeleme (keyset sayfalama, rol/metin filtresi ve alan seçimi ile)"""
     try:
         role_filter = request.args.get('role')
+        search = request.args.get('q')
+        fields = requested_fields()
         
         query = User.query
         if role_filter:
             query = query.filter_by(role=role_filter)
+        if search:
+            pattern = f'%{search}%'
+            query = query.filter(or_(User.email.ilike(pattern), User.name.ilike(pattern)))
         
-        users = query.all()
+        users, next_cursor, limit = paginate(query, User.id, USER_SORT_OPTIONS)
         
         return jsonify({
-            'users': [user.to_dict() for user in users]
+            'users': [project(user.to_dict(), fields) for user in users],
+            'next_cursor': next_cursor,
+            'limit': limit
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -165,6 +238,33 @@ def create_course():
         return jsonify({'error': str(e)}), 500
 
 
+@admin_bp.route('/assignments/bulk', methods=['POST'])
+@jwt_required()
+@role_required('admin')
+def create_assignments_bulk():
+    """Toplu öğrenci-ders ataması (çift listesi veya öğrenci grubu -> ders eşlemesi)
+    
+    Gövde: {pairs: [{student_id, course_id}], cohorts: [{student_ids: [...], course_ids: [...]}]}
+    Mevcut atamalar hata değildir ('already_enrolled' olarak raporlanır).
+    """
+    try:
+        data = request.get_json() or {}
+        pairs = expand_pairs(data, current_app.config['BULK_ASSIGNMENT_MAX_PAIRS'])
+        result = bulk_enroll(pairs)
+        
+        summary = result['summary']
+        return jsonify({
+            'message': f'{summary["created"]} atama yapıldı, {summary["already_enrolled"]} zaten kayıtlı',
+            **result
+        }), 200
+        
+    except EnrollmentRequestError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
 @admin_bp.route('/assignments', methods=['POST'])
 @jwt_required()
 @role_required('admin')
@@ -201,6 +301,8 @@ def create_assignment():
             
             db.session.add(new_assignment)
             db.session.commit()
+            invalidate_student_feed(student_id)
+            event_broker.publish(student_channel(student_id), ENROLLMENT_CHANGED, {'course_id': course_id})
             
             # Öğrencinin toplam ders sayısını kontrol et
             student_course_count = StudentCourse.query.filter_by(student_id=student_id).count()
@@ -268,12 +370,11 @@ def get_departments():
 @jwt_required()
 @role_required('admin')
 def get_courses():
-    """Tüm dersleri listele"""
+    """Dersleri listele (keyset sayfalama ile)"""
     try:
-        courses = Course.query.all()
-        return jsonify({
-            'courses': [course.to_dict() for course in courses]
-        }), 200
+        return jsonify(paginated_courses()), 200
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -282,8 +383,14 @@ def get_courses():
 @jwt_required()
 @role_required('admin')
 def delete_user(user_id):
-    """Kullanıcı silme (minimum sayı kontrolü ile)"""
+    """Kullanıcı silme (minimum sayı kontrolü ile)
+    
+    ?dry_run=true: hiçbir şey silmeden tablo bazlı silinecek satır sayılarını döndürür.
+    ?force=true: öğretim üyesini verdiği dersler ve sınavlarıyla birlikte siler.
+    """
     try:
+        dry_run = _flag('dry_run')
+        force = _flag('force')
         user = User.query.get(user_id)
         if not user:
             return jsonify({'error': 'Kullanıcı bulunamadı'}), 404
@@ -310,21 +417,30 @@ def delete_user(user_id):
                 }), 400
             
             # Öğretim üyesinin dersleri varsa kontrol et
-            instructor_courses = Course.query.filter_by(instructor_id=user_id).all()
-            if instructor_courses:
+            course_count = Course.query.filter_by(instructor_id=user_id).count()
+            if course_count and not force and not dry_run:
+                return jsonify({
+                    'error': f'Bu öğretim üyesinin {course_count} dersi var. Önce dersleri başka bir öğretim üyesine atayın '
+                             f'veya force=true ile dersleriyle birlikte silin.'
+                }), 400
+            
+            # Dersleriyle birlikte silmede de minimum ders sayısı korunur
+            total_courses = Course.query.count()
+            if course_count and total_courses - course_count < 4:
                 return jsonify({
-                    'error': f'Bu öğretim üyesinin {len(instructor_courses)} dersi var. Önce dersleri başka bir öğretim üyesine atayın.'
+                    'error': f'Minimum 4 ders gereklidir. Şu an {total_courses} ders var ve öğretim üyesinin '
+                             f'{course_count} dersi de silinecek. Silme işlemi yapılamaz.'
                 }), 400
         
-        # Öğrenci ise ders kayıtlarını sil
-        if role == 'student':
-            StudentCourse.query.filter_by(student_id=user_id).delete()
+        if dry_run:
+            return jsonify({'dry_run': True, 'counts': count_plan(user_deletion_plan(user))}), 200
         
-        db.session.delete(user)
-        db.session.commit()
+        # Öğrenci ise girişleri, cevapları, notları ve ders kayıtları da silinir
+        deleted = delete_user_cascade(user, current_app.config['DELETE_CHUNK_SIZE'])
         
         return jsonify({
             'message': 'Kullanıcı başarıyla silindi',
+            'deleted': deleted,
             'remaining_count': User.query.filter_by(role=role).count()
         }), 200
         
@@ -337,8 +453,14 @@ def delete_user(user_id):
 @jwt_required()
 @role_required('admin')
 def delete_course(course_id):
-    """Ders silme (minimum sayı kontrolü ile)"""
+    """Ders silme (minimum sayı kontrolü ile)
+    
+    ?dry_run=true: hiçbir şey silmeden tablo bazlı silinecek satır sayılarını döndürür.
+    ?force=true: dersi kayıtları, sınavları, girişleri ve cevaplarıyla birlikte siler.
+    """
     try:
+        dry_run = _flag('dry_run')
+        force = _flag('force')
         course = Course.query.get(course_id)
         if not course:
             return jsonify({'error': 'Ders bulunamadı'}), 404
@@ -350,25 +472,31 @@ def delete_course(course_id):
                 'error': f'Minimum 4 ders gereklidir. Şu an {total_courses} ders var. Silme işlemi yapılamaz.'
             }), 400
         
-        # Derse kayıtlı öğrenciler varsa kontrol et
-        student_count = StudentCourse.query.filter_by(course_id=course_id).count()
-        if student_count > 0:
-            return jsonify({
-                'error': f'Bu derse {student_count} öğrenci kayıtlı. Önce öğrenci kayıtlarını kaldırın.'
-            }), 400
+        if dry_run:
+            return jsonify({'dry_run': True, 'counts': count_plan(course_deletion_plan(course_id))}), 200
         
-        # Dersin sınavları varsa kontrol et
-        exam_count = Exam.query.filter_by(course_id=course_id).count()
-        if exam_count > 0:
-            return jsonify({
-                'error': f'Bu dersin {exam_count} sınavı var. Önce sınavları silin.'
-            }), 400
+        if not force:
+            # Derse kayıtlı öğrenciler varsa kontrol et
+            student_count = StudentCourse.query.filter_by(course_id=course_id).count()
+            if student_count > 0:
+                return jsonify({
+                    'error': f'Bu derse {student_count} öğrenci kayıtlı. Önce öğrenci kayıtlarını kaldırın '
+                             f'veya force=true ile tüm verileriyle silin.'
+                }), 400
+            
+            # Dersin sınavları varsa kontrol et
+            exam_count = Exam.query.filter_by(course_id=course_id).count()
+            if exam_count > 0:
+                return jsonify({
+                    'error': f'Bu dersin {exam_count} sınavı var. Önce sınavları silin '
+                             f'veya force=true ile tüm verileriyle silin.'
+                }), 400
         
-        db.session.delete(course)
-        db.session.commit()
+        deleted = delete_course_cascade(course_id, current_app.config['DELETE_CHUNK_SIZE'])
         
         return jsonify({
             'message': 'Ders başarıyla silindi',
+            'deleted': deleted,
             'remaining_courses': Course.query.count()
         }), 200
         
@@ -425,8 +553,12 @@ def delete_assignment(assignment_id):
                 'error': f'Her öğrenci minimum 2 derse kayıtlı olmalıdır. Şu an {student_course_count} ders var. Silme işlemi yapılamaz.'
             }), 400
         
+        CourseGrade.query.filter_by(student_id=student_id, course_id=assignment.course_id).delete()
+        course_id = assignment.course_id
         db.session.delete(assignment)
         db.session.commit()
+        invalidate_student_feed(student_id)
+        event_broker.publish(student_channel(student_id), ENROLLMENT_CHANGED, {'course_id': course_id})
         
         return jsonify({
             'message': 'Atama başarıyla silindi',
@@ -437,3 +569,32 @@ def delete_assignment(assignment_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+
+@admin_bp.route('/cache-stats', methods=['GET'])
+@jwt_required()
+@role_required('admin')
+def get_cache_stats():
+    """Süreç içi önbelleklerin isabet/ıska sayaçları (bu worker için)"""
+    try:
+        from services.exam_service import answer_key_cache, exam_paper_cache, exam_feed_cache, attempt_clock_cache
+        from services.answer_buffer import answer_buffer
+        from services.scheduler import scheduler
+        from services.password_hasher import password_hasher
+        from services.read_replica import replica_router
+        from middleware import role_cache
+        
+        return jsonify({
+            'scheduler': scheduler.stats(),
+            'events': event_broker.stats(),
+            'password_hasher': password_hasher.stats(),
+            'read_replica': replica_router.stats(),
+            'answer_buffer': answer_buffer.stats(),
+            'answer_key_cache': answer_key_cache.stats(),
+            'exam_paper_cache': exam_paper_cache.stats(),
+            'exam_feed_cache': exam_feed_cache.stats(),
+            'attempt_clock_cache': attempt_clock_cache.stats(),
+            'role_cache': role_cache.stats()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
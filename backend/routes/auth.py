@@ -20,9 +20,14 @@ def login():
         
         user = User.query.filter_by(email=email).first()
         
+        # bcrypt doğrulaması hashleme havuzunda çalışır; istek yalnızca sonucu bekler
         if not user or not user.check_password(password):
             return jsonify({'error': 'Geçersiz email veya şifre'}), 401
         
+        # BCRYPT_LOG_ROUNDS değiştiyse şifre yeni maliyetle yeniden hashlenir
+        if user.rehash_password_if_needed(password):
+            db.session.commit()
+        
         # JWT token oluştur - identity string olmalı
         access_token = create_access_token(
             identity=str(user.id),
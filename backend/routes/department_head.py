@@ -1,9 +1,11 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db, User, Course, Exam, ExamAttempt, StudentCourse, Department
-from middleware import role_required
-from services.grade_service import get_course_statistics, get_class_statistics
-from sqlalchemy import func
+from middleware import role_required, replica_read
+from serializers import with_load_plan, paginated_courses, USER_SORT_OPTIONS
+from utils.pagination import paginate, requested_fields, project, PaginationError
+from services.grade_service import get_course_statistics, get_department_statistics, get_stored_course_grades
+from sqlalchemy import func, or_
 
 department_head_bp = Blueprint('department_head', __name__)
 
@@ -12,14 +14,12 @@ department_head_bp = Blueprint('department_head', __name__)
 @jwt_required()
 @role_required('department_head')
 def get_all_courses():
-    """Tüm dersleri görüntüleme"""
+    """Dersleri görüntüleme (keyset sayfalama ile)"""
     try:
-        courses = Course.query.all()
-        
-        return jsonify({
-            'courses': [course.to_dict() for course in courses]
-        }), 200
+        return jsonify(paginated_courses()), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -28,14 +28,26 @@ def get_all_courses():
 @jwt_required()
 @role_required('department_head')
 def get_all_students():
-    """Tüm öğrencileri görüntüleme"""
+    """Öğrencileri görüntüleme (keyset sayfalama, metin filtresi ve alan seçimi ile)"""
     try:
-        students = User.query.filter_by(role='student').all()
+        search = request.args.get('q')
+        fields = requested_fields()
+        
+        query = User.query.filter_by(role='student')
+        if search:
+            pattern = f'%{search}%'
+            query = query.filter(or_(User.email.ilike(pattern), User.name.ilike(pattern)))
+        
+        students, next_cursor, limit = paginate(query, User.id, USER_SORT_OPTIONS)
         
         return jsonify({
-            'students': [student.to_dict() for student in students]
+            'students': [project(student.to_dict(), fields) for student in students],
+            'next_cursor': next_cursor,
+            'limit': limit
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -43,62 +55,12 @@ def get_all_students():
 @department_head_bp.route('/statistics', methods=['GET'])
 @jwt_required()
 @role_required('department_head')
+@replica_read(max_staleness=30)
 def get_statistics():
     """Sınıf ve ders ortalamaları"""
     try:
-        # Genel istatistikler
-        general_stats = get_class_statistics()
-        
-        # Tüm dersler için istatistikler
-        courses = Course.query.all()
-        course_statistics = []
-        
-        for course in courses:
-            stats = get_course_statistics(course.id)
-            course_statistics.append({
-                'course': course.to_dict(),
-                'statistics': stats
-            })
-        
-        # Sınıf ortalamaları (tüm öğrenciler için)
-        all_students = User.query.filter_by(role='student').all()
-        student_grades = []
-        
-        for student in all_students:
-            # Öğrencinin kayıtlı olduğu dersler
-            enrollments = StudentCourse.query.filter_by(student_id=student.id).all()
-            course_grades = []
-            
-            for enrollment in enrollments:
-                from services.grade_service import calculate_course_grade
-                grade_info = calculate_course_grade(student.id, enrollment.course_id)
-                if grade_info:
-                    course_grades.append({
-                        'course': enrollment.course.to_dict(),
-                        'grade': grade_info
-                    })
-            
-            if course_grades:
-                # Öğrencinin genel ortalaması
-                avg_grade = sum(g['grade']['final_grade'] for g in course_grades) / len(course_grades)
-                student_grades.append({
-                    'student': student.to_dict(),
-                    'courses': course_grades,
-                    'overall_average': round(avg_grade, 2)
-                })
-        
-        # Genel sınıf ortalaması
-        if student_grades:
-            overall_class_average = sum(s['overall_average'] for s in student_grades) / len(student_grades)
-        else:
-            overall_class_average = 0
-        
-        return jsonify({
-            'general_statistics': general_stats,
-            'course_statistics': course_statistics,
-            'student_grades': student_grades,
-            'overall_class_average': round(overall_class_average, 2)
-        }), 200
+        # Tüm istatistikler öğrenci sayısından bağımsız sabit sayıda sorgu ile hesaplanır
+        return jsonify(get_department_statistics()), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -107,6 +69,7 @@ def get_statistics():
 @department_head_bp.route('/courses/<int:course_id>/statistics', methods=['GET'])
 @jwt_required()
 @role_required('department_head')
+@replica_read(max_staleness=30)
 def get_course_statistics_detail(course_id):
     """Belirli bir ders için detaylı istatistikler"""
     try:
@@ -116,17 +79,17 @@ def get_course_statistics_detail(course_id):
         
         stats = get_course_statistics(course_id)
         
-        # Derse kayıtlı öğrenciler ve notları
-        enrollments = StudentCourse.query.filter_by(course_id=course_id).all()
+        # Derse kayıtlı öğrenciler ve önceden hesaplanmış notları
+        enrollments = with_load_plan(
+            StudentCourse.query.filter_by(course_id=course_id), 'student_course_student'
+        ).all()
+        grades = get_stored_course_grades(course_ids=[course_id])
         student_details = []
         
         for enrollment in enrollments:
-            from services.grade_service import calculate_course_grade
-            grade_info = calculate_course_grade(enrollment.student_id, course_id)
-            
             student_details.append({
                 'student': enrollment.student.to_dict(),
-                'grade': grade_info
+                'grade': grades.get((enrollment.student_id, course_id))
             })
         
         return jsonify({
@@ -1,11 +1,17 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db, User, Course, Exam, Question, AnswerOption, ExamAttempt, StudentCourse
-from middleware import role_required
+from middleware import role_required, replica_read
+from serializers import with_load_plan, serialize_list, is_shallow, EXAM_SORT_OPTIONS
+from utils.pagination import paginate, requested_fields, needs_nested, project, PaginationError
 from datetime import datetime
-from services.grade_service import get_course_statistics
+from services.grade_service import get_course_statistics, refresh_course_grades, get_stored_course_grades
 from sqlalchemy import and_
+from services.question_service import adjust_exam_totals, touch_exam
+from services.exam_service import invalidate_exam_content, invalidate_exam_feeds, invalidate_attempt_clock
+from services.events import event_broker, course_channel, EXAM_UPDATED
 from utils.timezone import parse_istanbul_datetime, get_istanbul_now
+from utils.etag import conditional_json, course_list_version
 
 instructor_bp = Blueprint('instructor', __name__)
 
@@ -18,11 +24,16 @@ def get_my_courses():
     try:
         current_user_id_str = get_jwt_identity()
         current_user_id = int(current_user_id_str) if current_user_id_str else None
-        courses = Course.query.filter_by(instructor_id=current_user_id).all()
+        shallow = is_shallow()
+        query = Course.query.filter_by(instructor_id=current_user_id)
+        version = course_list_version(query)
         
-        return jsonify({
-            'courses': [course.to_dict() for course in courses]
-        }), 200
+        def build():
+            courses = with_load_plan(query, 'course', shallow).all()
+            return {'courses': serialize_list(courses, shallow)}
+        
+        # Liste değişmediyse (If-None-Match) 304 döner, dersler yüklenmez
+        return conditional_json(version, build)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -42,9 +53,16 @@ def get_course_students(course_id):
         if not course:
             return jsonify({'error': 'Ders bulunamadı veya yetkiniz yok'}), 404
         
-        # Derse kayıtlı öğrenciler
-        enrollments = StudentCourse.query.filter_by(course_id=course_id).all()
-        students = [enrollment.student.to_dict() for enrollment in enrollments]
+        # Derse kayıtlı öğrenciler ve önceden hesaplanmış notları
+        enrollments = with_load_plan(
+            StudentCourse.query.filter_by(course_id=course_id), 'student_course_student'
+        ).all()
+        grades = get_stored_course_grades(course_ids=[course_id])
+        students = []
+        for enrollment in enrollments:
+            student_data = enrollment.student.to_dict()
+            student_data['grade'] = grades.get((enrollment.student_id, course_id))
+            students.append(student_data)
         
         return jsonify({
             'course': course.to_dict(),
@@ -112,6 +130,8 @@ def create_exam():
         
         db.session.add(new_exam)
         db.session.commit()
+        invalidate_exam_feeds()
+        event_broker.publish(course_channel(course_id), EXAM_UPDATED, {'exam_id': new_exam.id, 'course_id': course_id})
         
         # Bu ders için sınav sayısını kontrol et
         course_exams = Exam.query.filter_by(course_id=course_id).all()
@@ -187,10 +207,17 @@ def add_question(exam_id):
             )
             db.session.add(option)
         
+        # Sınavın soru sayısı ve maksimum puanını güncelle
+        adjust_exam_totals(exam_id, question_delta=1, points_delta=float(new_question.points))
+        
+        # Maksimum puan değiştiği için ders notlarını güncelle
+        refresh_course_grades(course_ids=[exam.course_id])
+        
         db.session.commit()
+        invalidate_exam_content(exam_id)
         
         # Toplam soru sayısını kontrol et
-        total_questions = Question.query.filter_by(exam_id=exam_id).count()
+        total_questions = exam.question_count
         
         return jsonify({
             'message': 'Soru başarıyla eklendi',
@@ -217,7 +244,7 @@ def get_exam_questions(exam_id):
         if not exam:
             return jsonify({'error': 'Sınav bulunamadı veya yetkiniz yok'}), 404
         
-        questions = Question.query.filter_by(exam_id=exam_id).all()
+        questions = with_load_plan(Question.query.filter_by(exam_id=exam_id), 'question').all()
         
         return jsonify({
             'exam': exam.to_dict(),
@@ -251,12 +278,7 @@ def update_question(question_id):
         points = data.get('points')
         answer_options = data.get('answer_options')
         
-        if question_text:
-            question.question_text = question_text
-        if points is not None:
-            question.points = points
-        
-        # Cevap seçeneklerini güncelle
+        # Doğrulama hiçbir değişiklikten önce yapılır (400'de oturumda yarım güncelleme kalmaz)
         if answer_options:
             if len(answer_options) < 2:
                 return jsonify({'error': 'En az 2 cevap seçeneği gereklidir'}), 400
@@ -264,7 +286,16 @@ def update_question(question_id):
             correct_count = sum(1 for opt in answer_options if opt.get('is_correct', False))
             if correct_count == 0:
                 return jsonify({'error': 'En az bir doğru cevap seçeneği gereklidir'}), 400
-            
+        
+        if question_text:
+            question.question_text = question_text
+        if points is not None:
+            # Sınavın maksimum puanını fark kadar güncelle
+            adjust_exam_totals(exam.id, points_delta=float(points) - question.points)
+            question.points = points
+        
+        # Cevap seçeneklerini güncelle
+        if answer_options:
             # Mevcut seçenekleri sil
             AnswerOption.query.filter_by(question_id=question_id).delete()
             
@@ -277,7 +308,14 @@ def update_question(question_id):
                 )
                 db.session.add(option)
         
+        # Diğer worker'lardaki kağıt/cevap anahtarı önbellekleri sınav sürümüyle eskir
+        touch_exam(exam.id)
+        
+        # Puanlar değişmiş olabilir, ders notlarını güncelle
+        refresh_course_grades(course_ids=[exam.course_id])
+        
         db.session.commit()
+        invalidate_exam_content(exam.id)
         
         return jsonify({
             'message': 'Soru başarıyla güncellendi',
@@ -308,12 +346,18 @@ def delete_question(question_id):
             return jsonify({'error': 'Sınav bulunamadı veya yetkiniz yok'}), 404
         
         # Minimum 5 soru kontrolü
-        total_questions = Question.query.filter_by(exam_id=exam.id).count()
+        total_questions = exam.question_count
         if total_questions <= 5:
             return jsonify({'error': 'Minimum 5 soru gereklidir. Soru silinemez'}), 400
         
+        adjust_exam_totals(exam.id, question_delta=-1, points_delta=-question.points)
         db.session.delete(question)
+        
+        # Maksimum puan değiştiği için ders notlarını güncelle
+        refresh_course_grades(course_ids=[exam.course_id])
+        
         db.session.commit()
+        invalidate_exam_content(exam.id)
         
         return jsonify({
             'message': 'Soru başarıyla silindi',
@@ -381,7 +425,16 @@ def update_exam(exam_id):
         if not updated_fields:
             return jsonify({'error': 'Güncellenecek alan belirtilmedi'}), 400
         
+        # Ağırlık değiştiyse ders notlarını güncelle
+        if weight_percentage is not None:
+            refresh_course_grades(course_ids=[exam.course_id])
+        
         db.session.commit()
+        invalidate_exam_content(exam.id)
+        if 'zaman' in updated_fields:
+            # Açık girişlerin bitiş zamanı sınavın bitişine bağlı olabilir
+            invalidate_attempt_clock()
+        event_broker.publish(course_channel(exam.course_id), EXAM_UPDATED, {'exam_id': exam.id, 'course_id': exam.course_id})
         
         message = f'Sınav {", ".join(updated_fields)} başarıyla güncellendi'
         return jsonify({
@@ -397,6 +450,7 @@ def update_exam(exam_id):
 @instructor_bp.route('/exams/<int:exam_id>/results', methods=['GET'])
 @jwt_required()
 @role_required('instructor')
+@replica_read(max_staleness=5)
 def get_exam_results(exam_id):
     """Sınav sonuçları ve ortalamaları"""
     try:
@@ -408,13 +462,13 @@ def get_exam_results(exam_id):
             return jsonify({'error': 'Sınav bulunamadı veya yetkiniz yok'}), 404
         
         # Tüm sınav girişlerini al
-        attempts = ExamAttempt.query.filter_by(exam_id=exam_id).filter(
+        attempts = with_load_plan(ExamAttempt.query.filter_by(exam_id=exam_id).filter(
             ExamAttempt.submitted_at.isnot(None)
-        ).all()
+        ), 'exam_attempt_student').all()
         
         # İstatistikler
         total_attempts = len(attempts)
-        max_points = sum(q.points for q in exam.questions)
+        max_points = exam.max_points
         
         if total_attempts > 0:
             total_scores = [attempt.total_score for attempt in attempts]
@@ -455,16 +509,31 @@ def get_exam_results(exam_id):
 @jwt_required()
 @role_required('instructor')
 def get_my_exams():
-    """Kendi sınavlarını listele"""
+    """Kendi sınavlarını listele (keyset sayfalama, ders/tip filtresi ve alan seçimi ile)"""
     try:
         current_user_id_str = get_jwt_identity()
         current_user_id = int(current_user_id_str) if current_user_id_str else None
-        exams = Exam.query.filter_by(instructor_id=current_user_id).all()
+        fields = requested_fields()
+        shallow = is_shallow() or not needs_nested(fields, 'course')
+        
+        query = Exam.query.filter_by(instructor_id=current_user_id)
+        course_id = request.args.get('course_id', type=int)
+        exam_type = request.args.get('exam_type')
+        if course_id:
+            query = query.filter(Exam.course_id == course_id)
+        if exam_type:
+            query = query.filter(Exam.exam_type == exam_type)
+        
+        exams, next_cursor, limit = paginate(with_load_plan(query, 'exam', shallow), Exam.id, EXAM_SORT_OPTIONS)
         
         return jsonify({
-            'exams': [exam.to_dict() for exam in exams]
+            'exams': [project(exam, fields) for exam in serialize_list(exams, shallow)],
+            'next_cursor': next_cursor,
+            'limit': limit
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1,13 +1,20 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Course, Exam, ExamAttempt, StudentAnswer, Question, AnswerOption, StudentCourse
+from models import db, format_utc_datetime, Course, Exam, ExamAttempt, StudentCourse
 from middleware import role_required
-from datetime import datetime, timedelta
-from services.exam_service import check_exam_time, can_start_exam, calculate_exam_score, get_random_questions
-from services.question_service import get_exam_questions_randomized
-from services.grade_service import calculate_course_grade, get_course_statistics
-from sqlalchemy import and_
+from serializers import with_load_plan, is_shallow
+from datetime import datetime
+import time
+from services.exam_service import check_exam_time, grade_submission, get_random_questions, get_attempt_paper, get_attempt_answers
+from services.exam_service import get_answer_key, grade_answers, parse_id, attempt_deadline, load_start_context, create_attempt, submission_grace
+from services.exam_service import get_student_exam_feed_versioned, invalidate_student_feed, get_attempt_clock, invalidate_attempt_clock
+from services.answer_buffer import answer_buffer, save_answer_rows
+from services.scheduler import scheduler
+from services.events import event_broker, student_channel, course_channel, format_sse, RESULT_PUBLISHED, ENROLLMENT_CHANGED
+from services.grade_service import calculate_course_grade, get_course_statistics, refresh_course_grades
+from sqlalchemy import and_, func
 from utils.timezone import get_istanbul_now
+from utils.etag import conditional_json, course_list_version
 
 student_bp = Blueprint('student', __name__)
 
@@ -21,12 +28,16 @@ def get_my_courses():
         current_user_id_str = get_jwt_identity()
         current_user_id = int(current_user_id_str) if current_user_id_str else None
         
-        enrollments = StudentCourse.query.filter_by(student_id=current_user_id).all()
-        courses = [enrollment.course.to_dict() for enrollment in enrollments]
+        shallow = is_shallow()
+        query = StudentCourse.query.filter_by(student_id=current_user_id)
+        version = course_list_version(query.join(Course))
         
-        return jsonify({
-            'courses': courses
-        }), 200
+        def build():
+            enrollments = with_load_plan(query, 'student_course_course', shallow).all()
+            return {'courses': [enrollment.course.to_dict(shallow=shallow) for enrollment in enrollments]}
+        
+        # Liste değişmediyse (If-None-Match) 304 döner, dersler yüklenmez
+        return conditional_json(version, build)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -36,61 +47,66 @@ def get_my_courses():
 @jwt_required()
 @role_required('student')
 def get_active_exams():
-    """Aktif sınavları görüntüleme"""
+    """Aktif ve yaklaşan sınavları görüntüleme"""
     try:
         current_user_id_str = get_jwt_identity()
         current_user_id = int(current_user_id_str) if current_user_id_str else None
-        # İstanbul saatine göre kontrol et
-        now = get_istanbul_now()
         
-        # Öğrencinin kayıtlı olduğu dersler
-        enrollments = StudentCourse.query.filter_by(student_id=current_user_id).all()
-        course_ids = [enrollment.course_id for enrollment in enrollments]
-        
-        if not course_ids:
-            return jsonify({'exams': [], 'upcoming_exams': []}), 200
-        
-        # Aktif sınavlar (zaman aralığında ve henüz girilmemiş) - İstanbul saatine göre
-        active_exams = Exam.query.filter(
-            Exam.course_id.in_(course_ids),
-            Exam.start_time <= now,
-            Exam.end_time >= now
-        ).all()
-        
-        exam_list = []
-        for exam in active_exams:
-            # Daha önce giriş yapılmış mı?
-            attempt = ExamAttempt.query.filter_by(
-                exam_id=exam.id,
-                student_id=current_user_id
-            ).first()
-            
-            exam_data = exam.to_dict()
-            exam_data['can_start'] = attempt is None
-            exam_data['already_taken'] = attempt is not None and attempt.submitted_at is not None
-            exam_data['in_progress'] = attempt is not None and attempt.submitted_at is None
-            
-            exam_list.append(exam_data)
-        
-        # Yaklaşan sınavlar (henüz başlamamış) - İstanbul saatine göre
-        upcoming_exams = Exam.query.filter(
-            Exam.course_id.in_(course_ids),
-            Exam.start_time > now
-        ).order_by(Exam.start_time.asc()).all()
-        
-        upcoming_list = []
-        for exam in upcoming_exams:
-            exam_data = exam.to_dict()
-            exam_data['is_upcoming'] = True
-            exam_data['can_start'] = False
-            exam_data['already_taken'] = False
-            exam_data['in_progress'] = False
-            upcoming_list.append(exam_data)
+        # Sınavlar ve giriş durumları tek sorguda yüklenir, öğrenci başına kısa süre önbelleklenir;
+        # aktif/yaklaşan ayrımı İstanbul saatine göre her istekte yapılır.
+        # Liste değişmediyse (If-None-Match) 304 döner, gövde oluşturulmaz
+        version, build = get_student_exam_feed_versioned(current_user_id)
+        return conditional_json(version, build)
         
-        return jsonify({
-            'exams': exam_list,
-            'upcoming_exams': upcoming_list
-        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def _enrolled_course_channels(student_id):
+    course_ids = [row[0] for row in db.session.query(StudentCourse.course_id).filter_by(student_id=student_id)]
+    return [student_channel(student_id)] + [course_channel(course_id) for course_id in course_ids]
+
+
+@student_bp.route('/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+@role_required('student', locations=['headers', 'query_string'])
+def stream_events():
+    """Sınav listesi olay akışı (Server-Sent Events)
+    
+    EventSource başlık gönderemediği için token ?token= ile de kabul edilir.
+    Olaylar: exam_opened, exam_closed, exam_updated, result_published,
+    enrollment_changed. İstemci herhangi bir olayda sınav listesini yeniler.
+    """
+    try:
+        current_user_id_str = get_jwt_identity()
+        current_user_id = int(current_user_id_str) if current_user_id_str else None
+        
+        app = current_app._get_current_object()
+        heartbeat = app.config['EVENT_STREAM_HEARTBEAT']
+        max_duration = app.config['EVENT_STREAM_MAX_DURATION']
+        subscription = event_broker.subscribe(_enrolled_course_channels(current_user_id))
+        
+        def generate():
+            # Bağlantı boyunca veritabanı bağlantısı tutulmaz; yalnızca ders kaydı değişince okunur
+            deadline = time.monotonic() + max_duration
+            try:
+                yield f'retry: 5000\n{format_sse("ready", {})}'
+                while time.monotonic() < deadline:
+                    message = subscription.get(timeout=heartbeat)
+                    if message is None:
+                        yield ': heartbeat\n\n'
+                        continue
+                    if message['event'] == ENROLLMENT_CHANGED:
+                        with app.app_context():
+                            event_broker.update_channels(subscription, _enrolled_course_channels(current_user_id))
+                    yield format_sse(message['event'], message['data'])
+            finally:
+                event_broker.unsubscribe(subscription)
+        
+        return Response(generate(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # nginx'in akışı tamponlamasını engeller
+        })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -127,18 +143,14 @@ def get_exam_details(exam_id):
         if not attempt:
             return jsonify({'error': 'Sınava henüz giriş yapmadınız'}), 400
         
-        # Soruları rastgele sırala (doğru cevapları gösterme)
-        questions = get_exam_questions_randomized(exam_id, include_correct=False)
+        # Girişe kayıtlı sıralama ile sorular (doğru cevapları gösterme)
+        questions = get_attempt_paper(attempt)
         
-        # Öğrencinin cevaplarını ekle
+        # Öğrencinin cevaplarını ekle (tüm cevaplar tek sorguda)
+        answers = get_attempt_answers(attempt.id)
         for question in questions:
-            student_answer = StudentAnswer.query.filter_by(
-                attempt_id=attempt.id,
-                question_id=question['id']
-            ).first()
-            
-            if student_answer:
-                question['selected_option_id'] = student_answer.selected_option_id
+            if question['id'] in answers:
+                question['selected_option_id'] = answers[question['id']]
         
         return jsonify({
             'exam': exam.to_dict(),
@@ -154,52 +166,103 @@ def get_exam_details(exam_id):
 @jwt_required()
 @role_required('student')
 def start_exam(exam_id):
-    """Sınav başlatma (zaman kontrolü)"""
+    """Sınav başlatma (idempotent: tekrar eden istekler mevcut girişi döndürür)"""
     try:
         current_user_id_str = get_jwt_identity()
         current_user_id = int(current_user_id_str) if current_user_id_str else None
         
-        exam = Exam.query.get(exam_id)
-        if not exam:
+        # Sınav, ders kaydı ve mevcut giriş tek sorguda
+        context = load_start_context(exam_id, current_user_id)
+        if context is None:
             return jsonify({'error': 'Sınav bulunamadı'}), 404
+        exam, enrolled, attempt = context
         
-        # Sınava başlayabilir mi?
-        can_start, message = can_start_exam(exam, current_user_id)
-        if not can_start:
-            return jsonify({'error': message}), 400
-        
-        # Minimum 5 soru kontrolü
-        question_count = Question.query.filter_by(exam_id=exam_id).count()
-        if question_count < 5:
-            return jsonify({'error': 'Sınavda yeterli soru yok (minimum 5 soru gereklidir)'}), 400
-        
-        # Yeni sınav girişi oluştur - İstanbul saatine göre
         now = get_istanbul_now()
-        new_attempt = ExamAttempt(
-            exam_id=exam_id,
-            student_id=current_user_id,
-            start_time=now
-        )
+        if attempt is None:
+            if not (exam.start_time <= now <= exam.end_time):
+                return jsonify({'error': 'Sınav zamanı dışında'}), 400
+            
+            if not enrolled:
+                return jsonify({'error': 'Bu derse kayıtlı değilsiniz'}), 400
+            
+            # Minimum 5 soru kontrolü
+            if exam.question_count < 5:
+                return jsonify({'error': 'Sınavda yeterli soru yok (minimum 5 soru gereklidir)'}), 400
+            
+            # INSERT ... ON CONFLICT DO NOTHING: eşzamanlı çift tıklamada yalnızca biri ekler
+            attempt = create_attempt(exam_id, current_user_id, now)
+            db.session.commit()
+            if attempt is not None:
+                scheduler.schedule(attempt.id, attempt_deadline(attempt, exam))
+                invalidate_student_feed(current_user_id)
+                
+                # Soruları girişe özel tohumla rastgele sırala (yenilemelerde aynı sıra)
+                return jsonify({
+                    'message': 'Sınav başlatıldı',
+                    'exam': exam.to_dict(),
+                    'attempt': attempt.to_dict(),
+                    'questions': get_attempt_paper(attempt),
+                    'duration_minutes': exam.duration_minutes
+                }), 201
+            
+            # Yarışı kaybeden istek diğerinin oluşturduğu girişi kullanır
+            attempt = ExamAttempt.query.filter_by(exam_id=exam_id, student_id=current_user_id).first()
         
-        db.session.add(new_attempt)
-        db.session.commit()
+        if attempt.submitted_at:
+            return jsonify({'error': 'Bu sınav zaten gönderildi'}), 400
         
-        # Soruları rastgele sırala
-        questions = get_exam_questions_randomized(exam_id, include_correct=False)
+        if now > attempt_deadline(attempt, exam):
+            return jsonify({'error': 'Sınav süresi doldu'}), 400
+        
+        # Açık giriş: aynı kağıt ve kayıtlı cevaplarla devam et
+        questions = get_attempt_paper(attempt)
+        answers = get_attempt_answers(attempt.id)
+        for question in questions:
+            if question['id'] in answers:
+                question['selected_option_id'] = answers[question['id']]
         
         return jsonify({
-            'message': 'Sınav başlatıldı',
+            'message': 'Sınava devam ediliyor',
+            'resumed': True,
             'exam': exam.to_dict(),
-            'attempt': new_attempt.to_dict(),
+            'attempt': attempt.to_dict(),
             'questions': questions,
             'duration_minutes': exam.duration_minutes
-        }), 201
+        }), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 
+@student_bp.route('/attempts/<int:attempt_id>/clock', methods=['GET'])
+@jwt_required()
+@role_required('student')
+def get_attempt_clock_state(attempt_id):
+    """Sınav girişinin sunucu saatine göre kalan süresi (Timer senkronizasyonu için)"""
+    try:
+        current_user_id_str = get_jwt_identity()
+        current_user_id = int(current_user_id_str) if current_user_id_str else None
+        
+        # Bitiş zamanı önbellekten okunur; sık çağrılsa da veritabanına gitmez
+        clock = get_attempt_clock(attempt_id)
+        if clock is None or clock[0] != current_user_id:
+            return jsonify({'error': 'Sınav girişi bulunamadı'}), 404
+        _, deadline, submitted = clock
+        
+        now = get_istanbul_now()
+        return jsonify({
+            'attempt_id': attempt_id,
+            'server_time': format_utc_datetime(now),
+            'deadline': format_utc_datetime(deadline),
+            'remaining_seconds': 0 if submitted else round(max((deadline - now).total_seconds(), 0), 3),
+            'submitted': submitted
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @student_bp.route('/exams/<int:exam_id>/submit', methods=['POST'])
 @jwt_required()
 @role_required('student')
@@ -213,79 +276,120 @@ def submit_exam(exam_id):
         if not exam:
             return jsonify({'error': 'Sınav bulunamadı'}), 404
         
-        # Sınav girişini bul
+        # Sınav girişini bul (eşzamanlı tampon yazımları gönderim bitene kadar bekler)
         attempt = ExamAttempt.query.filter_by(
             exam_id=exam_id,
             student_id=current_user_id
-        ).first()
+        ).with_for_update().first()
         
         if not attempt:
             return jsonify({'error': 'Sınava henüz giriş yapmadınız'}), 400
         
         if attempt.submitted_at:
-            return jsonify({'error': 'Bu sınav zaten gönderildi'}), 400
-        
-        # Zaman kontrolü - İstanbul saatine göre
-        now = get_istanbul_now()
-        exam_end_time = attempt.start_time + timedelta(minutes=exam.duration_minutes)
-        
-        if now > exam.end_time:
-            # Sınav zamanı geçmiş, otomatik gönder
-            pass
-        elif now > exam_end_time:
-            # Süre dolmuş
-            pass
+            # Zamanlayıcı (veya önceki bir istek) göndermiş: kayıtlı sonuç döndürülür
+            return jsonify({
+                'message': 'Sınav zaten gönderilmişti',
+                'already_submitted': True,
+                'attempt': attempt.to_dict()
+            }), 200
         
         # Cevapları kaydet
-        data = request.get_json()
+        data = request.get_json() or {}
         answers = data.get('answers', [])  # [{question_id, selected_option_id}, ...]
         
-        # Mevcut cevapları sil
-        StudentAnswer.query.filter_by(attempt_id=attempt.id).delete()
-        
-        # Yeni cevapları kaydet
-        for answer_data in answers:
-            question_id = answer_data.get('question_id')
-            selected_option_id = answer_data.get('selected_option_id')
-            
-            if not question_id:
-                continue
-            
-            # Doğru cevabı kontrol et
-            question = Question.query.get(question_id)
-            if not question:
-                continue
+        # Zaman kontrolü - İstanbul saatine göre: bitiş zamanı + ek süreden sonra gelen
+        # cevaplar kaydedilmez, yalnızca süre içinde kaydedilmiş cevaplar puanlanır
+        now = get_istanbul_now()
+        if now > attempt_deadline(attempt, exam) + submission_grace():
+            answers = []
+        
+        # Bu worker'ın tamponundaki otomatik kayıtlar gönderimle aynı transaction'da yazılır;
+        # commit başarısız olursa tampona geri konur
+        buffered_rows = answer_buffer.take(attempt.id)
+        try:
+            # Gönderilen cevaplar upsert edilir, ardından kayıtlı tüm cevaplar toplu olarak puanlanır
+            grade_submission(attempt, answers, buffered_rows)
             
-            is_correct = False
-            points_earned = 0.0
+            # Gönderim zamanını kaydet
+            attempt.submitted_at = now
+            attempt.end_time = now
             
-            if selected_option_id:
-                selected_option = AnswerOption.query.get(selected_option_id)
-                if selected_option and selected_option.is_correct:
-                    is_correct = True
-                    points_earned = question.points
+            # Öğrencinin bu dersteki notunu güncelle
+            refresh_course_grades(student_ids=[current_user_id], course_ids=[exam.course_id])
             
-            student_answer = StudentAnswer(
-                attempt_id=attempt.id,
-                question_id=question_id,
-                selected_option_id=selected_option_id,
-                is_correct=is_correct,
-                points_earned=points_earned
-            )
-            db.session.add(student_answer)
+            db.session.commit()
+        except Exception:
+            answer_buffer.restore(buffered_rows)
+            raise
+        invalidate_student_feed(current_user_id)
+        invalidate_attempt_clock(attempt.id)
+        event_broker.publish(student_channel(current_user_id), RESULT_PUBLISHED, {'exam_id': exam_id})
         
-        # Puanı hesapla
-        calculate_exam_score(attempt)
+        return jsonify({
+            'message': 'Sınav başarıyla gönderildi',
+            'attempt': attempt.to_dict()
+        }), 200
         
-        # Gönderim zamanını kaydet
-        attempt.submitted_at = now
-        attempt.end_time = now
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@student_bp.route('/exams/<int:exam_id>/answers', methods=['PUT'])
+@jwt_required()
+@role_required('student')
+def save_answers(exam_id):
+    """Cevapları otomatik kaydet (tek cevap veya {answers: [...]} ile toplu)"""
+    try:
+        current_user_id_str = get_jwt_identity()
+        current_user_id = int(current_user_id_str) if current_user_id_str else None
         
-        db.session.commit()
+        data = request.get_json() or {}
+        answers = data.get('answers') if 'answers' in data else [data]
+        if not isinstance(answers, list) or not answers:
+            return jsonify({'error': 'Kaydedilecek cevap bulunamadı'}), 400
+        
+        # Giriş ve sınav tek sorguda
+        row = db.session.query(ExamAttempt, Exam).join(Exam, Exam.id == ExamAttempt.exam_id).filter(
+            ExamAttempt.exam_id == exam_id,
+            ExamAttempt.student_id == current_user_id
+        ).first()
+        
+        if not row:
+            return jsonify({'error': 'Sınava henüz giriş yapmadınız'}), 400
+        
+        attempt, exam = row
+        if attempt.submitted_at:
+            return jsonify({'error': 'Bu sınav zaten gönderildi'}), 400
+        
+        if get_istanbul_now() > attempt_deadline(attempt, exam):
+            return jsonify({'error': 'Sınav süresi doldu'}), 400
+        
+        # Sorular ve seçenekler önbellekteki cevap anahtarı ile doğrulanır
+        answer_key = get_answer_key(exam_id, exam.updated_at)
+        for answer_data in answers:
+            question_id = parse_id(answer_data.get('question_id')) if isinstance(answer_data, dict) else None
+            if question_id not in answer_key['questions']:
+                return jsonify({'error': 'Soru bu sınava ait değil'}), 400
+            selected_option_id = answer_data.get('selected_option_id')
+            if selected_option_id is not None:
+                option = answer_key['options'].get(parse_id(selected_option_id))
+                if option is None or option[0] != question_id:
+                    return jsonify({'error': 'Seçenek bu soruya ait değil'}), 400
+        
+        rows, _ = grade_answers(answer_key, attempt.id, answers)
+        
+        buffered = current_app.config['ANSWER_BUFFER_ENABLED']
+        if buffered:
+            answer_buffer.add(rows)
+        else:
+            save_answer_rows(rows)
+            db.session.commit()
         
         return jsonify({
-            'message': 'Sınav başarıyla gönderildi',
-            'attempt': attempt.to_dict()
+            'message': 'Cevaplar kaydedildi',
+            'saved': len(rows),
+            'buffered': buffered
         }), 200
         
     except Exception as e:
@@ -315,36 +419,46 @@ def get_exam_result(exam_id):
         if not attempt or not attempt.submitted_at:
             return jsonify({'error': 'Sınav sonucu bulunamadı'}), 404
         
-        # Öğrencinin puanı
-        max_points = sum(q.points for q in exam.questions)
-        student_percentage = (attempt.total_score / max_points * 100) if max_points > 0 else 0
-        
-        # Genel ortalama
-        all_attempts = ExamAttempt.query.filter_by(exam_id=exam_id).filter(
+        # Genel ortalama (tek aggregate sorgu)
+        participant_count, score_sum = db.session.query(
+            func.count(ExamAttempt.id), func.coalesce(func.sum(ExamAttempt.total_score), 0.0)
+        ).filter(
+            ExamAttempt.exam_id == exam_id,
             ExamAttempt.submitted_at.isnot(None)
-        ).all()
+        ).one()
         
-        if all_attempts:
-            total_scores = [a.total_score for a in all_attempts]
-            average_score = sum(total_scores) / len(total_scores)
-            average_percentage = (average_score / max_points * 100) if max_points > 0 else 0
-        else:
-            average_score = 0
-            average_percentage = 0
+        # Sınav (gömülü ders, departman ve öğretim üyesi dahil), öğrencinin puanı ve
+        # genel toplam değişmediyse (If-None-Match) 304 döner
+        course_version = course_list_version(Course.query.filter_by(id=exam.course_id))
+        version = (exam.updated_at, course_version, attempt.total_score, participant_count, score_sum)
         
-        return jsonify({
-            'exam': exam.to_dict(),
-            'my_result': {
-                'score': attempt.total_score,
-                'max_score': max_points,
-                'percentage': round(student_percentage, 2)
-            },
-            'statistics': {
-                'average_score': round(average_score, 2),
-                'average_percentage': round(average_percentage, 2),
-                'total_participants': len(all_attempts)
+        def build():
+            # Öğrencinin puanı
+            max_points = exam.max_points
+            student_percentage = (attempt.total_score / max_points * 100) if max_points > 0 else 0
+            
+            if participant_count:
+                average_score = score_sum / participant_count
+                average_percentage = (average_score / max_points * 100) if max_points > 0 else 0
+            else:
+                average_score = 0
+                average_percentage = 0
+            
+            return {
+                'exam': exam.to_dict(),
+                'my_result': {
+                    'score': attempt.total_score,
+                    'max_score': max_points,
+                    'percentage': round(student_percentage, 2)
+                },
+                'statistics': {
+                    'average_score': round(average_score, 2),
+                    'average_percentage': round(average_percentage, 2),
+                    'total_participants': participant_count
+                }
             }
-        }), 200
+        
+        return conditional_json(version, build)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,126 @@
+"""
+Endpoint bazlı yükleme planları (load plan) ve serileştirme yardımcıları
+
+Model ilişkileri lazy=True olduğu için to_dict() içinde erişilen her ilişki
+ayrı bir sorgu üretir (N+1). Liste endpoint'leri sorgularını burada
+tanımlanan planlarla çalıştırır; böylece iç içe sözlükler önceden yüklenmiş
+verilerden oluşturulur. shallow=1 parametresi ile iç içe nesneler
+atlanabilir (istemcide zaten bulunan ders/öğretim üyesi bilgileri gibi).
+"""
+from datetime import datetime
+from flask import request
+from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload, selectinload, configure_mappers
+from models import User, Course, Exam, ExamAttempt, StudentCourse, Question
+from utils.pagination import paginate, requested_fields, needs_nested, project
+
+
+def _course_options(path=None):
+    """Course.to_dict() için departman ve öğretim üyesi yüklemeleri"""
+    if path is None:
+        return [joinedload(Course.department), joinedload(Course.instructor)]
+    return [path.joinedload(Course.department), path.joinedload(Course.instructor)]
+
+
+def _exam_options(path=None):
+    """Exam.to_dict() için ders (ve dersin departmanı/öğretim üyesi) yüklemeleri"""
+    course_path = joinedload(Exam.course) if path is None else path.joinedload(Exam.course)
+    return _course_options(course_path)
+
+
+LOAD_PLANS = {
+    'course': lambda: _course_options(),
+    'exam': lambda: _exam_options(),
+    'exam_attempt': lambda: _exam_options(joinedload(ExamAttempt.exam)) + [joinedload(ExamAttempt.student)],
+    'exam_attempt_student': lambda: [joinedload(ExamAttempt.student)],
+    'student_course': lambda: _course_options(joinedload(StudentCourse.course)) + [joinedload(StudentCourse.student)],
+    'student_course_course': lambda: _course_options(joinedload(StudentCourse.course)),
+    'student_course_student': lambda: [joinedload(StudentCourse.student)],
+    'question': lambda: [selectinload(Question.answer_options)],
+}
+
+SHALLOW_PLANS = {
+    'exam_attempt_student': LOAD_PLANS['exam_attempt_student'],
+    'student_course_course': lambda: [joinedload(StudentCourse.course)],
+    'student_course_student': LOAD_PLANS['student_course_student'],
+    'question': LOAD_PLANS['question'],
+}
+
+
+def is_shallow():
+    """İstek shallow=1 ile mi yapıldı?"""
+    return request.args.get('shallow', '').lower() in ('1', 'true', 'yes')
+
+
+def with_load_plan(query, plan, shallow=False):
+    """Sorguya endpoint'in yükleme planını uygula
+
+    shallow modda iç içe nesneler serileştirilmeyeceği için yalnızca
+    serileştirmede gerçekten kullanılan ilişkiler yüklenir.
+    """
+    configure_mappers()
+    plans = SHALLOW_PLANS if shallow else LOAD_PLANS
+    factory = plans.get(plan)
+    if factory is None:
+        return query
+    return query.options(*factory())
+
+
+def serialize_list(items, shallow=False, **kwargs):
+    """Model listesini sözlük listesine çevir"""
+    return [item.to_dict(shallow=shallow, **kwargs) for item in items]
+
+
+# created_at boş olabilir; keyset karşılaştırmaları NULL ile çalışmadığı için
+# boş değerler en eskiye (epoch) sıralanır, eşitlikte id belirleyicidir
+EPOCH = datetime(1970, 1, 1)
+
+# Sayfalanan liste endpoint'lerinde izin verilen sıralama alanları
+USER_SORT_OPTIONS = {
+    'id': User.id,
+    'email': User.email,
+    'name': func.coalesce(User.name, ''),
+    'created_at': func.coalesce(User.created_at, EPOCH),
+}
+
+COURSE_SORT_OPTIONS = {
+    'id': Course.id,
+    'code': Course.code,
+    'name': Course.name,
+}
+
+EXAM_SORT_OPTIONS = {
+    'id': Exam.id,
+    'start_time': Exam.start_time,
+    'end_time': Exam.end_time,
+    'created_at': func.coalesce(Exam.created_at, EPOCH),
+}
+
+
+def filter_courses(query):
+    """Ders listelerinde ortak filtreler (department_id, instructor_id, q)"""
+    department_id = request.args.get('department_id', type=int)
+    instructor_id = request.args.get('instructor_id', type=int)
+    search = request.args.get('q')
+    if department_id:
+        query = query.filter(Course.department_id == department_id)
+    if instructor_id:
+        query = query.filter(Course.instructor_id == instructor_id)
+    if search:
+        pattern = f'%{search}%'
+        query = query.filter(or_(Course.code.ilike(pattern), Course.name.ilike(pattern)))
+    return query
+
+
+def paginated_courses():
+    """Ders listesi yanıtı: filtre + keyset sayfalama + alan seçimi"""
+    fields = requested_fields()
+    # İç içe departman/öğretim üyesi istenmiyorsa ilişkiler hiç yüklenmez
+    shallow = is_shallow() or not needs_nested(fields, 'department', 'instructor')
+    query = with_load_plan(filter_courses(Course.query), 'course', shallow)
+    courses, next_cursor, limit = paginate(query, Course.id, COURSE_SORT_OPTIONS)
+    return {
+        'courses': [project(course, fields) for course in serialize_list(courses, shallow)],
+        'next_cursor': next_cursor,
+        'limit': limit
+    }
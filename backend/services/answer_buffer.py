@@ -0,0 +1,167 @@
+"""
+Otomatik kayıt (autosave) cevapları için yazma birleştirici tampon
+
+Öğrencilerin tek tek cevap kayıtları bellekte (attempt_id, question_id)
+anahtarıyla birleştirilir ve arka plandaki bir thread tarafından periyodik
+olarak tek bir toplu upsert ile yazılır. Aynı soruya arka arkaya verilen
+cevaplardan yalnızca sonuncusu veritabanına gider.
+
+Tampon worker başınadır. Gönderimi işleyen worker kendi tamponundaki
+satırları gönderimle aynı transaction'da yazar (hata olursa satırlar tampona
+geri konur). Diğer worker'ların tamponları:
+    - Öğrenci gönderiminde istemci tüm cevapları gönderir.
+    - Otomatik gönderim bitiş zamanından en az iki yazma aralığı sonra
+      yapılır (bkz. exam_service.submission_grace); süre dolduktan sonra
+      otomatik kayıt kabul edilmediği için o ana kadar tüm tamponlar yazılmış olur.
+    - Yine de gönderimden sonra yazılan satırlar atılmaz (bkz. _write).
+Worker beklenmedik şekilde sonlanırsa en fazla ANSWER_BUFFER_FLUSH_INTERVAL
+saniyelik otomatik kayıt kaybolabilir.
+"""
+import atexit
+import logging
+import threading
+from models import db, ExamAttempt, StudentAnswer
+from utils.db import upsert_rows
+
+logger = logging.getLogger(__name__)
+
+ANSWER_UPDATE_COLUMNS = ('selected_option_id', 'is_correct', 'points_earned')
+
+
+def save_answer_rows(rows):
+    """StudentAnswer satırlarını (attempt_id, question_id) üzerinden upsert et"""
+    upsert_rows(StudentAnswer, rows, ['attempt_id', 'question_id'], ANSWER_UPDATE_COLUMNS)
+
+
+class AnswerBuffer:
+    """Cevap kayıtlarını birleştirip periyodik toplu upsert ile yazan tampon"""
+
+    def __init__(self):
+        self._pending = {}  # (attempt_id, question_id) -> StudentAnswer satırı
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.app = None
+        self.flush_interval = 1.0
+        self.max_pending = 5000
+        self.flushed_rows = 0
+        self.flush_count = 0
+
+    def init_app(self, app):
+        """Uygulama ayarlarını oku; thread ilk kayıtta başlatılır (fork sonrası güvenli)"""
+        self.app = app
+        self.flush_interval = app.config['ANSWER_BUFFER_FLUSH_INTERVAL']
+        self.max_pending = app.config['ANSWER_BUFFER_MAX_PENDING']
+        atexit.register(self.flush_all)
+
+    def add(self, rows):
+        """Satırları tampona ekle; aynı soru için önceki bekleyen cevabın yerine geçer"""
+        with self._lock:
+            for row in rows:
+                self._pending[(row['attempt_id'], row['question_id'])] = row
+            pending = len(self._pending)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='answer-buffer', daemon=True)
+                self._thread.start()
+        if pending >= self.max_pending:
+            self._wakeup.set()
+
+    def take(self, attempt_id):
+        """Bir girişin bekleyen satırlarını tampondan çıkar (gönderim sırasında doğrudan yazılır)
+
+        Gönderim commit edilemezse satırlar restore ile geri konmalıdır.
+        """
+        with self._lock:
+            keys = [key for key in self._pending if key[0] == attempt_id]
+            return [self._pending.pop(key) for key in keys]
+
+    def restore(self, rows):
+        """take ile alınan satırları tampona geri koy (bu arada gelen daha yeni cevaplar korunur)"""
+        if not rows:
+            return
+        with self._lock:
+            for row in rows:
+                self._pending.setdefault((row['attempt_id'], row['question_id']), row)
+        self._wakeup.set()
+
+    def peek(self, attempt_id):
+        """Bir girişin henüz yazılmamış cevapları {question_id: selected_option_id}"""
+        with self._lock:
+            return {
+                question_id: row['selected_option_id']
+                for (pending_attempt_id, question_id), row in self._pending.items()
+                if pending_attempt_id == attempt_id
+            }
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush_all()
+
+    def flush_all(self):
+        """Bekleyen tüm satırları tek transaction içinde yaz"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+
+        try:
+            with self.app.app_context():
+                written = self._write(list(pending.values()))
+        except Exception:
+            logger.exception('Cevap tamponu yazılamadı, %d satır yeniden kuyruğa alındı', len(pending))
+            with self._lock:
+                # Bu arada gelen daha yeni cevaplar korunur
+                for key, row in pending.items():
+                    self._pending.setdefault(key, row)
+            return 0
+
+        self.flushed_rows += written
+        self.flush_count += 1
+        return written
+
+    def _write(self, rows):
+        from services.exam_service import save_late_answers, invalidate_student_feed
+
+        attempt_ids = {row['attempt_id'] for row in rows}
+        try:
+            # FOR SHARE kilidi eşzamanlı gönderimin bu transaction bitene kadar
+            # beklemesini sağlar (PostgreSQL); silinmiş girişlerin satırları atılır
+            submitted = dict(db.session.execute(
+                db.select(ExamAttempt.id, ExamAttempt.submitted_at.isnot(None)).where(
+                    ExamAttempt.id.in_(attempt_ids)
+                ).with_for_update(read=True)
+            ).all())
+            open_rows = [row for row in rows if submitted.get(row['attempt_id']) is False]
+            # Satırlar süre içinde kabul edildi; giriş bu arada (ör. başka bir worker'da)
+            # gönderildiyse atılmaz, gönderimin cevaplarını ezmeden eklenip yeniden puanlanır
+            late_rows = [row for row in rows if submitted.get(row['attempt_id']) is True]
+            save_answer_rows(open_rows)
+            regraded = save_late_answers(late_rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            db.session.remove()
+
+        for student_id, exam_id in regraded:
+            logger.info('Gönderimden sonra yazılan cevaplarla giriş yeniden puanlandı: exam_id=%s student_id=%s', exam_id, student_id)
+            invalidate_student_feed(student_id)
+        return len(open_rows) + len(late_rows)
+
+    def stats(self):
+        return {
+            'pending': self.pending_count(),
+            'flushed_rows': self.flushed_rows,
+            'flush_count': self.flush_count,
+            'flush_interval': self.flush_interval
+        }
+
+
+answer_buffer = AnswerBuffer()
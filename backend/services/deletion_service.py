@@ -0,0 +1,158 @@
+"""
+Kullanıcı ve ders için set tabanlı kademeli silme
+
+ORM cascade'i silinecek her sınav, soru, seçenek, giriş ve cevap nesnesini
+belleğe yükleyip tek tek siler; yıllarca kullanılmış bir ders için bu
+dakikalar sürer. Burada her tablo bağımlılık sırasıyla (cevaplar -> girişler
+-> seçenekler -> sorular -> sınavlar -> notlar -> kayıtlar -> kök satır)
+alt sorgulu DELETE ifadeleriyle silinir. Her tablo DELETE_CHUNK_SIZE
+satırlık parçalar halinde ve her parça ayrı transaction'da silinir; böylece
+kilitler kısa tutulur. Kök satır (ders/kullanıcı) en son silindiği için
+yarıda kalan bir silme işlemi aynı çağrıyla güvenle tekrarlanabilir.
+"""
+from models import db, User, Course, StudentCourse, Exam, Question, AnswerOption, ExamAttempt, StudentAnswer, CourseGrade
+from sqlalchemy import func, or_
+from middleware import invalidate_user_role
+from services.exam_service import (
+    invalidate_exam_content, invalidate_attempt_clock, invalidate_student_feed, invalidate_exam_feeds
+)
+from services.events import event_broker, student_channel, ENROLLMENT_CHANGED
+from services.grade_service import refresh_course_grades
+
+
+def _exam_steps(exam_condition):
+    """Koşula uyan sınavlar ve bağlı tüm satırlar için silme adımları"""
+    exam_ids = db.select(Exam.id).where(exam_condition)
+    attempt_ids = db.select(ExamAttempt.id).where(ExamAttempt.exam_id.in_(exam_ids))
+    question_ids = db.select(Question.id).where(Question.exam_id.in_(exam_ids))
+    return [
+        ('student_answers', StudentAnswer, StudentAnswer.attempt_id.in_(attempt_ids)),
+        ('exam_attempts', ExamAttempt, ExamAttempt.exam_id.in_(exam_ids)),
+        ('answer_options', AnswerOption, AnswerOption.question_id.in_(question_ids)),
+        ('questions', Question, Question.exam_id.in_(exam_ids)),
+        ('exams', Exam, exam_condition),
+    ]
+
+
+def course_deletion_plan(course_id):
+    """Dersi ve dersin tüm verilerini silen (tablo, model, koşul) adımları"""
+    return _exam_steps(Exam.course_id == course_id) + [
+        ('course_grades', CourseGrade, CourseGrade.course_id == course_id),
+        ('student_courses', StudentCourse, StudentCourse.course_id == course_id),
+        ('courses', Course, Course.id == course_id),
+    ]
+
+
+def user_deletion_plan(user):
+    """Kullanıcıyı ve kullanıcıya bağlı verileri silen adımlar
+
+    Öğrenci: girişleri, cevapları, notları ve ders kayıtları.
+    Öğretim üyesi: verdiği dersler (tüm verileriyle) ve başka derslerde oluşturduğu sınavlar.
+    """
+    if user.role == 'student':
+        attempt_ids = db.select(ExamAttempt.id).where(ExamAttempt.student_id == user.id)
+        steps = [
+            ('student_answers', StudentAnswer, StudentAnswer.attempt_id.in_(attempt_ids)),
+            ('exam_attempts', ExamAttempt, ExamAttempt.student_id == user.id),
+            ('course_grades', CourseGrade, CourseGrade.student_id == user.id),
+            ('student_courses', StudentCourse, StudentCourse.student_id == user.id),
+        ]
+    else:
+        course_ids = db.select(Course.id).where(Course.instructor_id == user.id)
+        steps = _exam_steps(or_(Exam.course_id.in_(course_ids), Exam.instructor_id == user.id)) + [
+            ('course_grades', CourseGrade, CourseGrade.course_id.in_(course_ids)),
+            ('student_courses', StudentCourse, StudentCourse.course_id.in_(course_ids)),
+            ('courses', Course, Course.instructor_id == user.id),
+        ]
+    return steps + [('users', User, User.id == user.id)]
+
+
+def count_plan(plan):
+    """Kuru çalıştırma: her adımda silinecek satır sayısı {tablo: sayı}"""
+    return {
+        table: db.session.scalar(db.select(func.count()).select_from(model).where(condition))
+        for table, model, condition in plan
+    }
+
+
+def _delete_in_chunks(model, condition, chunk_size):
+    """Koşula uyan satırları chunk_size'lık parçalar halinde sil; her parça ayrı commit edilir"""
+    deleted = 0
+    while True:
+        chunk_ids = db.select(model.id).where(condition).limit(chunk_size)
+        result = db.session.execute(
+            db.delete(model).where(model.id.in_(chunk_ids)),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.commit()
+        deleted += result.rowcount
+        if result.rowcount < chunk_size:
+            return deleted
+
+
+def execute_plan(plan, chunk_size):
+    """Adımları sırayla uygula; silinen satır sayıları {tablo: sayı}"""
+    try:
+        return {table: _delete_in_chunks(model, condition, chunk_size) for table, model, condition in plan}
+    finally:
+        # Silinen satırlara ait nesneler oturumda kalmamalı
+        db.session.expire_all()
+
+
+def _affected(exam_condition, enrollment_condition):
+    """Önbellek temizliği için etkilenen sınav ve öğrenci ID'leri (silmeden önce)"""
+    exam_ids = list(db.session.scalars(db.select(Exam.id).where(exam_condition)))
+    student_ids = list(db.session.scalars(
+        db.select(StudentCourse.student_id).where(enrollment_condition).distinct()
+    ))
+    return exam_ids, student_ids
+
+
+def _invalidate(exam_ids, student_ids):
+    for exam_id in exam_ids:
+        invalidate_exam_content(exam_id)
+    if exam_ids:
+        invalidate_attempt_clock()
+    invalidate_exam_feeds()
+    event_broker.publish_many([
+        (student_channel(student_id), ENROLLMENT_CHANGED, {}) for student_id in student_ids
+    ])
+
+
+def delete_course_cascade(course_id, chunk_size):
+    """Dersi tüm verileriyle sil; silinen satır sayılarını döndür"""
+    exam_ids, student_ids = _affected(Exam.course_id == course_id, StudentCourse.course_id == course_id)
+    deleted = execute_plan(course_deletion_plan(course_id), chunk_size)
+    _invalidate(exam_ids, student_ids)
+    return deleted
+
+
+def delete_user_cascade(user, chunk_size):
+    """Kullanıcıyı bağlı verileriyle sil; silinen satır sayılarını döndür"""
+    user_id = user.id
+    if user.role == 'student':
+        exam_ids, student_ids, surviving_course_ids = [], [], []
+    else:
+        course_ids = db.select(Course.id).where(Course.instructor_id == user_id)
+        exam_ids, student_ids = _affected(
+            or_(Exam.course_id.in_(course_ids), Exam.instructor_id == user_id),
+            StudentCourse.course_id.in_(course_ids)
+        )
+        # Başka öğretim üyelerinin derslerinde yazdığı sınavlar silinir; bu dersler kalır
+        surviving_course_ids = list(db.session.scalars(
+            db.select(Exam.course_id).where(
+                Exam.instructor_id == user_id, Exam.course_id.not_in(course_ids)
+            ).distinct()
+        ))
+    deleted = execute_plan(user_deletion_plan(user), chunk_size)
+    if surviving_course_ids:
+        # Silinen sınavlar bu derslerin notlarından çıkarılır
+        refresh_course_grades(course_ids=surviving_course_ids)
+        db.session.commit()
+    invalidate_user_role(user_id)
+    invalidate_student_feed(user_id)
+    if exam_ids or student_ids:
+        _invalidate(exam_ids, student_ids)
+    else:
+        invalidate_attempt_clock()
+    return deleted
@@ -0,0 +1,126 @@
+"""
+Toplu öğrenci-ders ataması
+
+Binlerce (student_id, course_id) çifti sabit sayıda sorgu ile işlenir:
+öğrenciler ve dersler birer IN sorgusuyla doğrulanır, geçerli çiftler tek
+bir INSERT ... ON CONFLICT DO NOTHING RETURNING ile eklenir ve "minimum 2
+ders" uyarıları tek bir GROUP BY sorgusuyla hesaplanır.
+"""
+from models import db, User, Course, StudentCourse
+from sqlalchemy import func
+from services.exam_service import invalidate_student_feed
+from services.events import event_broker, student_channel, ENROLLMENT_CHANGED
+from utils.db import dialect_insert
+
+MIN_COURSES_PER_STUDENT = 2
+
+
+class EnrollmentRequestError(ValueError):
+    """Geçersiz toplu atama isteği (400 olarak döndürülür)"""
+
+
+def _to_id(value):
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise EnrollmentRequestError('Öğrenci ve ders ID\'leri tam sayı olmalıdır')
+    try:
+        return int(value)
+    except ValueError:
+        raise EnrollmentRequestError('Öğrenci ve ders ID\'leri tam sayı olmalıdır')
+
+
+def expand_pairs(data, max_pairs):
+    """İstekteki 'pairs' ve 'cohorts' alanlarını (student_id, course_id) listesine çevir
+
+    pairs:   [{student_id, course_id}, ...]
+    cohorts: [{student_ids: [...], course_ids: [...]}, ...] - her öğrenci her derse atanır
+    """
+    pairs = []
+    for pair in data.get('pairs') or []:
+        if not isinstance(pair, dict):
+            raise EnrollmentRequestError('pairs elemanları {student_id, course_id} olmalıdır')
+        pairs.append((_to_id(pair.get('student_id')), _to_id(pair.get('course_id'))))
+
+    for cohort in data.get('cohorts') or []:
+        if not isinstance(cohort, dict):
+            raise EnrollmentRequestError('cohorts elemanları {student_ids, course_ids} olmalıdır')
+        student_ids = [_to_id(value) for value in cohort.get('student_ids') or []]
+        course_ids = [_to_id(value) for value in cohort.get('course_ids') or []]
+        if len(pairs) + len(student_ids) * len(course_ids) > max_pairs:
+            raise EnrollmentRequestError(f'Tek istekte en fazla {max_pairs} atama yapılabilir')
+        pairs.extend((student_id, course_id) for student_id in student_ids for course_id in course_ids)
+
+    if not pairs:
+        raise EnrollmentRequestError('pairs veya cohorts gereklidir')
+    if len(pairs) > max_pairs:
+        raise EnrollmentRequestError(f'Tek istekte en fazla {max_pairs} atama yapılabilir')
+    return pairs
+
+
+def bulk_enroll(pairs):
+    """Çiftleri ata; çift bazlı sonuç, özet ve ders sayısı uyarılarını döndür
+
+    Çift durumları: created, already_enrolled, duplicate (istekte tekrar),
+    invalid_student, invalid_course.
+    """
+    student_ids = {student_id for student_id, _ in pairs}
+    course_ids = {course_id for _, course_id in pairs}
+    valid_students = set(db.session.scalars(
+        db.select(User.id).where(User.id.in_(student_ids), User.role == 'student')
+    ))
+    valid_courses = set(db.session.scalars(db.select(Course.id).where(Course.id.in_(course_ids))))
+
+    statuses = []
+    to_insert = []
+    seen = set()
+    for pair in pairs:
+        student_id, course_id = pair
+        if pair in seen:
+            statuses.append('duplicate')
+        elif student_id not in valid_students:
+            statuses.append('invalid_student')
+        elif course_id not in valid_courses:
+            statuses.append('invalid_course')
+        else:
+            statuses.append(None)
+            to_insert.append({'student_id': student_id, 'course_id': course_id})
+        seen.add(pair)
+
+    inserted = set()
+    if to_insert:
+        stmt = dialect_insert(StudentCourse).on_conflict_do_nothing(
+            index_elements=['student_id', 'course_id']
+        ).returning(StudentCourse.student_id, StudentCourse.course_id)
+        inserted = {tuple(row) for row in db.session.execute(stmt, to_insert)}
+    db.session.commit()
+
+    results = []
+    summary = {'created': 0, 'already_enrolled': 0, 'duplicate': 0, 'invalid_student': 0, 'invalid_course': 0}
+    for (student_id, course_id), status in zip(pairs, statuses):
+        if status is None:
+            status = 'created' if (student_id, course_id) in inserted else 'already_enrolled'
+        summary[status] += 1
+        results.append({'student_id': student_id, 'course_id': course_id, 'status': status})
+
+    # Atamaya konu olan öğrencilerin ders sayıları tek sorguda
+    touched_students = sorted(valid_students)
+    course_counts = dict(db.session.query(
+        StudentCourse.student_id, func.count(StudentCourse.id)
+    ).filter(StudentCourse.student_id.in_(touched_students)).group_by(StudentCourse.student_id).all())
+    warnings = [
+        {
+            'student_id': student_id,
+            'course_count': course_counts.get(student_id, 0),
+            'warning': f'Her öğrenci minimum {MIN_COURSES_PER_STUDENT} derse kayıtlı olmalıdır'
+        }
+        for student_id in touched_students
+        if course_counts.get(student_id, 0) < MIN_COURSES_PER_STUDENT
+    ]
+
+    for student_id, course_id in sorted(inserted):
+        invalidate_student_feed(student_id)
+    event_broker.publish_many([
+        (student_channel(student_id), ENROLLMENT_CHANGED, {'course_id': course_id})
+        for student_id, course_id in sorted(inserted)
+    ])
+
+    return {'summary': summary, 'results': results, 'warnings': warnings}
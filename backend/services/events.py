@@ -0,0 +1,195 @@
+"""
+Öğrenci olay akışı (Server-Sent Events) için süreç içi yayın/abonelik
+
+Olaylar kanallara yayınlanır: ders kanalına (sınav açıldı/kapandı/değişti)
+o dersin tüm öğrencileri, öğrenci kanalına (sonuç yayınlandı, ders kaydı
+değişti) yalnızca o öğrenci abonedir. Her SSE bağlantısı kendi kuyruğuyla
+abone olur ve olay gelene kadar bekler; hiçbir şey değişmediğinde yalnızca
+periyodik bir heartbeat yorumu gönderilir.
+
+Birden çok gunicorn worker'ı ile:
+    - PostgreSQL'de olaylar pg_notify ile yayınlanır; her worker'daki dinleyici
+      thread LISTEN ile olayları alır ve kendi abonelerine dağıtır.
+    - Diğer veritabanlarında (SQLite) olaylar yalnızca yayınlayan worker'ın
+      abonelerine iletilir.
+"""
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from sqlalchemy import text
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# pg_notify kanal adı (tüm worker'lar bu kanalı dinler)
+NOTIFY_CHANNEL = 'exam_events'
+
+EXAM_OPENED = 'exam_opened'
+EXAM_CLOSED = 'exam_closed'
+EXAM_UPDATED = 'exam_updated'
+RESULT_PUBLISHED = 'result_published'
+ENROLLMENT_CHANGED = 'enrollment_changed'
+
+
+def course_channel(course_id):
+    return f'course:{course_id}'
+
+
+def student_channel(student_id):
+    return f'student:{student_id}'
+
+
+def format_sse(event, data):
+    """Tek bir SSE mesajı (event + data satırları)"""
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+class Subscription:
+    """Bir SSE bağlantısının kanalları ve olay kuyruğu"""
+
+    def __init__(self, channels, maxsize):
+        self.channels = set(channels)
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def get(self, timeout):
+        """Sıradaki olay; timeout içinde olay gelmezse None"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    """Kanal bazlı yayın/abonelik; PostgreSQL'de LISTEN/NOTIFY ile worker'lar arası"""
+
+    def __init__(self):
+        self._subscribers = {}  # kanal -> {Subscription}
+        self._lock = threading.Lock()
+        self._listener = None
+        self.app = None
+        self.bridge = False
+        self.queue_size = 100
+        self.published_count = 0
+        self.delivered_count = 0
+
+    def init_app(self, app):
+        """Uygulama ayarlarını oku; dinleyici thread ilk abonelikte başlatılır (fork sonrası güvenli)"""
+        self.app = app
+        self.queue_size = app.config['EVENT_STREAM_QUEUE_SIZE']
+        self.bridge = app.config['SQLALCHEMY_DATABASE_URI'].startswith('postgresql')
+
+    def subscribe(self, channels):
+        subscription = Subscription(channels, self.queue_size)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+            if self.bridge and (self._listener is None or not self._listener.is_alive()):
+                self._listener = threading.Thread(target=self._listen, name='event-listener', daemon=True)
+                self._listener.start()
+        return subscription
+
+    def update_channels(self, subscription, channels):
+        """Aboneliğin kanallarını değiştir (ör. öğrencinin ders kaydı değiştiğinde)"""
+        with self._lock:
+            self._remove(subscription)
+            subscription.channels = set(channels)
+            for channel in subscription.channels:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._remove(subscription)
+
+    def _remove(self, subscription):
+        for channel in subscription.channels:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def publish(self, channel, event, data=None):
+        """Olayı yayınla; hata isteği başarısız kılmaz (istemciler yeniden bağlanınca yeniler)
+
+        Uygulama bağlamı içinde ve ilgili değişiklik commit edildikten sonra çağrılmalıdır.
+        """
+        self.publish_many([(channel, event, data)])
+
+    def publish_many(self, events):
+        """(kanal, olay, veri) listesini yayınla; PostgreSQL'de tek bağlantı ve tek commit kullanılır"""
+        messages = [{'channel': channel, 'event': event, 'data': data or {}} for channel, event, data in events]
+        if not messages:
+            return
+        self.published_count += len(messages)
+        if self.bridge:
+            try:
+                with db.engine.connect() as connection:
+                    connection.execute(
+                        text('SELECT pg_notify(:channel, :payload)'),
+                        [{'channel': NOTIFY_CHANNEL, 'payload': json.dumps(message)} for message in messages]
+                    )
+                    connection.commit()
+                return
+            except Exception:
+                logger.exception('Olay pg_notify ile yayınlanamadı, yalnızca bu worker\'a iletiliyor')
+        for message in messages:
+            self._deliver(message)
+
+    def _deliver(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(message['channel'], ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+                self.delivered_count += 1
+            except queue.Full:
+                # Kuyrukta bekleyen olaylar zaten istemcinin listeyi yenilemesine yol açar
+                pass
+
+    def _listen(self):
+        """pg_notify olaylarını dinleyip yerel abonelere dağıt (bağlantı koparsa yeniden bağlanır)"""
+        while True:
+            raw_connection = None
+            try:
+                with self.app.app_context():
+                    raw_connection = db.engine.raw_connection()
+                connection = raw_connection.driver_connection
+                connection.autocommit = True
+                connection.cursor().execute(f'LISTEN {NOTIFY_CHANNEL}')
+                logger.info('Olay dinleyicisi başlatıldı')
+                while True:
+                    if select.select([connection], [], [], 30) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        self._deliver(json.loads(notify.payload))
+            except Exception:
+                logger.exception('Olay dinleyicisi koptu, yeniden bağlanılacak')
+                time.sleep(5)
+            finally:
+                if raw_connection is not None:
+                    # LISTEN oturuma bağlıdır; bağlantı havuza geri verilmeden kapatılır
+                    try:
+                        raw_connection.invalidate()
+                    except Exception:
+                        pass
+
+    def subscriber_count(self):
+        with self._lock:
+            return len({subscription for subscribers in self._subscribers.values() for subscription in subscribers})
+
+    def stats(self):
+        return {
+            'bridge': 'postgresql' if self.bridge else 'local',
+            'listening': self._listener is not None and self._listener.is_alive(),
+            'subscribers': self.subscriber_count(),
+            'published_count': self.published_count,
+            'delivered_count': self.delivered_count
+        }
+
+
+event_broker = EventBroker()
@@ -1,7 +1,32 @@
 from datetime import datetime, timedelta
+from flask import current_app
 from models import db, Exam, ExamAttempt, StudentAnswer, Question, AnswerOption
-from sqlalchemy import and_
+from sqlalchemy import and_, select
+from config import Config
+from utils.cache import LRUCache
 from utils.timezone import get_istanbul_now
+from services.grade_service import refresh_course_grades
+from services.question_service import load_exam_questions, apply_question_order, attempt_question_seed, generate_question_seed
+from services.answer_buffer import answer_buffer, save_answer_rows
+from utils.db import insert_ignore_returning, dialect_insert
+from utils.etag import make_etag
+from services.events import event_broker, student_channel, RESULT_PUBLISHED
+
+# Kağıt ve cevap anahtarı önbellekleri (sürüm, değer) tutar; sürüm Exam.updated_at'tir.
+# Düzenleme başka bir worker'da yapıldığında bu worker'ın önbelleği invalidate edilmez,
+# ancak sınav satırının sürümü değiştiği için girdi kullanılmadan önce yeniden yüklenir.
+
+# exam_id -> (sürüm, cevap anahtarı) (bkz. load_answer_key)
+answer_key_cache = LRUCache(maxsize=Config.ANSWER_KEY_CACHE_SIZE, ttl=Config.ANSWER_KEY_CACHE_TTL)
+
+# exam_id -> (sürüm, öğrenciye gösterilen soru kağıdı) (bkz. build_exam_paper)
+exam_paper_cache = LRUCache(maxsize=Config.EXAM_PAPER_CACHE_SIZE, ttl=Config.EXAM_PAPER_CACHE_TTL)
+
+# attempt_id -> (student_id, bitiş zamanı, gönderildi mi) (bkz. load_attempt_clock)
+attempt_clock_cache = LRUCache(maxsize=Config.ATTEMPT_CLOCK_CACHE_SIZE, ttl=Config.ATTEMPT_CLOCK_CACHE_TTL)
+
+# student_id -> bitmemiş sınavlar ve giriş durumları (bkz. load_student_exam_feed)
+exam_feed_cache = LRUCache(maxsize=Config.EXAM_FEED_CACHE_SIZE, ttl=Config.EXAM_FEED_CACHE_TTL)
 
 
 def check_exam_time(exam):
@@ -40,49 +65,293 @@ def can_start_exam(exam, student_id):
     return True, "OK"
 
 
-def auto_submit_exam(attempt_id):
-    """Sınavı otomatik olarak gönder (zaman dolduğunda - İstanbul saati)"""
-    attempt = ExamAttempt.query.get(attempt_id)
-    if not attempt or attempt.submitted_at:
-        return
+def compute_deadline(start_time, duration_minutes, exam_end_time):
+    """Giriş bitiş zamanı: başlangıç + süre, sınavın bitiş zamanı ile sınırlı"""
+    return min(start_time + timedelta(minutes=duration_minutes), exam_end_time)
+
+
+def attempt_deadline(attempt, exam):
+    """Girişin bitiş zamanı (bkz. compute_deadline)"""
+    return compute_deadline(attempt.start_time, exam.duration_minutes, exam.end_time)
+
+
+def submission_grace():
+    """Bitiş zamanından sonra istemci gönderiminin kabul edildiği ek süre
+
+    Otomatik gönderim bitiş zamanı + bu süre geçtikten sonra yapılır; böylece
+    istemcinin süre dolduğunda yaptığı kendi gönderimi zamanlayıcıyla yarışmaz.
+    Süre en az iki tampon yazma aralığıdır: otomatik gönderim yapıldığında diğer
+    worker'ların tamponlarındaki otomatik kayıtlar da yazılmış olur.
+    """
+    return timedelta(seconds=max(
+        current_app.config['AUTO_SUBMIT_GRACE_SECONDS'],
+        2 * current_app.config['ANSWER_BUFFER_FLUSH_INTERVAL']
+    ))
+
+
+def load_attempt_clock(attempt_id):
+    """Girişin öğrencisi, bitiş zamanı ve gönderim durumu (ORM nesnesi oluşturmadan tek satır)"""
+    row = db.session.execute(
+        select(
+            ExamAttempt.student_id, ExamAttempt.start_time, ExamAttempt.submitted_at,
+            Exam.duration_minutes, Exam.end_time
+        ).join(Exam, Exam.id == ExamAttempt.exam_id).where(ExamAttempt.id == attempt_id)
+    ).first()
+    if row is None:
+        return None
+    student_id, start_time, submitted_at, duration_minutes, end_time = row
+    return student_id, compute_deadline(start_time, duration_minutes, end_time), submitted_at is not None
+
+
+def get_attempt_clock(attempt_id):
+    """Girişin saat bilgisi (önbellekten; giriş yoksa None, bu sonuç önbelleğe yazılmaz)"""
+    return attempt_clock_cache.get_or_load(attempt_id, lambda: load_attempt_clock(attempt_id), cache_none=False)
+
+
+def invalidate_attempt_clock(attempt_id=None):
+    """Giriş gönderildiğinde (veya sınav saatleri değiştiğinde tümü) saat bilgisini sil"""
+    if attempt_id is None:
+        attempt_clock_cache.clear()
+    else:
+        attempt_clock_cache.invalidate(attempt_id)
+
+
+def load_open_attempt_deadlines(attempt_ids=None):
+    """Gönderilmemiş girişlerin (bitiş zamanı, attempt_id) listesini tek sorguda getir"""
+    query = db.session.query(
+        ExamAttempt.id, ExamAttempt.start_time, Exam.duration_minutes, Exam.end_time
+    ).join(Exam, Exam.id == ExamAttempt.exam_id).filter(ExamAttempt.submitted_at.is_(None))
+    if attempt_ids is not None:
+        query = query.filter(ExamAttempt.id.in_(attempt_ids))
+    return [
+        (compute_deadline(start_time, duration_minutes, end_time), attempt_id)
+        for attempt_id, start_time, duration_minutes, end_time in query.all()
+    ]
+
+
+def auto_submit_attempts(attempt_ids, now=None):
+    """Süresi ve ek süresi (bkz. submission_grace) dolmuş girişleri toplu olarak otomatik gönder
     
-    exam = attempt.exam
-    # İstanbul saatine göre kontrol et
-    now = get_istanbul_now()
+    Birden çok worker/scheduler aynı girişi işlemeye çalışabilir: satırlar
+    PostgreSQL'de SKIP LOCKED ile kilitlenir ve gönderim zamanı yalnızca
+    submitted_at hâlâ boşsa yazılır, böylece her giriş bir kez gönderilir.
+    Ders notları tek seferde güncellenir ve tek commit yapılır. Gönderilen
+    giriş sayısını döndürür.
+    """
+    if not attempt_ids:
+        return 0
+    now = now or get_istanbul_now()
+    grace = submission_grace()
     
-    # Sınav süresi dolmuş mu veya end_time geçmiş mi?
-    exam_end_time = attempt.start_time + timedelta(minutes=exam.duration_minutes)
-    if now >= exam_end_time or now >= exam.end_time:
-        calculate_exam_score(attempt)
-        attempt.submitted_at = now
-        attempt.end_time = now
+    rows = db.session.query(ExamAttempt, Exam).join(Exam, Exam.id == ExamAttempt.exam_id).filter(
+        ExamAttempt.id.in_(attempt_ids),
+        ExamAttempt.submitted_at.is_(None)
+    ).with_for_update(of=ExamAttempt, skip_locked=True).all()
+    
+    submitted = []
+    buffered_rows = []
+    try:
+        for attempt, exam in rows:
+            if attempt_deadline(attempt, exam) + grace > now:
+                continue
+            
+            # Bu worker'ın tamponunda bekleyen otomatik kayıtlar puanlamadan önce yazılır
+            taken = answer_buffer.take(attempt.id)
+            buffered_rows.extend(taken)
+            save_answer_rows(taken)
+            total_score = grade_stored_answers(attempt)
+            
+            result = db.session.execute(
+                db.update(ExamAttempt).where(
+                    ExamAttempt.id == attempt.id,
+                    ExamAttempt.submitted_at.is_(None)
+                ).values(submitted_at=now, end_time=now, total_score=total_score),
+                execution_options={'synchronize_session': False}
+            )
+            if result.rowcount == 1:
+                submitted.append((attempt.student_id, exam.course_id, exam.id, attempt.id))
+        
+        if submitted:
+            refresh_course_grades(
+                student_ids=sorted({student_id for student_id, _, _, _ in submitted}),
+                course_ids=sorted({course_id for _, course_id, _, _ in submitted})
+            )
         db.session.commit()
+    except Exception:
+        # Tampondan alınan cevaplar kaybolmasın; bir sonraki yazmada veya gönderimde kullanılır
+        db.session.rollback()
+        answer_buffer.restore(buffered_rows)
+        raise
+    
+    for student_id, _, exam_id, attempt_id in submitted:
+        invalidate_student_feed(student_id)
+        invalidate_attempt_clock(attempt_id)
+        event_broker.publish(student_channel(student_id), RESULT_PUBLISHED, {'exam_id': exam_id})
+    return len(submitted)
 
 
-def calculate_exam_score(attempt):
-    """Sınav puanını hesapla"""
-    total_points = 0.0
-    max_points = 0.0
+def load_student_exam_feed(student_id):
+    """Öğrencinin derslerindeki bitmemiş sınavları giriş durumlarıyla tek sorguda yükle
     
-    # Tüm soruları al
-    exam = attempt.exam
-    questions = Question.query.filter_by(exam_id=exam.id).all()
+    Sınav, ders kaydı (inner join) ve giriş (left join) birlikte okunur; dersin
+    departmanı ve öğretim üyesi de aynı sorguda yüklenir. Aktif/yaklaşan
+    ayrımı önbellekten okunurken yapılır (bkz. build_exam_feed).
+    """
+    from models import StudentCourse
+    from serializers import with_load_plan
     
-    for question in questions:
-        max_points += question.points
-        
-        # Öğrencinin cevabını bul
-        student_answer = StudentAnswer.query.filter_by(
-            attempt_id=attempt.id,
-            question_id=question.id
-        ).first()
-        
-        if student_answer and student_answer.is_correct:
-            total_points += question.points
+    query = db.session.query(Exam, ExamAttempt.id, ExamAttempt.submitted_at).join(
+        StudentCourse, and_(StudentCourse.course_id == Exam.course_id, StudentCourse.student_id == student_id)
+    ).outerjoin(
+        ExamAttempt, and_(ExamAttempt.exam_id == Exam.id, ExamAttempt.student_id == student_id)
+    ).filter(Exam.end_time >= get_istanbul_now())
+    
+    rows = with_load_plan(query, 'exam').order_by(Exam.start_time, Exam.id).all()
+    return tuple(
+        {
+            'exam': exam.to_dict(),
+            'start_time': exam.start_time,
+            'end_time': exam.end_time,
+            'has_attempt': attempt_id is not None,
+            'submitted': submitted_at is not None
+        }
+        for exam, attempt_id, submitted_at in rows
+    )
+
+
+def build_exam_feed(entries, now):
+    """Önbellekteki kayıtları şu anki zamana göre aktif ve yaklaşan sınavlara ayır"""
+    exam_list = []
+    upcoming_list = []
+    for entry in entries:
+        if entry['start_time'] <= now <= entry['end_time']:
+            exam_list.append(dict(
+                entry['exam'],
+                can_start=not entry['has_attempt'],
+                already_taken=entry['submitted'],
+                in_progress=entry['has_attempt'] and not entry['submitted']
+            ))
+        elif entry['start_time'] > now:
+            upcoming_list.append(dict(
+                entry['exam'],
+                is_upcoming=True,
+                can_start=False,
+                already_taken=False,
+                in_progress=False
+            ))
+    return {'exams': exam_list, 'upcoming_exams': upcoming_list}
+
+
+def _load_versioned_exam_feed(student_id):
+    entries = load_student_exam_feed(student_id)
+    return entries, make_etag(entries)
+
+
+def _feed_phase(entry, now):
+    if entry['start_time'] <= now <= entry['end_time']:
+        return 'active'
+    return 'upcoming' if entry['start_time'] > now else 'closed'
+
+
+def get_student_exam_feed(student_id):
+    """Öğrencinin aktif/yaklaşan sınav listesi (kısa süreli önbellekten)"""
+    _, build = get_student_exam_feed_versioned(student_id)
+    return build()
+
+
+def get_student_exam_feed_versioned(student_id):
+    """Sınav listesinin sürümü ve listeyi oluşturan fonksiyon
+    
+    Sürüm, yüklemede bir kez hesaplanan kayıt özetinden ve sınavların o anki
+    aktif/yaklaşan durumundan oluşur; 304 yanıtında liste hiç oluşturulmaz.
+    """
+    entries, digest = exam_feed_cache.get_or_load(student_id, lambda: _load_versioned_exam_feed(student_id))
+    now = get_istanbul_now()
+    version = (digest, tuple(_feed_phase(entry, now) for entry in entries))
+    return version, lambda: build_exam_feed(entries, now)
+
+
+def invalidate_student_feed(student_id):
+    """Öğrencinin girişi oluştuğunda/gönderildiğinde sınav listesini önbellekten sil"""
+    exam_feed_cache.invalidate(student_id)
+
+
+def invalidate_exam_feeds():
+    """Sınav oluşturulduğunda/değiştiğinde tüm öğrencilerin sınav listelerini sil"""
+    exam_feed_cache.clear()
+
+
+def load_start_context(exam_id, student_id):
+    """Sınav, öğrencinin kaydı ve mevcut girişi tek sorguda
+    
+    (exam, enrolled, attempt) döndürür; sınav yoksa None. Sınavın dersi,
+    departmanı ve öğretim üyesi de (to_dict için) aynı sorguda yüklenir.
+    """
+    from models import StudentCourse
+    from serializers import with_load_plan
+    
+    query = db.session.query(Exam, StudentCourse.id, ExamAttempt).outerjoin(
+        StudentCourse, and_(StudentCourse.course_id == Exam.course_id, StudentCourse.student_id == student_id)
+    ).outerjoin(
+        ExamAttempt, and_(ExamAttempt.exam_id == Exam.id, ExamAttempt.student_id == student_id)
+    ).filter(Exam.id == exam_id)
+    
+    row = with_load_plan(query, 'exam').first()
+    if row is None:
+        return None
+    exam, enrollment_id, attempt = row
+    return exam, enrollment_id is not None, attempt
+
+
+def create_attempt(exam_id, student_id, now):
+    """Girişi çakışmasız oluştur; aynı öğrenci için eşzamanlı ikinci istek None alır"""
+    return insert_ignore_returning(ExamAttempt, {
+        'exam_id': exam_id,
+        'student_id': student_id,
+        'start_time': now,
+        'question_seed': generate_question_seed(),
+        'total_score': 0.0
+    }, ['exam_id', 'student_id'])
+
+
+def save_late_answers(rows):
+    """Gönderilmiş girişlere, gönderimden önce kabul edilip tampondan geç yazılan cevapları ekle
     
-    # Toplam puanı güncelle
-    attempt.total_score = total_points
-    db.session.commit()
+    Gönderimin kaydettiği cevapların üzerine yazılmaz (ON CONFLICT DO NOTHING);
+    cevap eklenen girişler yeniden puanlanır ve ders notları güncellenir.
+    Commit çağıran tarafa bırakılır. Yeniden puanlanan girişlerin
+    (student_id, exam_id) listesini döndürür.
+    """
+    if not rows:
+        return []
+    stmt = dialect_insert(StudentAnswer).on_conflict_do_nothing(
+        index_elements=['attempt_id', 'question_id']
+    ).returning(StudentAnswer.attempt_id)
+    attempt_ids = set(db.session.scalars(stmt, rows))
+    if not attempt_ids:
+        return []
+    
+    attempts = db.session.query(ExamAttempt, Exam.course_id).join(Exam, Exam.id == ExamAttempt.exam_id).filter(
+        ExamAttempt.id.in_(attempt_ids)
+    ).all()
+    for attempt, _ in attempts:
+        grade_stored_answers(attempt)
+    refresh_course_grades(
+        student_ids=sorted({attempt.student_id for attempt, _ in attempts}),
+        course_ids=sorted({course_id for _, course_id in attempts})
+    )
+    return [(attempt.student_id, attempt.exam_id) for attempt, _ in attempts]
+
+
+def auto_submit_exam(attempt_id):
+    """Sınavı otomatik olarak gönder (zaman dolduğunda - İstanbul saati)"""
+    return auto_submit_attempts([attempt_id]) == 1
+
+
+def calculate_exam_score(attempt):
+    """Sınav puanını hesapla (commit çağıran tarafa bırakılır)"""
+    max_points = attempt.exam.max_points
+    total_points = grade_stored_answers(attempt)
     
     return {
         'total_score': total_points,
@@ -91,6 +360,215 @@ def calculate_exam_score(attempt):
     }
 
 
+def load_answer_key(exam_id):
+    """Sınavın cevap anahtarını tek sorguda yükle
+    
+    {'questions': {question_id: points},
+     'options': {option_id: (question_id, is_correct, points)}} döndürür.
+    """
+    rows = db.session.query(
+        Question.id, Question.points, AnswerOption.id, AnswerOption.is_correct
+    ).outerjoin(AnswerOption, AnswerOption.question_id == Question.id).filter(
+        Question.exam_id == exam_id
+    ).all()
+    
+    questions = {}
+    options = {}
+    for question_id, points, option_id, is_correct in rows:
+        questions[question_id] = points
+        if option_id is not None:
+            options[option_id] = (question_id, is_correct, points)
+    
+    return {'questions': questions, 'options': options}
+
+
+def exam_version(exam_id):
+    """Sınav içeriğinin sürümü (Exam.updated_at; soru/seçenek değişikliklerinde ilerletilir)"""
+    return db.session.scalar(select(Exam.updated_at).where(Exam.id == exam_id))
+
+
+def _get_versioned(cache, exam_id, version, load):
+    """Önbellekteki değeri sınavın güncel sürümüyle doğrulayarak getir
+
+    version verilmezse (çağıran sınav satırını yüklemediyse) tek bir sorgu ile okunur.
+    Sürüm farklıysa girdi başka bir worker'daki düzenlemeden eskimiştir ve yeniden yüklenir.
+    """
+    if version is None:
+        version = exam_version(exam_id)
+    loader = lambda: (exam_version(exam_id), load(exam_id))
+    cached_version, value = cache.get_or_load(exam_id, loader)
+    if cached_version != version:
+        cache.invalidate(exam_id)
+        cached_version, value = cache.get_or_load(exam_id, loader)
+    return value
+
+
+def get_answer_key(exam_id, version=None):
+    """Cevap anahtarını önbellekten getir, yoksa veya eskimişse veritabanından yükle
+
+    version: çağıranın elindeki Exam.updated_at (verilirse sürüm için sorgu yapılmaz)
+    """
+    return _get_versioned(answer_key_cache, exam_id, version, load_answer_key)
+
+
+def invalidate_answer_key(exam_id):
+    """Sınavın soruları/seçenekleri değiştiğinde önbellekteki cevap anahtarını sil"""
+    answer_key_cache.invalidate(exam_id)
+
+
+def get_attempt_answers(attempt_id):
+    """Sınav girişinin kayıtlı cevaplarını tek sorguda {question_id: selected_option_id} olarak getir"""
+    answers = dict(db.session.query(
+        StudentAnswer.question_id, StudentAnswer.selected_option_id
+    ).filter(StudentAnswer.attempt_id == attempt_id).all())
+    # Bu worker'ın tamponunda bekleyen otomatik kayıtlar daha yenidir
+    answers.update(answer_buffer.peek(attempt_id))
+    return answers
+
+
+def build_exam_paper(exam_id):
+    """Sınavın doğru cevapları içermeyen soru kağıdını id sırasında oluştur
+
+    Kağıt tüm öğrenciler arasında paylaşılır; değiştirilmemesi için sorular
+    ve şıklar tuple olarak tutulur.
+    """
+    return tuple(
+        dict(question, answer_options=tuple(question['answer_options']))
+        for question in load_exam_questions(exam_id, include_correct=False)
+    )
+
+
+def get_exam_paper(exam_id, version=None):
+    """Soru kağıdını önbellekten getir (eşzamanlı ıskalarda tek bir yükleme yapılır; bkz. get_answer_key)"""
+    return _get_versioned(exam_paper_cache, exam_id, version, build_exam_paper)
+
+
+def get_attempt_paper(attempt):
+    """Paylaşılan kağıda girişin kayıtlı sıralamasını uygula"""
+    paper = get_exam_paper(attempt.exam_id, attempt.exam.updated_at)
+    return apply_question_order(paper, attempt_question_seed(attempt))
+
+
+def invalidate_exam_content(exam_id):
+    """Sınav içeriği değiştiğinde soru kağıdını, cevap anahtarını ve sınav listelerini önbellekten sil"""
+    exam_paper_cache.invalidate(exam_id)
+    invalidate_answer_key(exam_id)
+    # Listelerdeki soru sayısı/maksimum puan ve sınav saatleri de değişmiş olabilir
+    invalidate_exam_feeds()
+
+
+def warm_exam_content(exam_ids):
+    """Başlamak üzere olan sınavların kağıt ve cevap anahtarlarını önceden yükle"""
+    for exam_id in exam_ids:
+        get_exam_paper(exam_id)
+        get_answer_key(exam_id)
+
+
+def parse_id(value):
+    """İstemciden gelen ID'yi tam sayıya çevir ("12" -> 12); geçersizse None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+
+def grade_answers(answer_key, attempt_id, answers):
+    """Cevapları veritabanına gitmeden cevap anahtarına göre doğrula ve puanla
+    
+    answers: [{question_id, selected_option_id}, ...] (ID'ler metin olarak da gelebilir)
+    (StudentAnswer satırları, toplam puan) döndürür. Sınava ait olmayan sorular
+    atlanır; soruya ait olmayan seçenekler boş cevap olarak kaydedilir. Aynı
+    soru birden çok kez gönderilirse son cevap geçerlidir.
+    """
+    questions = answer_key['questions']
+    options = answer_key['options']
+    graded = {}
+    
+    for answer_data in answers:
+        question_id = parse_id(answer_data.get('question_id'))
+        selected_option_id = parse_id(answer_data.get('selected_option_id'))
+        
+        if question_id is None or question_id not in questions:
+            continue
+        
+        is_correct = False
+        points_earned = 0.0
+        option = options.get(selected_option_id) if selected_option_id else None
+        
+        if option is None or option[0] != question_id:
+            selected_option_id = None
+        elif option[1]:
+            is_correct = True
+            points_earned = option[2]
+        
+        graded[question_id] = {
+            'attempt_id': attempt_id,
+            'question_id': question_id,
+            'selected_option_id': selected_option_id,
+            'is_correct': is_correct,
+            'points_earned': points_earned
+        }
+    
+    rows = list(graded.values())
+    return rows, sum(row['points_earned'] for row in rows)
+
+
+def grade_stored_answers(attempt):
+    """Girişin kayıtlı cevaplarını cevap anahtarına göre puanla
+    
+    Cevaplar tek sorguda okunur, değişen satırların is_correct/points_earned
+    alanları tek bir toplu update ile yazılır ve total_score ayarlanır.
+    Commit çağıran tarafa bırakılır.
+    """
+    answer_key = get_answer_key(attempt.exam_id, attempt.exam.updated_at)
+    options = answer_key['options']
+    
+    rows = db.session.query(
+        StudentAnswer.id,
+        StudentAnswer.question_id,
+        StudentAnswer.selected_option_id,
+        StudentAnswer.is_correct,
+        StudentAnswer.points_earned
+    ).filter(StudentAnswer.attempt_id == attempt.id).all()
+    
+    total_score = 0.0
+    updates = []
+    for answer_id, question_id, selected_option_id, stored_correct, stored_points in rows:
+        option = options.get(selected_option_id) if selected_option_id else None
+        is_correct = bool(option and option[0] == question_id and option[1])
+        points_earned = option[2] if is_correct else 0.0
+        total_score += points_earned
+        if is_correct != stored_correct or points_earned != stored_points:
+            updates.append({'id': answer_id, 'is_correct': is_correct, 'points_earned': points_earned})
+    
+    if updates:
+        db.session.execute(db.update(StudentAnswer), updates)
+    
+    attempt.total_score = total_score
+    return total_score
+
+
+def grade_submission(attempt, answers, buffered_rows=()):
+    """Gönderimdeki cevapları kaydet ve girişin tüm kayıtlı cevaplarını puanla
+    
+    answers (varsa) tampondan alınmış otomatik kayıtların (buffered_rows, bkz.
+    AnswerBuffer.take) üzerine upsert edilir; gönderimde yer almayan ama daha
+    önce otomatik kaydedilmiş cevaplar korunur. Commit çağıran tarafa
+    bırakılır; commit başarısız olursa buffered_rows tampona geri konmalıdır.
+    """
+    rows = list(buffered_rows)
+    if answers:
+        answer_key = get_answer_key(attempt.exam_id, attempt.exam.updated_at)
+        submitted_rows, _ = grade_answers(answer_key, attempt.id, answers)
+        rows = {row['question_id']: row for row in rows + submitted_rows}.values()
+    save_answer_rows(list(rows))
+    
+    return grade_stored_answers(attempt)
+
+
 def get_random_questions(exam_id):
     """Sınav sorularını rastgele sırala"""
     questions = Question.query.filter_by(exam_id=exam_id).all()
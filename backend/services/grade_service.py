@@ -1,46 +1,16 @@
-from models import db, Exam, ExamAttempt, Course, StudentCourse
+from models import db, Exam, ExamAttempt, Course, StudentCourse, CourseGrade
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from datetime import datetime
 
 
-def calculate_course_grade(student_id, course_id):
-    """Ders başarı notunu hesapla (ağırlıklı ortalama)"""
-    # Öğrencinin bu dersteki tüm sınav girişlerini al
-    attempts = db.session.query(ExamAttempt).join(Exam).filter(
-        ExamAttempt.student_id == student_id,
-        Exam.course_id == course_id,
-        ExamAttempt.submitted_at.isnot(None)
-    ).all()
-    
-    if not attempts:
-        return None
-    
-    # Her sınav tipi için puanları topla
-    vize_score = 0.0
-    final_score = 0.0
-    vize_weight = 0.0
-    final_weight = 0.0
-    
-    for attempt in attempts:
-        exam = attempt.exam
-        
-        # Toplam puanı hesapla
-        total_points = attempt.total_score
-        max_points = sum(q.points for q in exam.questions)
-        percentage = (total_points / max_points * 100) if max_points > 0 else 0
-        
-        if exam.exam_type == 'vize':
-            vize_score = percentage
-            vize_weight = exam.weight_percentage
-        elif exam.exam_type == 'final':
-            final_score = percentage
-            final_weight = exam.weight_percentage
-    
-    # Ağırlıklı ortalama hesapla
+def _build_grade(vize_score, final_score, vize_weight, final_weight):
+    """Vize/final yüzdelerinden ağırlıklı ders notunu oluştur"""
     if vize_weight + final_weight > 0:
         final_grade = (vize_score * vize_weight + final_score * final_weight) / (vize_weight + final_weight)
     else:
         final_grade = (vize_score + final_score) / 2 if (vize_score > 0 or final_score > 0) else 0
-    
+
     return {
         'vize_score': vize_score,
         'final_score': final_score,
@@ -50,59 +20,220 @@ def calculate_course_grade(student_id, course_id):
     }
 
 
-def get_course_statistics(course_id):
-    """Ders istatistiklerini hesapla"""
-    # Derse kayıtlı öğrenci sayısı
-    student_count = StudentCourse.query.filter_by(course_id=course_id).count()
-    
-    # Sınav sayıları
-    exams = Exam.query.filter_by(course_id=course_id).all()
-    
+def compute_course_grades(student_ids=None, course_ids=None):
+    """Birden çok öğrenci/ders için ders notlarını sabit sayıda sorgu ile hesapla
+
+    {(student_id, course_id): grade_info} döndürür. Her sınav tipi için
+    calculate_course_grade ile aynı şekilde son giriş geçerlidir.
+    """
+    query = db.session.query(
+        ExamAttempt.student_id,
+        Exam.course_id,
+        Exam.exam_type,
+        Exam.weight_percentage,
+        ExamAttempt.total_score,
+        Exam.max_points
+    ).join(Exam, Exam.id == ExamAttempt.exam_id).filter(ExamAttempt.submitted_at.isnot(None))
+
+    if student_ids is not None:
+        if not student_ids:
+            return {}
+        query = query.filter(ExamAttempt.student_id.in_(student_ids))
+    if course_ids is not None:
+        if not course_ids:
+            return {}
+        query = query.filter(Exam.course_id.in_(course_ids))
+
+    # (student_id, course_id) -> [vize_score, final_score, vize_weight, final_weight]
+    scores = {}
+    for student_id, course_id, exam_type, weight, total_score, max_points in query.order_by(ExamAttempt.id).all():
+        percentage = (total_score / max_points * 100) if max_points > 0 else 0
+        entry = scores.setdefault((student_id, course_id), [0.0, 0.0, 0.0, 0.0])
+
+        if exam_type == 'vize':
+            entry[0] = percentage
+            entry[2] = weight
+        elif exam_type == 'final':
+            entry[1] = percentage
+            entry[3] = weight
+
+    return {key: _build_grade(*entry) for key, entry in scores.items()}
+
+
+def calculate_course_grade(student_id, course_id):
+    """Ders başarı notunu hesapla (ağırlıklı ortalama)"""
+    grades = compute_course_grades(student_ids=[student_id], course_ids=[course_id])
+    return grades.get((student_id, course_id))
+
+
+def refresh_course_grades(student_ids=None, course_ids=None):
+    """course_grades tablosunu verilen öğrenci/ders kapsamı için yeniden hesapla
+
+    Kapsamdaki satırlar silinip tek bir toplu insert ile yeniden yazılır.
+    Commit çağıran tarafa bırakılır (aynı transaction içinde kalır).
+    Hiçbir filtre verilmezse tablo tamamen yeniden oluşturulur.
+    """
+    grades = compute_course_grades(student_ids=student_ids, course_ids=course_ids)
+
+    delete_query = CourseGrade.query
+    if student_ids is not None:
+        delete_query = delete_query.filter(CourseGrade.student_id.in_(student_ids))
+    if course_ids is not None:
+        delete_query = delete_query.filter(CourseGrade.course_id.in_(course_ids))
+    delete_query.delete(synchronize_session=False)
+
+    if grades:
+        now = datetime.utcnow()
+        db.session.execute(db.insert(CourseGrade), [
+            dict(grade_info, student_id=student_id, course_id=course_id, updated_at=now)
+            for (student_id, course_id), grade_info in grades.items()
+        ])
+
+    return len(grades)
+
+
+def get_stored_course_grades(student_ids=None, course_ids=None):
+    """Önceden hesaplanmış ders notlarını {(student_id, course_id): grade_info} olarak getir"""
+    query = CourseGrade.query
+    if student_ids is not None:
+        query = query.filter(CourseGrade.student_id.in_(student_ids))
+    if course_ids is not None:
+        query = query.filter(CourseGrade.course_id.in_(course_ids))
+    return {(grade.student_id, grade.course_id): grade.to_dict() for grade in query.all()}
+
+
+def compute_course_statistics(course_ids):
+    """Birden çok ders için istatistikleri sabit sayıda sorgu ile hesapla"""
+    if not course_ids:
+        return {}
+
+    # Derse kayıtlı öğrenci sayıları
+    student_counts = dict(db.session.query(
+        StudentCourse.course_id, func.count(StudentCourse.id)
+    ).filter(StudentCourse.course_id.in_(course_ids)).group_by(StudentCourse.course_id).all())
+
+    exams = Exam.query.filter(Exam.course_id.in_(course_ids)).order_by(Exam.id).all()
+    exam_ids = [exam.id for exam in exams]
+
+    # Gönderilmiş girişlerin sayısı ve ortalama puanı
+    attempt_stats = {}
+    if exam_ids:
+        attempt_stats = {
+            exam_id: (attempt_count, avg_score)
+            for exam_id, attempt_count, avg_score in db.session.query(
+                ExamAttempt.exam_id,
+                func.count(ExamAttempt.id),
+                func.avg(ExamAttempt.total_score)
+            ).filter(
+                ExamAttempt.exam_id.in_(exam_ids),
+                ExamAttempt.submitted_at.isnot(None)
+            ).group_by(ExamAttempt.exam_id).all()
+        }
+
     statistics = {
-        'student_count': student_count,
-        'exam_count': len(exams),
-        'exams': []
+        course_id: {
+            'student_count': student_counts.get(course_id, 0),
+            'exam_count': 0,
+            'exams': []
+        }
+        for course_id in course_ids
     }
-    
+
     for exam in exams:
-        # Bu sınava giren öğrenci sayısı
-        attempt_count = ExamAttempt.query.filter(
-            ExamAttempt.exam_id == exam.id,
-            ExamAttempt.submitted_at.isnot(None)
-        ).count()
-        
-        # Ortalama puan
-        avg_score = db.session.query(func.avg(ExamAttempt.total_score)).filter(
-            ExamAttempt.exam_id == exam.id,
-            ExamAttempt.submitted_at.isnot(None)
-        ).scalar() or 0.0
-        
-        # Maksimum puan
-        max_points = sum(q.points for q in exam.questions)
-        
-        statistics['exams'].append({
+        attempt_count, avg_score = attempt_stats.get(exam.id, (0, None))
+        avg_score = float(avg_score or 0.0)
+        max_points = exam.max_points
+
+        course_stats = statistics[exam.course_id]
+        course_stats['exam_count'] += 1
+        course_stats['exams'].append({
             'exam_id': exam.id,
             'exam_type': exam.exam_type,
             'attempt_count': attempt_count,
-            'average_score': round(float(avg_score), 2),
+            'average_score': round(avg_score, 2),
             'max_score': max_points,
-            'average_percentage': round((float(avg_score) / max_points * 100) if max_points > 0 else 0, 2)
+            'average_percentage': round((avg_score / max_points * 100) if max_points > 0 else 0, 2)
         })
-    
+
     return statistics
 
 
+def get_course_statistics(course_id):
+    """Ders istatistiklerini hesapla"""
+    return compute_course_statistics([course_id])[course_id]
+
+
 def get_class_statistics():
     """Sınıf ve genel istatistikler"""
     from models import User, Course
-    
+
     total_students = User.query.filter_by(role='student').count()
     total_instructors = User.query.filter_by(role='instructor').count()
     total_courses = Course.query.count()
-    
+
     return {
         'total_students': total_students,
         'total_instructors': total_instructors,
         'total_courses': total_courses
     }
 
+
+def get_department_statistics():
+    """Bölüm başkanı istatistiklerini öğrenci/ders sayısından bağımsız sabit sayıda sorgu ile hesapla"""
+    from models import User
+
+    general_stats = get_class_statistics()
+
+    # Tüm dersler (departman ve öğretim üyesi ile birlikte tek sorguda)
+    courses = Course.query.options(
+        joinedload(Course.department),
+        joinedload(Course.instructor)
+    ).order_by(Course.id).all()
+    course_dicts = {course.id: course.to_dict() for course in courses}
+    statistics_by_course = compute_course_statistics(list(course_dicts))
+
+    course_statistics = [
+        {'course': course_dicts[course.id], 'statistics': statistics_by_course[course.id]}
+        for course in courses
+    ]
+
+    # Öğrenci notları: kayıtlar ve notlar toplu olarak alınır
+    students = User.query.filter_by(role='student').order_by(User.id).all()
+    enrollments = db.session.query(
+        StudentCourse.student_id, StudentCourse.course_id
+    ).order_by(StudentCourse.id).all()
+    grades = get_stored_course_grades()
+
+    courses_by_student = {}
+    for student_id, course_id in enrollments:
+        grade_info = grades.get((student_id, course_id))
+        if grade_info and course_id in course_dicts:
+            courses_by_student.setdefault(student_id, []).append({
+                'course': course_dicts[course_id],
+                'grade': grade_info
+            })
+
+    student_grades = []
+    for student in students:
+        course_grades = courses_by_student.get(student.id)
+        if course_grades:
+            # Öğrencinin genel ortalaması
+            avg_grade = sum(g['grade']['final_grade'] for g in course_grades) / len(course_grades)
+            student_grades.append({
+                'student': student.to_dict(),
+                'courses': course_grades,
+                'overall_average': round(avg_grade, 2)
+            })
+
+    # Genel sınıf ortalaması
+    if student_grades:
+        overall_class_average = sum(s['overall_average'] for s in student_grades) / len(student_grades)
+    else:
+        overall_class_average = 0
+
+    return {
+        'general_statistics': general_stats,
+        'course_statistics': course_statistics,
+        'student_grades': student_grades,
+        'overall_class_average': round(overall_class_average, 2)
+    }
@@ -0,0 +1,130 @@
+"""
+bcrypt şifre hashleme/doğrulama için ayrı süreç havuzu
+
+bcrypt bilerek yavaş, CPU yoğun bir işlemdir. Sınav öncesi toplu girişlerde
+doğrulamalar web worker'larında yapılırsa diğer endpoint'ler bunların
+arkasında bekler. Hashleme işleri ayrı süreçlerden oluşan bir havuza
+gönderilir ve istek yalnızca sonucu bekler.
+
+Her web worker süreci kendi havuzunu açar; eşzamanlı bcrypt işi sayısı
+web worker sayısı x PASSWORD_HASH_WORKERS olur. Varsayılan havuz boyutu bu
+yüzden çekirdek sayısı / WEB_CONCURRENCY'dir; gunicorn -w ile worker sayısı
+verilirken WEB_CONCURRENCY de aynı değere ayarlanmalı (veya
+PASSWORD_HASH_WORKERS doğrudan çekirdek / worker olarak verilmelidir).
+
+Havuz ilk kullanımda oluşturulur (gunicorn fork'undan sonra) ve 'spawn'
+ile başlatılır. PASSWORD_HASH_WORKERS=0 ise işler istek içinde çalışır.
+
+BCRYPT_LOG_ROUNDS değiştiğinde mevcut hash'ler geçersiz olmaz: farklı
+maliyetle hashlenmiş şifreler başarılı girişte yeni maliyetle yeniden
+hashlenir (bkz. needs_rehash).
+"""
+import atexit
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_ROUNDS = 12
+
+
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _checkpw(password, password_hash):
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def hash_rounds(password_hash):
+    """bcrypt hash'inin maliyet (log rounds) değeri: $2b$12$... -> 12"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """bcrypt işlerini süreç havuzunda çalıştırır"""
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+        self.log_rounds = DEFAULT_LOG_ROUNDS
+        self.workers = 0
+        self.timeout = 30
+        self.rehash_count = 0
+
+    def init_app(self, app):
+        self.log_rounds = app.config['BCRYPT_LOG_ROUNDS']
+        self.workers = app.config['PASSWORD_HASH_WORKERS']
+        self.timeout = app.config['PASSWORD_HASH_TIMEOUT']
+        self.shutdown()
+        atexit.register(self.shutdown)
+
+    def _get_executor(self):
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def _run(self, func, *args):
+        executor = self._get_executor()
+        if executor is None:
+            return func(*args)
+        try:
+            return executor.submit(func, *args).result(timeout=self.timeout)
+        except BrokenProcessPool:
+            # Havuz süreçlerinden biri öldü: havuz yeniden oluşturulur, bu iş istek içinde yapılır
+            logger.warning('Şifre hashleme havuzu bozuldu, yeniden oluşturulacak')
+            self.shutdown()
+            return func(*args)
+
+    def hash(self, password):
+        """Şifreyi yapılandırılmış maliyetle hashle"""
+        return self._run(_hashpw, password, self.log_rounds)
+
+    def hash_many(self, passwords):
+        """Şifreleri havuzdaki tüm süreçlere dağıtarak paralel hashle (sıra korunur)"""
+        executor = self._get_executor()
+        if executor is None:
+            return [_hashpw(password, self.log_rounds) for password in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        try:
+            return list(executor.map(_hashpw, passwords, [self.log_rounds] * len(passwords), chunksize=chunksize))
+        except BrokenProcessPool:
+            logger.warning('Şifre hashleme havuzu bozuldu, yeniden oluşturulacak')
+            self.shutdown()
+            return [_hashpw(password, self.log_rounds) for password in passwords]
+
+    def verify(self, password, password_hash):
+        return self._run(_checkpw, password, password_hash)
+
+    def needs_rehash(self, password_hash):
+        """Hash farklı bir maliyetle oluşturulmuşsa True"""
+        return hash_rounds(password_hash) != self.log_rounds
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'pool_running': self._executor is not None,
+            'log_rounds': self.log_rounds,
+            'rehash_count': self.rehash_count
+        }
+
+
+password_hasher = PasswordHasher()
@@ -1,48 +1,141 @@
 import random
-from models import Question, AnswerOption
+from datetime import datetime
+from models import db, Exam, Question, AnswerOption
+from sqlalchemy import func, select
 
 
-def shuffle_questions(questions):
-    """Soruları rastgele sırala"""
-    shuffled = list(questions)
-    random.shuffle(shuffled)
-    return shuffled
+def generate_question_seed():
+    """Sınav girişi için yeni bir sıralama tohumu üret"""
+    return random.SystemRandom().getrandbits(31)
 
 
-def shuffle_answer_options(question):
-    """Bir sorunun cevap seçeneklerini rastgele sırala"""
-    options = list(question.answer_options)
-    random.shuffle(options)
-    return options
+def load_exam_questions(exam_id, include_correct=False):
+    """Sınavın sorularını ve şıklarını tek bir join sorgusuyla id sırasında yükle"""
+    rows = db.session.query(
+        Question.id,
+        Question.question_text,
+        Question.question_type,
+        Question.points,
+        AnswerOption.id,
+        AnswerOption.option_text,
+        AnswerOption.is_correct
+    ).outerjoin(AnswerOption, AnswerOption.question_id == Question.id).filter(
+        Question.exam_id == exam_id
+    ).order_by(Question.id, AnswerOption.id).all()
 
-
-def get_exam_questions_randomized(exam_id, include_correct=False):
-    """Sınav sorularını ve cevaplarını rastgele sırala"""
-    questions = Question.query.filter_by(exam_id=exam_id).all()
-    shuffled_questions = shuffle_questions(questions)
-    
-    result = []
-    for question in shuffled_questions:
-        question_data = {
-            'id': question.id,
-            'question_text': question.question_text,
-            'question_type': question.question_type,
-            'points': question.points,
-            'answer_options': []
-        }
-        
-        # Cevap seçeneklerini rastgele sırala
-        shuffled_options = shuffle_answer_options(question)
-        for option in shuffled_options:
+    questions = []
+    current = None
+    for question_id, question_text, question_type, points, option_id, option_text, is_correct in rows:
+        if current is None or current['id'] != question_id:
+            current = {
+                'id': question_id,
+                'question_text': question_text,
+                'question_type': question_type,
+                'points': points,
+                'answer_options': []
+            }
+            questions.append(current)
+        if option_id is not None:
             option_data = {
-                'id': option.id,
-                'option_text': option.option_text
+                'id': option_id,
+                'option_text': option_text
             }
             if include_correct:
-                option_data['is_correct'] = option.is_correct
-            question_data['answer_options'].append(option_data)
-        
-        result.append(question_data)
-    
+                option_data['is_correct'] = is_correct
+            current['answer_options'].append(option_data)
+
+    return questions
+
+
+def apply_question_order(questions, seed):
+    """Soruları ve şıkları tohuma göre deterministik olarak karıştır
+
+    Aynı tohum ve aynı soru kümesi her zaman aynı sırayı verir. Girdi
+    listesi değiştirilmez; sorular yüzeysel kopyalanır.
+    """
+    rng = random.Random(seed)
+    ordered = list(questions)
+    rng.shuffle(ordered)
+
+    result = []
+    for question in ordered:
+        options = list(question['answer_options'])
+        rng.shuffle(options)
+        result.append(dict(question, answer_options=options))
     return result
 
+
+def attempt_question_seed(attempt):
+    """Sınav girişinin sıralama tohumu"""
+    # Tohumu olmayan eski girişlerde giriş id'si kullanılır (yine de sabit sıra)
+    return attempt.question_seed if attempt.question_seed is not None else attempt.id
+
+
+def get_exam_questions_randomized(exam_id, include_correct=False):
+    """Sınav sorularını ve cevaplarını rastgele sırala"""
+    return apply_question_order(load_exam_questions(exam_id, include_correct), generate_question_seed())
+
+
+def adjust_exam_totals(exam_id, question_delta=0, points_delta=0.0):
+    """Sınavın soru sayısı ve maksimum puan sütunlarını artımlı olarak güncelle
+
+    Güncelleme tek bir UPDATE ile veritabanı tarafında yapılır; eşzamanlı
+    soru yazımlarında değerler birbirini ezmez.
+    """
+    Exam.query.filter_by(id=exam_id).update({
+        Exam.question_count: Exam.question_count + question_delta,
+        Exam.max_points: Exam.max_points + points_delta,
+        Exam.updated_at: datetime.utcnow()
+    }, synchronize_session='evaluate')
+
+
+def touch_exam(exam_id):
+    """Sınavın sürümünü (updated_at) ilerlet
+
+    Soru kağıdı ve cevap anahtarı önbellekleri bu sürümle doğrulanır; içeriği
+    değiştiren her yazma (ör. yalnızca seçenekler değiştiğinde) bunu çağırmalıdır.
+    """
+    Exam.query.filter_by(id=exam_id).update({Exam.updated_at: datetime.utcnow()}, synchronize_session='evaluate')
+
+
+def _actual_exam_totals():
+    """Sorular tablosundan hesaplanan (soru sayısı, toplam puan) alt sorguları"""
+    question_count = select(func.count(Question.id)).where(
+        Question.exam_id == Exam.id
+    ).correlate(Exam).scalar_subquery()
+    max_points = select(func.coalesce(func.sum(Question.points), 0.0)).where(
+        Question.exam_id == Exam.id
+    ).correlate(Exam).scalar_subquery()
+    return question_count, max_points
+
+
+def find_inconsistent_exam_totals():
+    """Saklanan soru sayısı/maksimum puan değerleri gerçek değerlerden farklı olan sınavları bul"""
+    question_count, max_points = _actual_exam_totals()
+    rows = db.session.query(
+        Exam.id, Exam.question_count, question_count, Exam.max_points, max_points
+    ).order_by(Exam.id).all()
+
+    return [
+        {
+            'exam_id': exam_id,
+            'stored_question_count': stored_count,
+            'actual_question_count': actual_count,
+            'stored_max_points': stored_points,
+            'actual_max_points': float(actual_points)
+        }
+        for exam_id, stored_count, actual_count, stored_points, actual_points in rows
+        if stored_count != actual_count or abs(stored_points - float(actual_points)) > 1e-9
+    ]
+
+
+def recalculate_exam_totals(exam_ids=None):
+    """Soru sayısı ve maksimum puan sütunlarını tek bir UPDATE ile yeniden hesapla"""
+    question_count, max_points = _actual_exam_totals()
+    query = Exam.query
+    if exam_ids is not None:
+        query = query.filter(Exam.id.in_(exam_ids))
+    return query.update({
+        Exam.question_count: question_count,
+        Exam.max_points: max_points
+    }, synchronize_session=False)
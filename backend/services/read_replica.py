@@ -0,0 +1,117 @@
+"""
+Raporlama endpoint'leri için okuma replikası yönlendirmesi
+
+REPLICA_DATABASE_URL verildiğinde 'replica' adlı bir SQLAlchemy bind'ı
+tanımlanır. replica_read ile işaretlenmiş endpoint'lerde (bkz. middleware)
+oturum bilgisine bir bayrak konur ve RoutingSession yalnızca SELECT
+ifadelerini replikaya gönderir; flush ve yazmalar her zaman birincil
+veritabanına gider. İşaretlenmemiş endpoint'ler (sınav başlatma/gönderme
+dahil) birincil veritabanını kullanır.
+
+Replika gecikmesi (PostgreSQL'de pg_last_xact_replay_timestamp) en fazla
+REPLICA_LAG_CHECK_INTERVAL saniyede bir ölçülür. Gecikme endpoint'in
+kabul ettiği sınırı aşarsa veya replikaya ulaşılamazsa istek birincil
+veritabanından okunur. PostgreSQL dışındaki replikalar (ör. yerel denemede
+aynı SQLite dosyası) gecikmesiz kabul edilir.
+"""
+import logging
+import threading
+import time
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND_KEY = 'replica'
+
+# Replikada değilse (birincilde) veya tüm WAL uygulanmışsa gecikme 0
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+
+class RoutingSession(Session):
+    """Oturum bilgisinde replika bayrağı varken SELECT ifadelerini replikaya yönlendiren oturum"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and self.info.get(REPLICA_BIND_KEY)
+            and not self._flushing
+            and getattr(clause, 'is_select', False)
+        ):
+            engine = self._db.engines.get(REPLICA_BIND_KEY)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Replika gecikmesini ölçer ve isteğin replikadan okunup okunamayacağına karar verir"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lag = None
+        self._checked_at = None
+        self.enabled = False
+        self.lag_check_interval = 1.0
+        self.replica_reads = 0
+        self.primary_fallbacks = 0
+
+    def init_app(self, app):
+        self.enabled = REPLICA_BIND_KEY in (app.config.get('SQLALCHEMY_BINDS') or {})
+        self.lag_check_interval = app.config['REPLICA_LAG_CHECK_INTERVAL']
+        self._lag = None
+        self._checked_at = None
+
+    def _measure_lag(self):
+        """Replika gecikmesi (saniye); replikaya ulaşılamazsa None"""
+        engine = current_app.extensions['sqlalchemy'].engines[REPLICA_BIND_KEY]
+        if engine.dialect.name != 'postgresql':
+            return 0.0
+        try:
+            with engine.connect() as connection:
+                lag = connection.execute(REPLICA_LAG_SQL).scalar()
+            return float(lag) if lag is not None else None
+        except Exception:
+            logger.warning('Okuma replikasına ulaşılamadı, birincil veritabanı kullanılacak', exc_info=True)
+            return None
+
+    def replica_lag(self):
+        """En fazla lag_check_interval saniye önce ölçülmüş replika gecikmesi"""
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.lag_check_interval:
+                return self._lag
+            # Aynı anda gelen diğer istekler ölçüm bitene kadar önceki değeri kullanır
+            self._checked_at = now
+        lag = self._measure_lag()
+        with self._lock:
+            self._lag = lag
+        return lag
+
+    def use_replica(self, max_staleness):
+        """Gecikme max_staleness saniyeyi aşmıyorsa True"""
+        if not self.enabled:
+            return False
+        lag = self.replica_lag()
+        if lag is not None and lag <= max_staleness:
+            self.replica_reads += 1
+            return True
+        self.primary_fallbacks += 1
+        return False
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'last_lag_seconds': self._lag,
+            'replica_reads': self.replica_reads,
+            'primary_fallbacks': self.primary_fallbacks
+        }
+
+
+replica_router = ReplicaRouter()
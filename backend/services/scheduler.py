@@ -0,0 +1,238 @@
+"""
+Süresi dolan sınav girişlerini otomatik gönderen zamanlayıcı
+
+Açık girişler gönderim zamanına (bitiş zamanı + submission_grace();
+bitiş zamanı başlangıç + süre, Exam.end_time ile sınırlı) göre bir min-heap'te tutulur; thread bir sonraki bitiş zamanına kadar uyur
+ve zamanı gelen girişleri toplu olarak gönderir. Heap her
+AUTO_SUBMIT_REFRESH_INTERVAL saniyede veritabanından yeniden oluşturulur;
+böylece başka worker'larda başlatılan girişler ve değişen sınav saatleri de
+yakalanır (sınav süreleri dakika mertebesinde olduğu için gecikme olmaz).
+
+Birden çok gunicorn worker'ı ile güvenlidir:
+    - PostgreSQL'de yalnızca advisory lock'u alan worker (lider) gönderim
+      yapar; lider kapanırsa kilit bağlantıyla birlikte bırakılır ve başka
+      bir worker bir sonraki yenilemede liderliği devralır.
+    - Advisory lock olmayan veritabanlarında (SQLite) her worker çalışır;
+      auto_submit_attempts koşullu güncelleme ile her girişi bir kez gönderir.
+
+Lider ayrıca sınavların başlangıç/bitiş zamanlarında öğrenci olay akışına
+exam_opened/exam_closed olaylarını yayınlar. Her worker başlamak üzere olan
+sınavların soru kağıdı ve cevap anahtarını kendi önbelleğine önceden yükler.
+
+Ayrı bir süreç olarak çalıştırmak için: flask --app app run-scheduler
+(bu durumda web worker'larında AUTO_SUBMIT_SCHEDULER=0 ayarlanabilir).
+"""
+import heapq
+import logging
+import threading
+from datetime import timedelta
+from sqlalchemy import text, select, func, and_
+from models import db, Exam
+from services.events import event_broker, course_channel, EXAM_OPENED, EXAM_CLOSED
+from utils.timezone import get_istanbul_now
+
+logger = logging.getLogger(__name__)
+
+# Tüm worker'ların paylaştığı advisory lock anahtarı
+ADVISORY_LOCK_KEY = 0x45584D53  # 'EXMS'
+
+
+class AutoSubmitScheduler:
+    """Bitiş zamanına göre sıralı heap ile açık girişleri otomatik gönderir"""
+
+    def __init__(self):
+        self._heap = []  # (bitiş zamanı + ek süre, attempt_id)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._leader_connection = None
+        self._next_refresh = None
+        self._next_exam_event = None  # bir sonraki sınav başlangıç/bitiş zamanı
+        self._exam_event_watermark = None  # bu zamana kadarki açılış/kapanışlar yayınlandı
+        self.app = None
+        self.is_leader = False
+        self.submitted_count = 0
+
+    def init_app(self, app):
+        self.app = app
+        self.refresh_interval = app.config['AUTO_SUBMIT_REFRESH_INTERVAL']
+        self.batch_size = app.config['AUTO_SUBMIT_BATCH_SIZE']
+        self.warm_window = timedelta(seconds=app.config['EXAM_WARM_WINDOW'])
+        from services.exam_service import submission_grace
+        # auto_submit_attempts ile aynı ek süre (tampon yazma aralığına göre uzayabilir)
+        with app.app_context():
+            self.grace = submission_grace()
+
+    def start(self):
+        """Arka plan thread'ini başlat (worker başına bir kez)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name='auto-submit-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def schedule(self, attempt_id, deadline):
+        """Yeni başlatılan girişi heap'e ekle (bu worker lider değilse lider yenilemede yakalar)"""
+        if not self.is_leader:
+            return
+        with self._lock:
+            heapq.heappush(self._heap, (deadline + self.grace, attempt_id))
+        self._wakeup.set()
+
+    def run(self):
+        """Zamanlayıcı döngüsü (run-scheduler komutu tarafından ön planda da çağrılır)"""
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    now = get_istanbul_now()
+                    if self._next_refresh is None or now >= self._next_refresh:
+                        self._refresh(now)
+                    if self.is_leader:
+                        self._submit_due(now)
+                        self._publish_exam_events(now)
+                except Exception:
+                    logger.exception('Otomatik gönderim turu başarısız')
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+            self._wakeup.wait(self._seconds_until_next_event())
+            self._wakeup.clear()
+
+        self._release_leadership()
+
+    def _seconds_until_next_event(self):
+        now = get_istanbul_now()
+        next_event = self._next_refresh
+        with self._lock:
+            if self._heap and self.is_leader:
+                next_event = min(next_event, self._heap[0][0])
+        if self._next_exam_event is not None and self.is_leader:
+            next_event = min(next_event, self._next_exam_event)
+        return min(max((next_event - now).total_seconds(), 0.05), self.refresh_interval)
+
+    def _refresh(self, now):
+        from services.exam_service import load_open_attempt_deadlines, warm_exam_content
+
+        self._next_refresh = now + timedelta(seconds=self.refresh_interval)
+        self.is_leader = self._acquire_leadership()
+        if self.is_leader:
+            due_times = [(deadline + self.grace, attempt_id) for deadline, attempt_id in load_open_attempt_deadlines()]
+            heapq.heapify(due_times)
+            with self._lock:
+                self._heap = due_times
+            
+            # Liderliği yeni alan worker geçmiş olayları yeniden yayınlamaz
+            if self._exam_event_watermark is None:
+                self._exam_event_watermark = now
+            self._next_exam_event = self._load_next_exam_event(self._exam_event_watermark)
+        else:
+            self._exam_event_watermark = None
+            self._next_exam_event = None
+
+        # Açık veya başlamak üzere olan sınavların içeriği önbelleğe alınır
+        exam_ids = [row[0] for row in db.session.query(Exam.id).filter(
+            Exam.start_time <= now + self.warm_window,
+            Exam.end_time >= now
+        ).all()]
+        warm_exam_content(exam_ids)
+
+    def _submit_due(self, now):
+        from services.exam_service import auto_submit_attempts
+
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[1])
+
+        for start in range(0, len(due), self.batch_size):
+            batch = due[start:start + self.batch_size]
+            count = auto_submit_attempts(batch, now=now)
+            self.submitted_count += count
+            if count:
+                logger.info('%d sınav girişi otomatik gönderildi', count)
+
+    def _load_next_exam_event(self, after):
+        """after'dan sonraki ilk sınav başlangıç veya bitiş zamanı (yoksa None)"""
+        next_start, next_end = db.session.query(
+            select(func.min(Exam.start_time)).where(Exam.start_time > after).scalar_subquery(),
+            select(func.min(Exam.end_time)).where(Exam.end_time > after).scalar_subquery()
+        ).one()
+        times = [value for value in (next_start, next_end) if value is not None]
+        return min(times) if times else None
+
+    def _publish_exam_events(self, now):
+        """Son yayından bu yana açılan/kapanan sınavlar için ders kanallarına olay yayınla"""
+        if self._next_exam_event is None or now < self._next_exam_event:
+            return
+        since = self._exam_event_watermark
+        rows = db.session.query(Exam.id, Exam.course_id, Exam.start_time, Exam.end_time).filter(
+            (and_(Exam.start_time > since, Exam.start_time <= now))
+            | (and_(Exam.end_time > since, Exam.end_time <= now))
+        ).all()
+        for exam_id, course_id, start_time, end_time in rows:
+            data = {'exam_id': exam_id, 'course_id': course_id}
+            if since < start_time <= now:
+                event_broker.publish(course_channel(course_id), EXAM_OPENED, data)
+            if since < end_time <= now:
+                event_broker.publish(course_channel(course_id), EXAM_CLOSED, data)
+        self._exam_event_watermark = now
+        self._next_exam_event = self._load_next_exam_event(now)
+
+    def _acquire_leadership(self):
+        """PostgreSQL'de advisory lock ile lider seçimi; diğer veritabanlarında her zaman True"""
+        engine = db.engine
+        if engine.dialect.name != 'postgresql':
+            return True
+
+        if self._leader_connection is not None:
+            try:
+                self._leader_connection.execute(text('SELECT 1'))
+                self._leader_connection.commit()
+                return True
+            except Exception:
+                logger.warning('Lider bağlantısı koptu, liderlik yeniden denenecek')
+                self._release_leadership()
+
+        connection = engine.connect()
+        acquired = connection.execute(
+            text('SELECT pg_try_advisory_lock(:key)'), {'key': ADVISORY_LOCK_KEY}
+        ).scalar()
+        connection.commit()
+        if acquired:
+            self._leader_connection = connection
+            logger.info('Otomatik gönderim zamanlayıcısı liderliği alındı')
+            return True
+        connection.close()
+        return False
+
+    def _release_leadership(self):
+        if self._leader_connection is not None:
+            # Advisory lock oturuma bağlıdır; bağlantı havuza geri verilmeden kapatılır
+            try:
+                self._leader_connection.invalidate()
+            except Exception:
+                pass
+            self._leader_connection = None
+        self.is_leader = False
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._heap)
+            next_deadline = self._heap[0][0].isoformat() if self._heap else None
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'is_leader': self.is_leader,
+            'pending': pending,
+            'next_deadline': next_deadline,
+            'submitted_count': self.submitted_count
+        }
+
+
+scheduler = AutoSubmitScheduler()
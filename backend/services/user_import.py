@@ -0,0 +1,137 @@
+"""
+CSV / JSONL dosyasından toplu kullanıcı ekleme
+
+Dosya satır satır okunur; tamamı hiçbir zaman belleğe alınmaz. Geçerli
+satırlar USER_IMPORT_BATCH_SIZE'lık gruplar halinde toplanır, grubun
+şifreleri hashleme havuzunda paralel hashlenir ve grup tek bir çok satırlı
+INSERT ile eklenip commit edilir. Email benzersizliği istek başında bir kez
+yüklenen email kümesine göre kontrol edilir; bu arada başka bir istekle
+eklenen email'ler ON CONFLICT DO NOTHING ile atlanır ve hata olarak raporlanır.
+
+Beklenen alanlar: email, password, role, name (opsiyonel).
+"""
+import codecs
+import csv
+import json
+from models import db, User
+from services.password_hasher import password_hasher
+from utils.db import dialect_insert
+
+IMPORT_ROLES = ('student', 'instructor', 'department_head')
+
+
+class ImportFormatError(ValueError):
+    """Desteklenmeyen veya okunamayan dosya biçimi (400 olarak döndürülür)"""
+
+
+def detect_format(filename, content_type, requested=None):
+    """'csv' veya 'jsonl' (sorgu parametresi > dosya uzantısı > Content-Type)"""
+    if requested:
+        if requested not in ('csv', 'jsonl'):
+            raise ImportFormatError('format csv veya jsonl olmalıdır')
+        return requested
+    filename = (filename or '').lower()
+    content_type = (content_type or '').lower()
+    if filename.endswith(('.jsonl', '.ndjson')) or 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'jsonl'
+    if filename.endswith('.csv') or 'csv' in content_type:
+        return 'csv'
+    raise ImportFormatError('Dosya biçimi belirlenemedi (format=csv veya format=jsonl verin)')
+
+
+def iter_rows(stream, file_format):
+    """(satır numarası, kayıt veya None, hata veya None) üreten akış okuyucu"""
+    lines = codecs.iterdecode(stream, 'utf-8-sig')
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+        if reader.fieldnames is None or 'email' not in reader.fieldnames:
+            raise ImportFormatError('CSV başlık satırı email, password, role (ve isteğe bağlı name) içermelidir')
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, None, 'Geçersiz JSON satırı'
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, 'Her satır bir JSON nesnesi olmalıdır'
+            continue
+        yield line_number, record, None
+
+
+def _validate(record):
+    """Satırı doğrula; (temizlenmiş satır, None) veya (None, hata)"""
+    email = str(record.get('email') or '').strip()
+    password = str(record.get('password') or '')
+    role = str(record.get('role') or '').strip()
+    name = str(record.get('name') or '').strip()
+
+    if not email or not password or not role:
+        return None, 'Email, şifre ve rol gereklidir'
+    if '@' not in email:
+        return None, 'Geçersiz email'
+    if role not in IMPORT_ROLES:
+        return None, 'Geçersiz rol. Sadece student, instructor veya department_head olabilir'
+    return {'email': email, 'password': password, 'role': role, 'name': name or None}, None
+
+
+def import_users(rows, batch_size, max_errors):
+    """iter_rows çıktısını gruplar halinde ekle ve satır bazlı rapor döndür"""
+    existing_emails = set(db.session.scalars(db.select(User.email)))
+    created = 0
+    error_count = 0
+    errors = []
+    batch = []
+
+    def report(line_number, email, message):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < max_errors:
+            errors.append({'row': line_number, 'email': email, 'error': message})
+
+    def flush():
+        nonlocal created
+        hashes = password_hasher.hash_many([row['password'] for _, row in batch])
+        values = [
+            {'email': row['email'], 'role': row['role'], 'name': row['name'], 'password_hash': password_hash}
+            for (_, row), password_hash in zip(batch, hashes)
+        ]
+        stmt = dialect_insert(User).on_conflict_do_nothing(index_elements=['email']).returning(User.email)
+        inserted = set(db.session.scalars(stmt, values))
+        db.session.commit()
+        created += len(inserted)
+        for line_number, row in batch:
+            if row['email'] not in inserted:
+                report(line_number, row['email'], 'Bu email zaten kullanılıyor')
+        batch.clear()
+
+    for line_number, record, error in rows:
+        if error:
+            report(line_number, None, error)
+            continue
+        row, error = _validate(record)
+        if error:
+            report(line_number, record.get('email'), error)
+            continue
+        if row['email'] in existing_emails:
+            report(line_number, row['email'], 'Bu email zaten kullanılıyor')
+            continue
+        existing_emails.add(row['email'])
+        batch.append((line_number, row))
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+
+    return {
+        'created': created,
+        'failed': error_count,
+        'errors': errors,
+        'errors_truncated': error_count > len(errors)
+    }
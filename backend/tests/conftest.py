@@ -0,0 +1,135 @@
+"""
+Test yardımcıları: geçici SQLite veritabanı, toplu veri oluşturma ve token başlıkları
+
+Ayarlar config modülü import edilmeden önce ortam değişkenleriyle verilir.
+"""
+import os
+import tempfile
+
+_db_file = os.path.join(tempfile.mkdtemp(prefix='exam_system_test_'), 'test.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file}'
+os.environ.pop('REPLICA_DATABASE_URL', None)
+os.environ['AUTO_SUBMIT_SCHEDULER'] = '0'
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+
+from datetime import timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from models import db, User, Department, Course, StudentCourse, Exam, Question, AnswerOption, ExamAttempt
+from middleware import role_cache
+from services.answer_buffer import answer_buffer
+from services.exam_service import answer_key_cache, exam_paper_cache, exam_feed_cache, attempt_clock_cache
+from services.grade_service import refresh_course_grades
+from services.question_service import recalculate_exam_totals
+from utils.timezone import get_istanbul_now
+
+
+@pytest.fixture(scope='session')
+def app():
+    return create_app()
+
+
+@pytest.fixture
+def client(app):
+    with app.app_context():
+        yield app.test_client()
+        db.session.remove()
+
+
+def reset_database():
+    """Tabloları ve süreç içi önbellekleri sıfırla (id'ler yeniden kullanıldığı için önbellekler de temizlenir)"""
+    answer_buffer.flush_all()
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+    for cache in (role_cache, answer_key_cache, exam_paper_cache, exam_feed_cache, attempt_clock_cache):
+        cache.clear()
+
+
+def seed(student_count, course_count=4, questions_per_exam=5, courses_per_student=2, exam_open=False):
+    """Toplu insert ile veri oluştur
+
+    Her ders için bir vize ve bir final oluşturulur. exam_open False ise sınavlar
+    bitmiştir ve her öğrenci kayıtlı olduğu derslerin sınavlarını göndermiştir;
+    True ise sınavlar açıktır ve giriş yoktur.
+    """
+    reset_database()
+    now = get_istanbul_now()
+    department = Department(name='Test Bölümü', code='TST')
+    admin = User(email='admin@test.edu', role='admin', name='Admin', password_hash='x')
+    head = User(email='head@test.edu', role='department_head', name='Bölüm Başkanı', password_hash='x')
+    instructor = User(email='instructor@test.edu', role='instructor', name='Hoca', password_hash='x')
+    db.session.add_all([department, admin, head, instructor])
+    db.session.flush()
+
+    courses = [
+        Course(code=f'TST{i:03d}', name=f'Test Dersi {i}', department_id=department.id, instructor_id=instructor.id)
+        for i in range(course_count)
+    ]
+    db.session.add_all(courses)
+    db.session.flush()
+
+    if exam_open:
+        start_time, end_time = now - timedelta(minutes=5), now + timedelta(hours=1)
+    else:
+        start_time, end_time = now - timedelta(days=2), now - timedelta(days=1)
+    exams = []
+    for course in courses:
+        for exam_type, weight in (('vize', 40.0), ('final', 60.0)):
+            exams.append(Exam(
+                course_id=course.id, instructor_id=instructor.id, exam_type=exam_type,
+                start_time=start_time, end_time=end_time, duration_minutes=30, weight_percentage=weight
+            ))
+    db.session.add_all(exams)
+    db.session.flush()
+
+    for exam in exams:
+        for q in range(questions_per_exam):
+            question = Question(exam_id=exam.id, question_text=f'Soru {q + 1}', points=2.0)
+            db.session.add(question)
+            db.session.flush()
+            db.session.execute(db.insert(AnswerOption), [
+                {'question_id': question.id, 'option_text': f'Seçenek {o + 1}', 'is_correct': o == 0}
+                for o in range(4)
+            ])
+
+    db.session.execute(db.insert(User), [
+        {'email': f'student{i}@test.edu', 'role': 'student', 'name': f'Öğrenci {i}', 'password_hash': 'x'}
+        for i in range(student_count)
+    ])
+    student_ids = list(db.session.scalars(db.select(User.id).where(User.role == 'student').order_by(User.id)))
+
+    enrollments = []
+    attempts = []
+    for index, student_id in enumerate(student_ids):
+        for offset in range(min(courses_per_student, course_count)):
+            course = courses[(index + offset) % course_count]
+            enrollments.append({'student_id': student_id, 'course_id': course.id})
+            if exam_open:
+                continue
+            for exam in exams:
+                if exam.course_id == course.id:
+                    attempts.append({
+                        'exam_id': exam.id, 'student_id': student_id, 'start_time': start_time,
+                        'end_time': start_time + timedelta(minutes=20),
+                        'submitted_at': start_time + timedelta(minutes=20),
+                        'total_score': float((student_id + exam.id) % (questions_per_exam + 1))
+                    })
+
+    db.session.execute(db.insert(StudentCourse), enrollments)
+    if attempts:
+        db.session.execute(db.insert(ExamAttempt), attempts)
+    recalculate_exam_totals()
+    refresh_course_grades()
+    db.session.commit()
+    return {
+        'admin_id': admin.id, 'head_id': head.id, 'instructor_id': instructor.id,
+        'student_ids': student_ids, 'course_ids': [course.id for course in courses],
+        'exam_ids': [exam.id for exam in exams]
+    }
+
+
+def auth_headers(user_id, role):
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user_id), additional_claims={"role": role})}'}
@@ -0,0 +1,44 @@
+"""
+LRUCache.get_or_load: yükleme sırasındaki invalidate/clear çağrıları
+"""
+from utils.cache import LRUCache
+
+
+def load_while(cache, action):
+    """Yükleme sürerken action(cache) çalıştıran loader ile 'a' anahtarını yükle"""
+    def loader():
+        action(cache)
+        return 'yeni'
+    return cache.get_or_load('a', loader)
+
+
+def test_unrelated_invalidate_keeps_loaded_value():
+    cache = LRUCache()
+    assert load_while(cache, lambda c: c.invalidate('b')) == 'yeni'
+    assert cache.get('a') == 'yeni'
+
+
+def test_same_key_invalidate_discards_loaded_value():
+    cache = LRUCache()
+    assert load_while(cache, lambda c: c.invalidate('a')) == 'yeni'
+    assert cache.get('a') is None
+
+
+def test_clear_discards_loaded_value():
+    cache = LRUCache()
+    assert load_while(cache, lambda c: c.clear()) == 'yeni'
+    assert cache.get('a') is None
+
+
+def test_inflight_versions_are_released():
+    cache = LRUCache()
+    load_while(cache, lambda c: c.invalidate('a'))
+    cache.get_or_load('b', lambda: 1)
+    assert cache._inflight == {}
+
+
+def test_none_is_not_cached_when_disabled():
+    cache = LRUCache()
+    assert cache.get_or_load('a', lambda: None, cache_none=False) is None
+    assert cache.get('a', 'yok') == 'yok'
+    assert cache.get_or_load('a', lambda: 1, cache_none=False) == 1
@@ -0,0 +1,78 @@
+"""
+Öğretim üyesinin dersleriyle birlikte silinmesi (force=true)
+"""
+from models import db, User, Course, Exam, ExamAttempt, StudentCourse, CourseGrade
+from services.grade_service import refresh_course_grades
+from conftest import seed, auth_headers
+
+
+def add_instructor(email):
+    instructor = User(email=email, role='instructor', name=email, password_hash='x')
+    db.session.add(instructor)
+    db.session.flush()
+    return instructor
+
+
+def add_courses(instructor, department_id, count, prefix):
+    courses = [
+        Course(code=f'{prefix}{i}', name=f'{prefix} {i}', department_id=department_id, instructor_id=instructor.id)
+        for i in range(count)
+    ]
+    db.session.add_all(courses)
+    db.session.flush()
+    return courses
+
+
+def guest_exam_setup():
+    """Silinecek hoca (seed'deki) kendi dersleri dışında başka bir hocanın dersine de sınav yazmış"""
+    ids = seed(2, course_count=2)
+    department_id = db.session.get(Course, ids['course_ids'][0]).department_id
+    add_instructor('third@test.edu')
+    other = add_instructor('other@test.edu')
+    other_courses = add_courses(other, department_id, 4, 'OTH')
+    host = other_courses[0]
+
+    own_exam = Exam(course_id=host.id, instructor_id=other.id, exam_type='vize', start_time=db.func.now(),
+                    end_time=db.func.now(), duration_minutes=30, weight_percentage=40.0, max_points=10.0)
+    guest_exam = Exam(course_id=host.id, instructor_id=ids['instructor_id'], exam_type='final', start_time=db.func.now(),
+                      end_time=db.func.now(), duration_minutes=30, weight_percentage=60.0, max_points=10.0)
+    db.session.add_all([own_exam, guest_exam])
+    db.session.flush()
+    student_id = ids['student_ids'][0]
+    db.session.add(StudentCourse(student_id=student_id, course_id=host.id))
+    for exam, score in ((own_exam, 5.0), (guest_exam, 10.0)):
+        attempt = ExamAttempt(exam_id=exam.id, student_id=student_id, total_score=score,
+                              start_time=db.func.now(), submitted_at=db.func.now())
+        db.session.add(attempt)
+    refresh_course_grades()
+    db.session.commit()
+    return ids, host.id, student_id, other_courses[-1].id
+
+
+def test_force_delete_refreshes_grades_of_surviving_courses(client):
+    ids, host_id, student_id, _ = guest_exam_setup()
+    grade = CourseGrade.query.filter_by(student_id=student_id, course_id=host_id).one()
+    assert grade.final_score == 100.0
+
+    response = client.delete(f'/api/admin/users/{ids["instructor_id"]}?force=true',
+                             headers=auth_headers(ids['admin_id'], 'admin'))
+    assert response.status_code == 200
+
+    db.session.expire_all()
+    assert Exam.query.filter_by(course_id=host_id).count() == 1
+    grade = CourseGrade.query.filter_by(student_id=student_id, course_id=host_id).one()
+    assert grade.final_score == 0.0
+    assert grade.final_weight == 0.0
+
+
+def test_force_delete_keeps_minimum_course_count(client):
+    ids, _, _, spare_course_id = guest_exam_setup()
+    # Kalan ders sayısı 4'ün altına düşecek
+    db.session.delete(db.session.get(Course, spare_course_id))
+    db.session.commit()
+
+    response = client.delete(f'/api/admin/users/{ids["instructor_id"]}?force=true',
+                             headers=auth_headers(ids['admin_id'], 'admin'))
+    assert response.status_code == 400
+    assert 'Minimum 4 ders' in response.get_json()['error']
+    assert db.session.get(User, ids['instructor_id']) is not None
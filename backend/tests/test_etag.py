@@ -0,0 +1,56 @@
+"""
+Ders listesi ETag'i: gömülü departman ve öğretim üyesi isimleri değişince 304 dönmemeli
+"""
+import pytest
+from models import db, User, Department
+from conftest import seed, auth_headers
+
+
+def rename_department(ids):
+    Department.query.one().name = 'Yeni Bölüm'
+
+
+def rename_instructor(ids):
+    db.session.get(User, ids['instructor_id']).name = 'Yeni Hoca'
+
+
+@pytest.mark.parametrize('rename', [rename_department, rename_instructor])
+@pytest.mark.parametrize('url, role', [
+    ('/api/instructor/courses', 'instructor'),
+    ('/api/student/courses', 'student'),
+])
+def test_course_list_etag_covers_nested_names(client, rename, url, role):
+    ids = seed(2)
+    user_id = ids['instructor_id'] if role == 'instructor' else ids['student_ids'][0]
+    headers = auth_headers(user_id, role)
+
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert client.get(url, headers={**headers, 'If-None-Match': etag}).status_code == 304
+
+    rename(ids)
+    db.session.commit()
+
+    response = client.get(url, headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_result_etag_covers_nested_names(client):
+    ids = seed(2)
+    student_id = ids['student_ids'][0]
+    headers = auth_headers(student_id, 'student')
+    url = f'/api/student/exams/{ids["exam_ids"][0]}/result'
+
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert client.get(url, headers={**headers, 'If-None-Match': etag}).status_code == 304
+
+    rename_instructor(ids)
+    db.session.commit()
+
+    response = client.get(url, headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['exam']['course']['instructor']['name'] == 'Yeni Hoca'
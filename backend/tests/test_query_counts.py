@@ -0,0 +1,66 @@
+"""
+N+1 regresyon testleri: sorgu sayısı veri büyüklüğünden bağımsız olmalı
+
+Her kontrol iki farklı veri büyüklüğünde çalıştırılır; sorgu sayıları eşit
+olmalı ve assert_max_queries sınırını aşmamalıdır.
+"""
+import pytest
+from models import db
+from services.grade_service import compute_course_grades, get_department_statistics, get_course_statistics
+from utils.query_counter import assert_max_queries
+from conftest import seed, auth_headers
+
+SIZES = (5, 40)
+
+
+def query_counts(limit, run):
+    """Her veri büyüklüğü için run(ids) çağrısının sorgu sayısı
+
+    İlk çağrı rol ve sınav önbelleklerini ısıtır; sayım ikinci çağrıda yapılır.
+    """
+    counts = []
+    for size in SIZES:
+        ids = seed(size, course_count=size // 5 + 2)
+        run(ids)
+        db.session.expire_all()
+        with assert_max_queries(db.engine, limit) as counter:
+            run(ids)
+        counts.append(counter.count)
+    return counts
+
+
+def test_compute_course_grades(client):
+    counts = query_counts(1, lambda ids: compute_course_grades())
+    assert counts[0] == counts[1]
+
+
+def test_compute_course_grades_scoped(client):
+    counts = query_counts(1, lambda ids: compute_course_grades(student_ids=ids['student_ids'][:3]))
+    assert counts[0] == counts[1]
+
+
+def test_department_statistics(client):
+    counts = query_counts(10, lambda ids: get_department_statistics())
+    assert counts[0] == counts[1]
+
+
+def test_course_statistics(client):
+    counts = query_counts(3, lambda ids: get_course_statistics(ids['course_ids'][0]))
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.parametrize('url, role, limit', [
+    ('/api/admin/users', 'admin', 1),
+    ('/api/admin/courses', 'admin', 1),
+    ('/api/instructor/exams', 'instructor', 1),
+    ('/api/department-head/courses', 'department_head', 1),
+    ('/api/department-head/students', 'department_head', 1),
+])
+def test_listing_endpoints(client, url, role, limit):
+    def run(ids):
+        user_id = {'admin': ids['admin_id'], 'instructor': ids['instructor_id'], 'department_head': ids['head_id']}[role]
+        response = client.get(url, headers=auth_headers(user_id, role))
+        assert response.status_code == 200
+
+    counts = query_counts(limit, run)
+    assert counts[0] == counts[1]
@@ -0,0 +1,109 @@
+"""
+Sınav başlatma: tekrar eden/eşzamanlı istekler tek giriş oluşturur ve devam eden
+giriş aynı kağıdı kayıtlı cevaplarla döndürür
+"""
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from models import db, ExamAttempt
+from services.answer_buffer import answer_buffer
+from utils.timezone import get_istanbul_now
+from conftest import seed, auth_headers
+
+
+def start(client, exam_id, headers):
+    return client.post(f'/api/student/exams/{exam_id}/start', headers=headers)
+
+
+def open_exam(student_count=1):
+    ids = seed(student_count, course_count=1, exam_open=True)
+    return ids, ids['exam_ids'][0], auth_headers(ids['student_ids'][0], 'student')
+
+
+def test_duplicate_start_resumes_attempt(client):
+    _, exam_id, headers = open_exam()
+
+    first = start(client, exam_id, headers)
+    second = start(client, exam_id, headers)
+
+    assert first.status_code == 201
+    assert second.status_code == 200
+    assert second.get_json()['resumed'] is True
+    assert second.get_json()['attempt']['id'] == first.get_json()['attempt']['id']
+    assert ExamAttempt.query.filter_by(exam_id=exam_id).count() == 1
+
+
+def test_concurrent_start_creates_single_attempt(app, client):
+    _, exam_id, headers = open_exam()
+
+    def start_in_thread(_):
+        with app.app_context():
+            response = start(app.test_client(), exam_id, headers)
+            return response.status_code, response.get_json()['attempt']['id']
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(start_in_thread, range(16)))
+
+    assert Counter(status for status, _ in results) == {201: 1, 200: 15}
+    assert len({attempt_id for _, attempt_id in results}) == 1
+    assert ExamAttempt.query.filter_by(exam_id=exam_id).count() == 1
+
+
+def test_resume_payload_keeps_order_and_answers(client):
+    _, exam_id, headers = open_exam()
+    questions = start(client, exam_id, headers).get_json()['questions']
+    saved, buffered = questions[0], questions[1]
+
+    # İlk cevap veritabanına yazılır, ikincisi tamponda kalabilir
+    response = client.put(f'/api/student/exams/{exam_id}/answers', headers=headers, json={
+        'question_id': saved['id'], 'selected_option_id': saved['answer_options'][1]['id']
+    })
+    assert response.status_code == 200
+    answer_buffer.flush_all()
+    response = client.put(f'/api/student/exams/{exam_id}/answers', headers=headers, json={
+        'question_id': buffered['id'], 'selected_option_id': buffered['answer_options'][2]['id']
+    })
+    assert response.status_code == 200
+
+    resumed = start(client, exam_id, headers)
+    assert resumed.status_code == 200
+    resumed_questions = resumed.get_json()['questions']
+    assert [q['id'] for q in resumed_questions] == [q['id'] for q in questions]
+    assert [[o['id'] for o in q['answer_options']] for q in resumed_questions] == \
+        [[o['id'] for o in q['answer_options']] for q in questions]
+    selected = {q['id']: q.get('selected_option_id') for q in resumed_questions}
+    assert selected[saved['id']] == saved['answer_options'][1]['id']
+    assert selected[buffered['id']] == buffered['answer_options'][2]['id']
+    assert all(selected[q['id']] is None for q in questions[2:])
+
+
+def test_start_after_submit_is_rejected(client):
+    _, exam_id, headers = open_exam()
+    attempt_id = start(client, exam_id, headers).get_json()['attempt']['id']
+
+    attempt = db.session.get(ExamAttempt, attempt_id)
+    attempt.submitted_at = get_istanbul_now()
+    db.session.commit()
+
+    response = start(client, exam_id, headers)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Bu sınav zaten gönderildi'
+
+
+def test_string_ids_are_saved_and_invalid_ids_rejected(client):
+    _, exam_id, headers = open_exam()
+    question = start(client, exam_id, headers).get_json()['questions'][0]
+    option_id = question['answer_options'][0]['id']
+    url = f'/api/student/exams/{exam_id}/answers'
+
+    response = client.put(url, headers=headers, json={
+        'question_id': str(question['id']), 'selected_option_id': str(option_id)
+    })
+    assert response.status_code == 200
+    assert response.get_json()['saved'] == 1
+    resumed = {q['id']: q.get('selected_option_id') for q in start(client, exam_id, headers).get_json()['questions']}
+    assert resumed[question['id']] == option_id
+
+    response = client.put(url, headers=headers, json={'question_id': 'abc', 'selected_option_id': option_id})
+    assert response.status_code == 400
+    response = client.put(url, headers=headers, json={'question_id': question['id'], 'selected_option_id': 'abc'})
+    assert response.status_code == 400
@@ -0,0 +1,133 @@
+"""
+Süreç içi (in-process) önbellek yardımcıları
+"""
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe, boyut sınırlı LRU önbellek (isteğe bağlı TTL ile)
+
+    Her gunicorn worker'ı kendi kopyasını tutar; ttl verilirse başka bir
+    worker'da yapılan değişiklikler en geç ttl saniye sonra görünür.
+    """
+
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}  # key -> yükleme kilidi (aynı anahtarı tek thread yükler)
+        self._generation = 0  # clear ile artar; süren tüm yüklemelerin yazılmasını engeller
+        # key -> [sürüm, süren yükleme sayısı]; yalnızca yüklemesi süren anahtarlar için tutulur.
+        # invalidate(key) yalnızca o anahtarın sürümünü artırır, diğer yüklemeler etkilenmez.
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key):
+        """Kilit altında çağrılır; geçerli değeri veya _MISSING döndürür"""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return _MISSING
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        """Anahtarın değerini getir, yoksa veya süresi dolmuşsa default döndür"""
+        with self._lock:
+            value = self._lookup(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Değeri kaydet, kapasite aşılırsa en eski girdiyi çıkar"""
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_load(self, key, loader, cache_none=True):
+        """Önbellekte yoksa loader() ile yükle ve kaydet
+
+        Aynı anahtar için eşzamanlı ıskalarda loader yalnızca bir kez çalışır
+        (stampede koruması); diğer thread'ler yüklemenin bitmesini bekleyip
+        aynı değeri kullanır. Yükleme sırasında aynı anahtar için invalidate
+        veya clear çağrılırsa yüklenen değer döndürülür ama önbelleğe yazılmaz. cache_none False ise
+        None sonuçlar (ör. henüz var olmayan kayıt) önbelleğe yazılmaz.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                value = self._lookup(key)
+                if value is not _MISSING:
+                    return value
+                generation = self._generation
+                inflight = self._inflight.setdefault(key, [0, 0])
+                inflight[1] += 1
+                key_generation = inflight[0]
+
+            try:
+                value = loader()
+                with self._lock:
+                    current = generation == self._generation and inflight[0] == key_generation
+                    if current and (cache_none or value is not None):
+                        self._store(key, value)
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+                    inflight[1] -= 1
+                    if inflight[1] == 0 and self._inflight.get(key) is inflight:
+                        del self._inflight[key]
+        return value
+
+    def invalidate(self, key):
+        """Tek bir anahtarı önbellekten çıkar"""
+        with self._lock:
+            self._data.pop(key, None)
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                inflight[0] += 1
+
+    def clear(self):
+        """Tüm önbelleği temizle"""
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+
+    def stats(self):
+        """İsabet/ıska sayaçları"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0
+            }
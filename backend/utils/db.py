@@ -0,0 +1,42 @@
+"""
+Veritabanı lehçesine (PostgreSQL/SQLite) göre INSERT ... ON CONFLICT yardımcıları
+"""
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db
+
+
+def dialect_insert(model):
+    """Bağlı veritabanının lehçesine uygun (on_conflict destekli) insert ifadesi"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(model)
+    if dialect == 'sqlite':
+        return sqlite.insert(model)
+    raise NotImplementedError(f'ON CONFLICT desteklenmeyen veritabanı: {dialect}')
+
+
+def upsert_rows(model, rows, index_elements, update_columns):
+    """Satırları toplu olarak ekle, çakışan satırlarda update_columns'u güncelle
+
+    Commit çağıran tarafa bırakılır.
+    """
+    if not rows:
+        return
+    stmt = dialect_insert(model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: stmt.excluded[column] for column in update_columns}
+    )
+    db.session.execute(stmt, rows)
+
+
+def insert_ignore_returning(model, values, index_elements):
+    """Tek satır ekle; çakışma varsa hiçbir şey yapma (INSERT ... ON CONFLICT DO NOTHING RETURNING)
+
+    Eklenen ORM nesnesini, satır zaten varsa None döndürür. Commit çağıran
+    tarafa bırakılır.
+    """
+    stmt = dialect_insert(model).values(**values).on_conflict_do_nothing(
+        index_elements=index_elements
+    ).returning(model)
+    return db.session.scalars(stmt).first()
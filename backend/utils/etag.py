@@ -0,0 +1,60 @@
+"""
+Sık yoklanan GET endpoint'leri için ETag / If-None-Match (koşullu GET) yardımcıları
+
+Endpoint'ler yanıt gövdesini oluşturmadan önce ucuz bir sürüm değeri hesaplar
+(ör. ilgili satırların sayısı, id toplamı ve en büyük updated_at). Bu değer
+istemcinin gönderdiği If-None-Match ile eşleşirse gövde hiç oluşturulmadan
+304 döndürülür; böylece hem serileştirme maliyeti hem de bant genişliği
+kazanılır.
+"""
+import hashlib
+from flask import request, jsonify, current_app
+from sqlalchemy import func
+
+
+def make_etag(*parts):
+    """Sürüm parçalarından kısa bir ETag değeri üret"""
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=12).hexdigest()
+
+
+def collection_version(query, id_column, *updated_columns):
+    """Bir listenin sürümü: (satır sayısı, id toplamı, her sütunun en büyük updated_at değeri)
+
+    Eklenen/silinen satırlar sayı veya toplamı, düzenlenen satırlar
+    updated_at değerini değiştirir. Yanıta gömülen ilişkili satırların
+    (ör. dersin departmanı ve öğretim üyesi) updated_at sütunları da verilmeli;
+    sorgu bu tablolarla join edilmiş olmalıdır. Tek bir aggregate sorgu çalıştırır.
+    """
+    return query.with_entities(
+        func.count(id_column), func.sum(id_column), *(func.max(column) for column in updated_columns)
+    ).order_by(None).one()
+
+
+def course_list_version(query):
+    """Ders listesi sürümü: ders, departman ve öğretim üyesi değişikliklerini kapsar
+
+    query Course satırlarını döndürmeli (veya Course ile join edilmiş olmalı);
+    Course.to_dict departman ve öğretim üyesi isimlerini de içerir.
+    """
+    from models import Course, Department, User
+
+    query = query.join(Department, Department.id == Course.department_id).join(User, User.id == Course.instructor_id)
+    return collection_version(query, Course.id, Course.updated_at, Department.updated_at, User.updated_at)
+
+
+def conditional_json(version, build):
+    """If-None-Match eşleşirse 304, aksi halde build() sonucunu ETag ile döndür
+
+    ETag; istek yolu, sorgu parametreleri ve kullanıcının token'ı yanıtı
+    değiştirdiği için version ile birlikte bu değerlerden üretilir.
+    """
+    etag = make_etag(request.full_path, request.headers.get('Authorization'), version)
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(etag, weak=True)
+    # Yanıt kullanıcıya özeldir; tarayıcı her seferinde doğrulama yapmalıdır
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Authorization')
+    return response
@@ -0,0 +1,48 @@
+"""
+Hızlı JSON sağlayıcısı
+
+orjson kuruluysa yanıtlar doğrudan bytes olarak orjson ile üretilir
+(datetime, date ve UUID için yerleşik destek). Kurulu değilse Flask'ın
+varsayılan sağlayıcısına geri dönülür; uygulama davranışı değişmez.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - isteğe bağlı bağımlılık
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """orjson tabanlı JSON sağlayıcısı (orjson yoksa DefaultJSONProvider gibi davranır)"""
+
+    available = orjson is not None
+
+    def _options(self, pretty=False):
+        # Naive datetime'lar UTC kabul edilir ve 'Z' sonekiyle yazılır
+        options = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        # json.dumps'a özel argümanlar (indent, cls vb.) varsa standart yola düş
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._options(pretty) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
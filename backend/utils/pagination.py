@@ -0,0 +1,133 @@
+"""
+Liste endpoint'leri için keyset (cursor) sayfalama ve alan seçimi yardımcıları
+
+Sayfalar OFFSET yerine son satırın (sıralama değeri, id) ikilisinden devam
+eder; böylece derin sayfalar da indeksle tek aralık taraması olarak okunur.
+Cursor istemci için opak bir base64 metnidir.
+
+Sorgu parametreleri:
+    limit   - sayfa boyutu (varsayılan PAGINATION_DEFAULT_LIMIT, en fazla PAGINATION_MAX_LIMIT)
+    cursor  - önceki yanıttaki next_cursor
+    sort    - sıralama alanı, azalan için '-' öneki (ör. -created_at)
+    fields  - virgülle ayrılmış alan listesi (ör. id,email,name)
+"""
+import base64
+import json
+from datetime import datetime
+from flask import request, current_app
+from sqlalchemy import and_, or_
+
+
+class PaginationError(ValueError):
+    """Geçersiz sayfalama parametresi (400 olarak döndürülür)"""
+
+
+def _parse_limit():
+    default_limit = current_app.config['PAGINATION_DEFAULT_LIMIT']
+    max_limit = current_app.config['PAGINATION_MAX_LIMIT']
+    raw = request.args.get('limit')
+    if raw is None or raw == '':
+        return default_limit
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise PaginationError('limit bir tam sayı olmalıdır')
+    if limit < 1:
+        raise PaginationError('limit en az 1 olmalıdır')
+    return min(limit, max_limit)
+
+
+def _encode_cursor(sort, value, last_id):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, last_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor, sort, sort_expr):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        last_id = int(last_id)
+    except (ValueError, TypeError):
+        raise PaginationError('Geçersiz cursor')
+
+    # Cursor başka bir sıralama ile üretildiyse devam noktası anlamsızdır
+    if cursor_sort != sort:
+        raise PaginationError('Cursor farklı bir sıralama için üretilmiş')
+
+    if value is not None:
+        try:
+            is_datetime = sort_expr.type.python_type is datetime
+        except NotImplementedError:
+            is_datetime = False
+        if is_datetime:
+            try:
+                value = datetime.fromisoformat(value)
+            except (ValueError, TypeError):
+                raise PaginationError('Geçersiz cursor')
+    return value, last_id
+
+
+def requested_fields():
+    """fields= parametresindeki alan adları (verilmediyse None)"""
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    return {field.strip() for field in raw.split(',') if field.strip()}
+
+
+def needs_nested(fields, *names):
+    """Alan seçimi verilen iç içe nesnelerden birini içeriyor mu? (seçim yoksa hepsi gerekir)"""
+    return fields is None or bool(fields.intersection(names))
+
+
+def project(data, fields):
+    """Sözlükten yalnızca istenen alanları bırak"""
+    if fields is None:
+        return data
+    return {key: value for key, value in data.items() if key in fields}
+
+
+def paginate(query, id_column, sort_options, default_sort='id'):
+    """Sorguyu istek parametrelerine göre keyset sayfalama ile çalıştır
+
+    sort_options alan adından sıralama ifadesine eşlemedir; ifadeler NULL
+    içermemelidir (gerekirse func.coalesce kullanılır). (items, next_cursor, limit)
+    döndürür, son sayfada next_cursor None'dır.
+    """
+    limit = _parse_limit()
+    sort = request.args.get('sort') or default_sort
+    descending = sort.startswith('-')
+    key = sort.lstrip('-')
+    if key not in sort_options:
+        raise PaginationError(f'Geçersiz sıralama alanı: {key}. Geçerli alanlar: {", ".join(sorted(sort_options))}')
+    sort_expr = sort_options[key]
+    by_id = sort_expr is id_column
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        value, last_id = _decode_cursor(cursor, sort, sort_expr)
+        if by_id:
+            condition = id_column < last_id if descending else id_column > last_id
+        elif descending:
+            condition = or_(sort_expr < value, and_(sort_expr == value, id_column < last_id))
+        else:
+            condition = or_(sort_expr > value, and_(sort_expr == value, id_column > last_id))
+        query = query.filter(condition)
+
+    if descending:
+        order = [sort_expr.desc()] if by_id else [sort_expr.desc(), id_column.desc()]
+    else:
+        order = [sort_expr.asc()] if by_id else [sort_expr.asc(), id_column.asc()]
+
+    # Sıralama değeri satırla birlikte okunur; bir fazla satır sonraki sayfanın varlığını gösterir
+    rows = query.add_columns(sort_expr.label('_sort_key')).order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_item, last_value = rows[-1]
+        next_cursor = _encode_cursor(sort, last_value, last_item.id)
+
+    return [item for item, _ in rows], next_cursor, limit
@@ -0,0 +1,49 @@
+"""
+SQL sorgu sayacı - benchmark ve N+1 kontrolleri için
+"""
+from contextlib import contextmanager
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Bir blok içinde çalıştırılan SQL ifadelerini sayar"""
+
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine):
+    """Verilen engine üzerinde çalışan sorguları say
+
+    Kullanım:
+        with count_queries(db.engine) as counter:
+            ...
+        print(counter.count)
+    """
+    counter = QueryCounter()
+    event.listen(engine, 'before_cursor_execute', counter._on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', counter._on_execute)
+
+
+@contextmanager
+def assert_max_queries(engine, limit):
+    """Blok içinde limit'ten fazla sorgu çalışırsa AssertionError fırlat
+
+    N+1 regresyonlarını yakalamak için testlerde/benchmark'larda kullanılır:
+        with assert_max_queries(db.engine, 3):
+            client.get('/api/admin/courses', headers=headers)
+    """
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        statements = '\n'.join(f'  {i + 1}. {statement}' for i, statement in enumerate(counter.statements))
+        raise AssertionError(f'En fazla {limit} sorgu bekleniyordu, {counter.count} sorgu çalıştı:\n{statements}')
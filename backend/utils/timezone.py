@@ -1,8 +1,11 @@
 """
 İstanbul saati (UTC+3) için timezone helper fonksiyonları
 """
+import logging
 from datetime import datetime, timezone, timedelta
 
+logger = logging.getLogger(__name__)
+
 # İstanbul timezone (UTC+3)
 ISTANBUL_TZ = timezone(timedelta(hours=3))
 
@@ -71,19 +74,16 @@ def parse_istanbul_datetime(date_string):
             # İstanbul saati olarak kabul edeceğiz
             dt = datetime.fromisoformat(date_string)
             
-            # DEBUG: Gelen değeri logla
-            print(f"[DEBUG] parse_istanbul_datetime: Gelen değer: {date_string}")
-            print(f"[DEBUG] parse_istanbul_datetime: Parse edilen naive datetime: {dt}")
+            logger.debug('parse_istanbul_datetime: gelen değer=%s naive=%s', date_string, dt)
             
             # Naive datetime'ı İstanbul saati olarak kabul et
             # ÖNEMLİ: datetime-local input'u kullanıcının tarayıcısının yerel saatine göre çalışır
             # Ama biz bu değeri İstanbul saati olarak kabul edip UTC'ye çevireceğiz
             dt_istanbul = dt.replace(tzinfo=ISTANBUL_TZ)
-            print(f"[DEBUG] parse_istanbul_datetime: İstanbul saati olarak: {dt_istanbul}")
             
             # Veritabanında UTC olarak saklamak için UTC'ye çevir
             dt_utc = dt_istanbul.astimezone(timezone.utc).replace(tzinfo=None)
-            print(f"[DEBUG] parse_istanbul_datetime: UTC'ye çevrilmiş: {dt_utc}")
+            logger.debug('parse_istanbul_datetime: istanbul=%s utc=%s', dt_istanbul, dt_utc)
             
             return dt_utc
     except ValueError as e:
@@ -0,0 +1,19 @@
+-- Önceden hesaplanmış ders notları (okuma modeli)
+-- Sınav gönderiminde artımlı olarak güncellenir.
+-- Mevcut veriler için doldurma: cd backend && flask --app app rebuild-course-grades
+
+CREATE TABLE IF NOT EXISTS course_grades (
+    id SERIAL PRIMARY KEY,
+    student_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    course_id INTEGER NOT NULL REFERENCES courses(id) ON DELETE CASCADE,
+    vize_score FLOAT DEFAULT 0.0 NOT NULL,
+    final_score FLOAT DEFAULT 0.0 NOT NULL,
+    vize_weight FLOAT DEFAULT 0.0 NOT NULL,
+    final_weight FLOAT DEFAULT 0.0 NOT NULL,
+    final_grade FLOAT DEFAULT 0.0 NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT unique_course_grade UNIQUE(student_id, course_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_course_grades_student ON course_grades(student_id);
+CREATE INDEX IF NOT EXISTS idx_course_grades_course ON course_grades(course_id);
@@ -0,0 +1,11 @@
+-- Sınavlar için önbelleklenmiş soru sayısı ve maksimum puan sütunları
+-- Soru ekleme/güncelleme/silme işlemlerinde uygulama tarafından güncellenir.
+-- Doğrulama: cd backend && flask --app app check-exam-totals [--fix]
+
+ALTER TABLE exams ADD COLUMN IF NOT EXISTS max_points FLOAT DEFAULT 0.0 NOT NULL;
+ALTER TABLE exams ADD COLUMN IF NOT EXISTS question_count INTEGER DEFAULT 0 NOT NULL;
+
+-- Mevcut sınavlar için doldur
+UPDATE exams SET
+    question_count = (SELECT COUNT(*) FROM questions WHERE questions.exam_id = exams.id),
+    max_points = (SELECT COALESCE(SUM(points), 0) FROM questions WHERE questions.exam_id = exams.id);
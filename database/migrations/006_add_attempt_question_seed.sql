@@ -0,0 +1,5 @@
+-- Sınav girişine özel soru/şık sıralaması için tohum (seed) değeri
+-- start_exam sırasında bir kez üretilir; sayfa yenilemelerinde aynı sıra korunur.
+-- NULL olan eski girişler için uygulama giriş id'sini tohum olarak kullanır.
+
+ALTER TABLE exam_attempts ADD COLUMN IF NOT EXISTS question_seed INTEGER;
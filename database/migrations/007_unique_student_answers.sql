@@ -0,0 +1,14 @@
+-- Sınav girişi başına soru başına tek cevap (otomatik kayıt upsert'leri için)
+-- Aynı soruya birden çok cevap varsa en son eklenen korunur.
+
+DELETE FROM student_answers a
+USING student_answers b
+WHERE a.attempt_id = b.attempt_id
+  AND a.question_id = b.question_id
+  AND a.id < b.id;
+
+ALTER TABLE student_answers
+    ADD CONSTRAINT unique_attempt_question UNIQUE (attempt_id, question_id);
+
+-- Benzersizlik indeksi attempt_id ile başladığı için ayrı attempt indeksi gereksizdir
+DROP INDEX IF EXISTS idx_student_answers_attempt;
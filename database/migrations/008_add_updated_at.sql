@@ -0,0 +1,6 @@
+-- Koşullu GET (ETag / If-None-Match) için sürüm sütunları
+-- Liste ve sonuç endpoint'leri ETag'i bu sütunların en büyük değerinden üretir;
+-- ORM güncellemelerinde uygulama tarafından otomatik güncellenir.
+
+ALTER TABLE courses ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE exams ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
@@ -0,0 +1,29 @@
+-- Sıcak sorgular için bileşik ve kısmi indeksler (models.py __table_args__ ile aynı)
+-- Doğrulama: cd backend && python benchmark.py explain
+--
+-- Zaten benzersizlik kısıtlarıyla karşılananlar:
+--   exam_attempts (exam_id, student_id)      -> unique_exam_student
+--   student_answers (attempt_id, question_id) -> unique_attempt_question (007)
+--   student_courses (student_id, course_id)   -> unique_student_course
+
+-- Öğrenci sınav listesi: course_id = ? AND end_time >= şimdi
+CREATE INDEX IF NOT EXISTS idx_exams_course_end ON exams(course_id, end_time);
+
+-- Zamanlayıcı: bir sonraki sınav kapanış zamanı (MIN(end_time) WHERE end_time > ?)
+CREATE INDEX IF NOT EXISTS idx_exams_end ON exams(end_time);
+
+-- Sonuç ve istatistikler: gönderilmiş girişlerin sayısı/ortalaması (index-only scan)
+CREATE INDEX IF NOT EXISTS idx_exam_attempts_submitted
+    ON exam_attempts(exam_id, total_score) WHERE submitted_at IS NOT NULL;
+
+-- Zamanlayıcı: gönderilmemiş girişler (tablo büyüse de küçük kalır)
+CREATE INDEX IF NOT EXISTS idx_exam_attempts_open
+    ON exam_attempts(exam_id) WHERE submitted_at IS NULL;
+
+-- Bileşik indekslerin ilk sütunuyla aynı olan tek sütunlu indeksler gereksizdir
+DROP INDEX IF EXISTS idx_exams_course;
+DROP INDEX IF EXISTS idx_exam_attempts_exam;
+DROP INDEX IF EXISTS idx_student_courses_student;
+
+ANALYZE exams;
+ANALYZE exam_attempts;
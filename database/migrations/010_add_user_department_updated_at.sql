@@ -0,0 +1,6 @@
+-- Ders listelerinin ETag sürümü için users ve departments sürüm sütunları
+-- Course.to_dict departman ve öğretim üyesi isimlerini de döndürür; bu satırlar
+-- değiştiğinde ders listelerinin ETag'i de değişmelidir (bkz. utils/etag.py).
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE departments ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
@@ -1,30 +1,63 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 
-function Timer({ durationMinutes, onTimeUp }) {
+// Sunucu saatiyle yeniden senkronizasyon aralığı (ms)
+const DEFAULT_SYNC_INTERVAL = 30000;
+
+// fetchClock verilirse kalan süre sunucudan alınır ({ remaining_seconds, submitted })
+// ve syncInterval'da bir yeniden eşitlenir; istek süresinin yarısı (RTT/2) düşülür.
+// Yerel sayaç performance.now() ile hesaplandığı için sekme arka plandayken kaymaz.
+function Timer({ durationMinutes, onTimeUp, fetchClock, syncInterval = DEFAULT_SYNC_INTERVAL }) {
+  const deadlineRef = useRef(performance.now() + durationMinutes * 60 * 1000);
+  const timeUpRef = useRef(false);
+  // Üst bileşenin her render'ında yeni fonksiyon gelse de sayaç yeniden başlatılmaz
+  const onTimeUpRef = useRef(onTimeUp);
+  onTimeUpRef.current = onTimeUp;
   const [timeLeft, setTimeLeft] = useState(durationMinutes * 60); // saniye cinsinden
 
   useEffect(() => {
-    if (timeLeft <= 0) {
-      if (onTimeUp) {
-        onTimeUp();
-      }
-      return;
+    if (!fetchClock) {
+      return undefined;
     }
+    let cancelled = false;
+
+    const sync = async () => {
+      const requestedAt = performance.now();
+      try {
+        const clock = await fetchClock();
+        const receivedAt = performance.now();
+        if (cancelled) {
+          return;
+        }
+        const remainingMs = clock.submitted ? 0 : clock.remaining_seconds * 1000;
+        deadlineRef.current = receivedAt + remainingMs - (receivedAt - requestedAt) / 2;
+      } catch (err) {
+        // Senkronizasyon hatası sayacı durdurmaz; yerel süre ile devam edilir
+        console.warn('Sınav saati senkronize edilemedi:', err.response?.data?.error || err.message);
+      }
+    };
 
+    sync();
+    const interval = setInterval(sync, syncInterval);
+    return () => {
+      cancelled = true;
+      clearInterval(interval);
+    };
+  }, [fetchClock, syncInterval]);
+
+  useEffect(() => {
     const timer = setInterval(() => {
-      setTimeLeft((prev) => {
-        if (prev <= 1) {
-          if (onTimeUp) {
-            onTimeUp();
-          }
-          return 0;
+      const remaining = Math.max(Math.ceil((deadlineRef.current - performance.now()) / 1000), 0);
+      setTimeLeft(remaining);
+      if (remaining === 0 && !timeUpRef.current) {
+        timeUpRef.current = true;
+        if (onTimeUpRef.current) {
+          onTimeUpRef.current();
         }
-        return prev - 1;
-      });
-    }, 1000);
+      }
+    }, 500);
 
     return () => clearInterval(timer);
-  }, [timeLeft, onTimeUp]);
+  }, []);
 
   const minutes = Math.floor(timeLeft / 60);
   const seconds = timeLeft % 60;
@@ -38,4 +71,3 @@ function Timer({ durationMinutes, onTimeUp }) {
 }
 
 export default Timer;
-
@@ -2,6 +2,9 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import api from '../../services/api';
 
+// Sınav listesini değiştiren sunucu olayları (bkz. backend/services/events.py)
+const EXAM_EVENTS = ['exam_opened', 'exam_closed', 'exam_updated', 'result_published', 'enrollment_changed'];
+
 function ExamList() {
   const [exams, setExams] = useState([]);
   const [upcomingExams, setUpcomingExams] = useState([]);
@@ -10,8 +13,40 @@ function ExamList() {
 
   useEffect(() => {
     loadExams();
-    const interval = setInterval(loadExams, 30000); // Her 30 saniyede bir yenile
-    return () => clearInterval(interval);
+    
+    // Sunucu olay akışı (SSE): sınav açıldığında/kapandığında veya sonuç yayınlandığında yenile.
+    // EventSource desteklenmiyorsa ya da bağlantı kalıcı olarak kapanırsa 30 saniyelik yoklamaya dönülür.
+    let interval = null;
+    let source = null;
+    const startPolling = () => {
+      if (!interval) {
+        interval = setInterval(loadExams, 30000);
+      }
+    };
+    
+    const token = localStorage.getItem('access_token');
+    if (window.EventSource && token) {
+      source = new EventSource(`/api/student/events?token=${encodeURIComponent(token.trim())}`);
+      // (Yeniden) bağlanıldığında kaçırılmış olaylar için liste yenilenir (ETag sayesinde genelde 304)
+      source.addEventListener('ready', loadExams);
+      EXAM_EVENTS.forEach((name) => source.addEventListener(name, loadExams));
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) {
+          startPolling();
+        }
+      };
+    } else {
+      startPolling();
+    }
+    
+    return () => {
+      if (source) {
+        source.close();
+      }
+      if (interval) {
+        clearInterval(interval);
+      }
+    };
   }, []);
 
   const loadExams = async () => {
@@ -1,6 +1,6 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
-import { startExam, submitExam, getExamDetails } from '../../services/studentService';
+import { startExam, submitExam, getExamDetails, saveAnswer, getAttemptClock } from '../../services/studentService';
 import Timer from '../shared/Timer';
 import QuestionCard from '../shared/QuestionCard';
 
@@ -15,6 +15,7 @@ function ExamTaking() {
   const [error, setError] = useState('');
   const [warning, setWarning] = useState('');
   const [attemptStarted, setAttemptStarted] = useState(false);
+  const [attemptId, setAttemptId] = useState(null);
   const [submitting, setSubmitting] = useState(false);
 
   useEffect(() => {
@@ -26,13 +27,23 @@ function ExamTaking() {
     setError('');
     try {
       // Önce sınava başlamayı dene
-      // startExam zaten mevcut attempt varsa hata verir, o zaman getExamDetails çağır
+      // startExam idempotenttir: açık bir giriş varsa aynı kağıdı kayıtlı cevaplarla döndürür
       try {
         const data = await startExam(parseInt(examId));
-        // Yeni sınav başlatıldı
         setExam(data.exam || { duration_minutes: data.duration_minutes || 10 });
         setQuestions(data.questions || []);
+        setAttemptId(data.attempt?.id || null);
         setAttemptStarted(true);
+        if (data.resumed) {
+          // Devam edilen giriş: kayıtlı cevapları yükle
+          const existingAnswers = {};
+          (data.questions || []).forEach(q => {
+            if (q.selected_option_id) {
+              existingAnswers[q.id] = q.selected_option_id;
+            }
+          });
+          setAnswers(existingAnswers);
+        }
       } catch (startErr) {
         // Eğer sınava zaten başlanmışsa, mevcut attempt'i yükle
         if (startErr.response?.status === 400 || startErr.response?.status === 409) {
@@ -40,6 +51,7 @@ function ExamTaking() {
           const details = await getExamDetails(parseInt(examId));
           setExam(details.exam);
           setQuestions(details.questions);
+          setAttemptId(details.attempt?.id || null);
           setAttemptStarted(true);
           // Mevcut cevapları yükle
           const existingAnswers = {};
@@ -70,6 +82,10 @@ function ExamTaking() {
     }
     setAnswers(newAnswers);
     setWarning(''); // Uyarıyı temizle
+
+    // Otomatik kayıt: sayfa yenilense de cevap korunur (hata gönderimi engellemez)
+    saveAnswer(parseInt(examId), questionId, optionId === null ? null : parseInt(optionId))
+      .catch(err => console.warn('Cevap otomatik kaydedilemedi:', err.response?.data?.error || err.message));
   };
 
   const handleNextQuestion = () => {
@@ -126,6 +142,9 @@ function ExamTaking() {
     }
   };
 
+  // Kalan süre sunucudan periyodik olarak senkronize edilir (Timer bu fonksiyonu kullanır)
+  const fetchClock = useCallback(() => getAttemptClock(attemptId), [attemptId]);
+
   const handleTimeUp = () => {
     setWarning('Süre doldu! Sınav otomatik olarak gönderiliyor...');
     handleSubmit();
@@ -152,6 +171,7 @@ function ExamTaking() {
       React.createElement('div', { className: 'exam-timer-section' },
         React.createElement(Timer, {
           durationMinutes: exam?.duration_minutes || 10,
+          fetchClock: attemptId ? fetchClock : undefined,
           onTimeUp: handleTimeUp
         }),
         React.createElement('div', { className: 'answer-progress' },
@@ -1,14 +1,29 @@
-import api from './api';
+import api, { fetchPage, fetchAllPages } from './api';
 
 export const createUser = async (name, email, password, role) => {
   const response = await api.post('/admin/users', { name, email, password, role });
   return response.data;
 };
 
+// CSV (email,password,role,name) veya JSONL dosyasından toplu kullanıcı ekleme
+// Yanıt: { created, failed, errors: [{ row, email, error }], errors_truncated, warnings }
+export const importUsers = async (file) => {
+  const formData = new FormData();
+  formData.append('file', file);
+  const response = await api.post('/admin/users/import', formData, {
+    headers: { 'Content-Type': 'multipart/form-data' },
+  });
+  return response.data;
+};
+
 export const getUsers = async (role = null) => {
   const params = role ? { role } : {};
-  const response = await api.get('/admin/users', { params });
-  return response.data.users;
+  return fetchAllPages('/admin/users', 'users', params);
+};
+
+// params: { role, q, sort, limit, cursor, fields }
+export const getUsersPage = async (params = {}) => {
+  return fetchPage('/admin/users', 'users', params);
 };
 
 export const createDepartment = async (name, code) => {
@@ -21,13 +36,14 @@ export const getDepartments = async () => {
   return response.data.departments;
 };
 
-export const deleteUser = async (userId) => {
-  const response = await api.delete(`/admin/users/${userId}`);
+// options: { force, dryRun } - dryRun silmeden tablo bazlı satır sayılarını döndürür
+export const deleteUser = async (userId, { force = false, dryRun = false } = {}) => {
+  const response = await api.delete(`/admin/users/${userId}`, { params: { force, dry_run: dryRun } });
   return response.data;
 };
 
-export const deleteCourse = async (courseId) => {
-  const response = await api.delete(`/admin/courses/${courseId}`);
+export const deleteCourse = async (courseId, { force = false, dryRun = false } = {}) => {
+  const response = await api.delete(`/admin/courses/${courseId}`, { params: { force, dry_run: dryRun } });
   return response.data;
 };
 
@@ -52,8 +68,20 @@ export const createCourse = async (code, name, department_id, instructor_id) =>
 };
 
 export const getCourses = async () => {
-  const response = await api.get('/admin/courses');
-  return response.data.courses;
+  return fetchAllPages('/admin/courses', 'courses');
+};
+
+// params: { department_id, instructor_id, q, sort, limit, cursor, fields, shallow }
+export const getCoursesPage = async (params = {}) => {
+  return fetchPage('/admin/courses', 'courses', params);
+};
+
+// Toplu öğrenci-ders ataması
+// pairs: [{ student_id, course_id }], cohorts: [{ student_ids: [...], course_ids: [...] }]
+// Yanıt: { summary, results: [{ student_id, course_id, status }], warnings }
+export const createAssignmentsBulk = async (pairs = [], cohorts = []) => {
+  const response = await api.post('/admin/assignments/bulk', { pairs, cohorts });
+  return response.data;
 };
 
 export const createAssignment = async (type, student_id, course_id, instructor_id) => {
@@ -5,8 +5,17 @@ const api = axios.create({
   headers: {
     'Content-Type': 'application/json',
   },
+  // 304 (Not Modified) yanıtları hata değildir; önbellekteki veri döndürülür
+  validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
 });
 
+// Koşullu GET önbelleği: URL -> { etag, data }
+// Sunucu ETag döndürdüğünde yanıt saklanır, sonraki istekte If-None-Match gönderilir.
+const ETAG_CACHE_LIMIT = 100;
+const etagCache = new Map();
+
+const etagCacheKey = (config) => api.getUri(config);
+
 // Request interceptor - JWT token ekle
 api.interceptors.request.use(
   (config) => {
@@ -24,6 +33,13 @@ api.interceptors.request.use(
     } else {
       console.warn('Token bulunamadı, istek token olmadan gönderiliyor:', config.url);
     }
+    
+    if ((config.method || 'get').toLowerCase() === 'get') {
+      const cached = etagCache.get(etagCacheKey(config));
+      if (cached) {
+        config.headers['If-None-Match'] = cached.etag;
+      }
+    }
     return config;
   },
   (error) => {
@@ -33,7 +49,29 @@ api.interceptors.request.use(
 
 // Response interceptor - 401 ve 422 hataları durumunda logout
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    if ((response.config.method || 'get').toLowerCase() !== 'get') {
+      return response;
+    }
+    const key = etagCacheKey(response.config);
+    if (response.status === 304) {
+      const cached = etagCache.get(key);
+      if (cached) {
+        return { ...response, status: 200, data: cached.data, notModified: true };
+      }
+      return response;
+    }
+    const etag = response.headers.etag;
+    if (etag) {
+      etagCache.delete(key);
+      etagCache.set(key, { etag, data: response.data });
+      // En eski kayıt silinir (Map ekleme sırasını korur)
+      if (etagCache.size > ETAG_CACHE_LIMIT) {
+        etagCache.delete(etagCache.keys().next().value);
+      }
+    }
+    return response;
+  },
   (error) => {
     if (error.response) {
       const status = error.response.status;
@@ -49,6 +87,7 @@ api.interceptors.response.use(
           console.warn('Token hatası, logout yapılıyor...');
           localStorage.removeItem('access_token');
           localStorage.removeItem('user');
+          etagCache.clear();
           // Kısa bir gecikme ile logout (kullanıcı hatayı görebilsin)
           setTimeout(() => {
             window.location.href = '/login';
@@ -60,5 +99,28 @@ api.interceptors.response.use(
   }
 );
 
+// Keyset sayfalama yardımcıları
+// Liste endpoint'leri { <key>: [...], next_cursor, limit } döndürür.
+export const fetchPage = async (url, key, params = {}) => {
+  const response = await api.get(url, { params });
+  return {
+    items: response.data[key],
+    nextCursor: response.data.next_cursor,
+    limit: response.data.limit,
+  };
+};
+
+// Tüm sayfaları next_cursor bitene kadar sırayla çek
+export const fetchAllPages = async (url, key, params = {}) => {
+  const items = [];
+  let cursor = null;
+  do {
+    const page = await fetchPage(url, key, cursor ? { ...params, cursor } : params);
+    items.push(...page.items);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return items;
+};
+
 export default api;
 
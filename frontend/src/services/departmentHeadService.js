@@ -1,13 +1,20 @@
-import api from './api';
+import api, { fetchPage, fetchAllPages } from './api';
 
 export const getAllCourses = async () => {
-  const response = await api.get('/department-head/courses');
-  return response.data.courses;
+  return fetchAllPages('/department-head/courses', 'courses');
+};
+
+export const getCoursesPage = async (params = {}) => {
+  return fetchPage('/department-head/courses', 'courses', params);
 };
 
 export const getAllStudents = async () => {
-  const response = await api.get('/department-head/students');
-  return response.data.students;
+  return fetchAllPages('/department-head/students', 'students');
+};
+
+// params: { q, sort, limit, cursor, fields }
+export const getStudentsPage = async (params = {}) => {
+  return fetchPage('/department-head/students', 'students', params);
 };
 
 export const getStatistics = async () => {
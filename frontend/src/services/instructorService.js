@@ -1,4 +1,4 @@
-import api from './api';
+import api, { fetchPage, fetchAllPages } from './api';
 
 export const getMyCourses = async () => {
   const response = await api.get('/instructor/courses');
@@ -16,8 +16,12 @@ export const createExam = async (examData) => {
 };
 
 export const getMyExams = async () => {
-  const response = await api.get('/instructor/exams');
-  return response.data.exams;
+  return fetchAllPages('/instructor/exams', 'exams');
+};
+
+// params: { course_id, exam_type, sort, limit, cursor, fields, shallow }
+export const getMyExamsPage = async (params = {}) => {
+  return fetchPage('/instructor/exams', 'exams', params);
 };
 
 export const addQuestion = async (examId, questionData) => {
@@ -20,6 +20,27 @@ export const startExam = async (examId) => {
   return response.data;
 };
 
+// Tek cevabı otomatik kaydet (selectedOptionId null ise cevap temizlenir)
+export const saveAnswer = async (examId, questionId, selectedOptionId) => {
+  const response = await api.put(`/student/exams/${examId}/answers`, {
+    question_id: questionId,
+    selected_option_id: selectedOptionId
+  });
+  return response.data;
+};
+
+// Birden çok cevabı tek istekte otomatik kaydet: [{ question_id, selected_option_id }]
+export const saveAnswers = async (examId, answers) => {
+  const response = await api.put(`/student/exams/${examId}/answers`, { answers });
+  return response.data;
+};
+
+// Girişin sunucu saatine göre kalan süresi: { remaining_seconds, deadline, server_time, submitted }
+export const getAttemptClock = async (attemptId) => {
+  const response = await api.get(`/student/attempts/${attemptId}/clock`);
+  return response.data;
+};
+
 export const submitExam = async (examId, answers) => {
   const response = await api.post(`/student/exams/${examId}/submit`, { answers });
   return response.data;